@@ -0,0 +1,193 @@
+"""
+End-to-end benchmark: scrape -> process -> export against the local fake site
+
+Runs scrape_multiple_pages, DataProcessor.process_products and
+save_to_csv at several concurrency levels and reports pages/s,
+products/s, p50/p99 fetch latency and peak RSS. Each level runs in a
+fresh process so its peak RSS is its own.
+
+Usage:
+    python benchmarks/bench_end_to_end.py [--pages 50] [--latency 0.05]
+        [--concurrency 1 2 4 8 16] [--error-rate 0.0] [--throttle-rate 0.0]
+        [--level-timeout 600] [--trace traces/]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from queue import Empty
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper import ProductScraper
+from data_processor import DataProcessor
+from tracing import tracer
+from fake_site import FakeCatalogue
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def peak_rss_mb() -> float:
+    """Get the peak resident set size of this process in MiB (0 if unknown)"""
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 1024
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Get a nearest-rank percentile of a list of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_level(base_url: str, concurrency: int, requests_per_second: float, max_retries: int,
+              trace_path: Optional[str] = None) -> Dict:
+    """
+    Run the whole pipeline once (inside a worker process)
+    
+    Args:
+        trace_path: Write a Chrome trace of the run to this file
+    
+    Returns:
+        Dictionary of timings and counters for this level
+    """
+    latencies = []
+    scraper = ProductScraper(
+        rate_limit=0, max_retries=max_retries, max_concurrency=concurrency,
+        requests_per_second=requests_per_second, base_url=base_url
+    )
+    # Time to response headers of every request, including failed attempts
+    scraper.session.hooks['response'].append(lambda response, *args, **kwargs: latencies.append(
+        response.elapsed.total_seconds()))
+    
+    if trace_path:
+        tracer.start()
+    
+    start = time.perf_counter()
+    products = scraper.scrape_multiple_pages(None)
+    scrape_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    processor = DataProcessor()
+    df = processor.process_products(products)
+    process_seconds = time.perf_counter() - start
+    
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        processor.save_to_csv(df, os.path.join(directory, 'products.csv'))
+        export_seconds = time.perf_counter() - start
+    
+    if trace_path:
+        tracer.stop()
+        tracer.save(trace_path)
+    
+    stats = scraper.transport.stats.snapshot()
+    return {
+        'concurrency': concurrency,
+        'products': len(products),
+        'scrape_seconds': scrape_seconds,
+        'process_seconds': process_seconds,
+        'export_seconds': export_seconds,
+        'p50': percentile(latencies, 0.50),
+        'p99': percentile(latencies, 0.99),
+        'connections': stats['connections_opened'],
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def _level_worker(queue, *args):
+    """Process entry point: run one level and send back its results"""
+    queue.put(run_level(*args))
+
+
+def _wait_for_level(queue, worker, timeout: float) -> Optional[Dict]:
+    """
+    Wait for a level's results without hanging on a worker that died
+    
+    Args:
+        queue: Queue the worker puts its results on
+        worker: The level's process
+        timeout: Seconds to wait before giving up on the level
+    
+    Returns:
+        The level's results, or None if the worker exited without any or
+        is still running when the time is up
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            return queue.get(timeout=1.0)
+        except Empty:
+            if not worker.is_alive():
+                # It may have put its results just before exiting
+                try:
+                    return queue.get(timeout=1.0)
+                except Empty:
+                    return None
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=50, help='Listing pages served by the fake site')
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds added to every response')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of HTTP 500 responses')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of HTTP 429 responses')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8, 16],
+                        help='Concurrency levels to run')
+    parser.add_argument('--rps', type=float, default=0, help='Requests per second per host (0 = unlimited)')
+    parser.add_argument('--retries', type=int, default=5, help='Attempts per request')
+    parser.add_argument('--level-timeout', type=float, default=600,
+                        help='Seconds a concurrency level may take before the benchmark gives up')
+    parser.add_argument('--trace', metavar='DIR', help='Write a Chrome trace of each level to DIR/trace-cN.json')
+    args = parser.parse_args()
+    
+    if args.trace:
+        os.makedirs(args.trace, exist_ok=True)
+    
+    print(f"Fake site: {args.pages} pages, {args.latency * 1000:.0f} ms latency, "
+          f"{args.error_rate:.0%} errors, {args.throttle_rate:.0%} throttled\n")
+    print(f"{'workers':>7} {'pages/s':>9} {'products/s':>11} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'conns':>6} {'scrape s':>9} {'process s':>10} {'export s':>9} {'peak MiB':>9} {'products':>9}")
+    
+    with FakeCatalogue(pages=args.pages, latency=args.latency, error_rate=args.error_rate,
+                       throttle_rate=args.throttle_rate) as site:
+        for concurrency in args.concurrency:
+            queue = multiprocessing.Queue()
+            trace_path = os.path.join(args.trace, f'trace-c{concurrency}.json') if args.trace else None
+            worker = multiprocessing.Process(
+                target=_level_worker, args=(queue, site.url, concurrency, args.rps, args.retries, trace_path)
+            )
+            worker.start()
+            result = _wait_for_level(queue, worker, args.level_timeout)
+            if result is None:
+                if worker.is_alive():
+                    worker.terminate()
+                    print(f"\nConcurrency {concurrency}: no results after {args.level_timeout:.0f}s, worker stopped")
+                else:
+                    print(f"\nConcurrency {concurrency}: worker exited with code {worker.exitcode} without results")
+                worker.join()
+                sys.exit(1)
+            worker.join()
+            
+            seconds = result['scrape_seconds']
+            print(f"{concurrency:>7} {args.pages / seconds:>9.1f} {result['products'] / seconds:>11.0f} "
+                  f"{result['p50'] * 1000:>8.1f} {result['p99'] * 1000:>8.1f} {result['connections']:>6} "
+                  f"{seconds:>9.2f} {result['process_seconds']:>10.3f} {result['export_seconds']:>9.3f} "
+                  f"{result['peak_rss_mb']:>9.1f} {result['products']:>9}")
+        
+        print(f"\nServer responses by status: {dict(sorted(site.status_counts.items()))}")
+
+
+if __name__ == '__main__':
+    main()
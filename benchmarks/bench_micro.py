@@ -0,0 +1,336 @@
+"""
+Microbenchmarks of the hot functions, with stored baselines
+
+Times the ProductScraper extraction and parsing path and the
+DataProcessor cleaning and export functions at several data sizes and
+compares every result with benchmarks/baselines.json. A case that got
+slower than the baseline by more than the threshold is reported as a
+regression and the script exits with status 1, so it can gate a change.
+
+Baselines depend on the machine: record them with --save-baseline on the
+machine that runs the check, before the change under test.
+
+Usage:
+    python benchmarks/bench_micro.py                        # compare with the baseline
+    python benchmarks/bench_micro.py --save-baseline        # record a new baseline
+    python benchmarks/bench_micro.py --sizes 1000 100000 --filter normalize
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from bs4 import BeautifulSoup
+from lxml import etree
+
+from scraper import ProductScraper
+from data_processor import DataProcessor
+from product_columns import ProductColumns
+from catalogue_fixture import make_books, render_listing_page, PRODUCTS_PER_PAGE
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+
+# Distinct fixture items; larger sizes cycle through them
+POOL_PAGES = 50
+
+AVAILABILITY_VALUES = ['\n\n    \n        In stock\n    \n', '\n\n    \n        Out of stock\n    \n', '', 'Preorder']
+
+
+def _listing_pages() -> List[bytes]:
+    """Render the pool of fixture listing pages"""
+    books = make_books(POOL_PAGES * PRODUCTS_PER_PAGE)
+    return [render_listing_page(books, page).encode('utf-8') for page in range(1, POOL_PAGES + 1)]
+
+
+def _soup_articles(pages: List[bytes]) -> list:
+    """Parse the fixture pages into BeautifulSoup product articles"""
+    articles = []
+    for content in pages:
+        soup = BeautifulSoup(content, 'lxml')
+        articles.extend(soup.find_all('article', class_='product_pod'))
+    return articles
+
+
+def _lxml_articles(pages: List[bytes]) -> list:
+    """Parse the fixture pages into lxml product articles"""
+    articles = []
+    for content in pages:
+        root = etree.fromstring(content, etree.HTMLParser())
+        articles.extend(root.iter('article'))
+    return articles
+
+
+def make_products(size: int) -> List[Dict]:
+    """
+    Generate scraped-product dictionaries like scrape_multiple_pages returns
+    
+    About 10% of the products repeat an earlier URL, so deduplication has
+    work to do.
+    """
+    books = make_books(1_000)
+    products = []
+    for index in range(size):
+        book = books[index % len(books)]
+        product_id = index if index % 10 else index // 2
+        products.append({
+            'title': book['title'],
+            'price': f"£{book['price']:.2f}",
+            'rating': ProductScraper.RATING_MAP[book['rating']],
+            'availability': AVAILABILITY_VALUES[index % len(AVAILABILITY_VALUES)],
+            'url': f"https://books.toscrape.com/catalogue/{book['slug']}-{product_id}/index.html"
+        })
+    return products
+
+
+def _cycle(items: list, size: int) -> list:
+    """Repeat a pool of items up to ``size`` entries"""
+    return [items[index % len(items)] for index in range(size)]
+
+
+class Fixtures:
+    """Lazily built, shared inputs for the benchmark cases"""
+    
+    def __init__(self):
+        self._cache = {}
+    
+    def get(self, key: str, build: Callable):
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+    
+    def pages(self) -> List[bytes]:
+        return self.get('pages', _listing_pages)
+    
+    def soup_articles(self) -> list:
+        return self.get('soup_articles', lambda: _soup_articles(self.pages()))
+    
+    def lxml_articles(self) -> list:
+        return self.get('lxml_articles', lambda: _lxml_articles(self.pages()))
+    
+    def products(self, size: int) -> List[Dict]:
+        return self.get(f'products:{size}', lambda: make_products(size))
+    
+    def frame(self, size: int) -> pd.DataFrame:
+        return self.get(f'frame:{size}', lambda: DataProcessor.process_products(self.products(size)))
+
+
+def _extract_case(method_name: str):
+    """Build a case that calls one ProductScraper._extract_* method per product"""
+    def setup(fixtures: Fixtures, size: int) -> Callable:
+        scraper = ProductScraper(parser='html.parser')
+        method = getattr(scraper, method_name)
+        articles = _cycle(fixtures.soup_articles(), size)
+        return lambda: [method(article) for article in articles]
+    return setup
+
+
+def _extract_lxml_case(fixtures: Fixtures, size: int) -> Callable:
+    scraper = ProductScraper(parser='lxml')
+    articles = _cycle(fixtures.lxml_articles(), size)
+    return lambda: [scraper._extract_product_lxml(article) for article in articles]
+
+
+def _parse_case(parser: str):
+    """Build a case that parses whole listing pages, as scrape_page does"""
+    def setup(fixtures: Fixtures, size: int) -> Callable:
+        scraper = ProductScraper(parser=parser)
+        pages = _cycle(fixtures.pages(), max(1, size // PRODUCTS_PER_PAGE))
+        return lambda: [scraper.parse_products(content, 'utf-8') for content in pages]
+    return setup
+
+
+def _normalize_price_case(fixtures: Fixtures, size: int) -> Callable:
+    prices = [product['price'] for product in fixtures.products(size)]
+    return lambda: [DataProcessor.normalize_price(price) for price in prices]
+
+
+def _clean_availability_case(fixtures: Fixtures, size: int) -> Callable:
+    values = [product['availability'] for product in fixtures.products(size)]
+    return lambda: [DataProcessor.clean_availability(value) for value in values]
+
+
+def _normalize_price_column_case(fixtures: Fixtures, size: int) -> Callable:
+    prices = pd.Series([product['price'] for product in fixtures.products(size)], dtype=object)
+    return lambda: DataProcessor.normalize_price_column(prices)
+
+
+def _clean_availability_column_case(fixtures: Fixtures, size: int) -> Callable:
+    values = pd.Series([product['availability'] for product in fixtures.products(size)], dtype=object)
+    return lambda: DataProcessor.clean_availability_column(values)
+
+
+def _deduplicate_case(fixtures: Fixtures, size: int) -> Callable:
+    products = fixtures.products(size)
+    return lambda: DataProcessor.deduplicate_products(products)
+
+
+def _product_columns_case(fixtures: Fixtures, size: int) -> Callable:
+    products = fixtures.products(size)
+    # len() flushes the last batch, which otherwise stays pending and untimed
+    return lambda: len(ProductColumns(products))
+
+
+def _process_case(fixtures: Fixtures, size: int) -> Callable:
+    products = fixtures.products(size)
+    return lambda: DataProcessor.process_products(products)
+
+
+def _save_case(method_name: str, extension: str):
+    """
+    Build a case that exports the processed DataFrame to a temporary file
+    
+    The timed callable carries a ``cleanup`` function that deletes the
+    temporary directory once the case has been timed.
+    """
+    def setup(fixtures: Fixtures, size: int) -> Callable:
+        df = fixtures.frame(size)
+        directory = tempfile.TemporaryDirectory()
+        path = os.path.join(directory.name, 'products' + extension)
+        method = getattr(DataProcessor, method_name)
+        
+        def run():
+            method(df, path)
+        run.cleanup = directory.cleanup
+        return run
+    return setup
+
+
+# name -> (setup(fixtures, size) returning the timed callable, largest size worth running).
+# Per-article parsing and the Excel writer take minutes at 1M items, so they stop earlier:
+# a requested size above the cap runs the case at its cap instead.
+CASES = {
+    'extract_title': (_extract_case('_extract_title'), 100_000),
+    'extract_price': (_extract_case('_extract_price'), 100_000),
+    'extract_rating': (_extract_case('_extract_rating'), 100_000),
+    'extract_availability': (_extract_case('_extract_availability'), 100_000),
+    'extract_product_url': (_extract_case('_extract_product_url'), 100_000),
+    'extract_product': (_extract_case('_extract_product'), 100_000),
+    'extract_product_lxml': (_extract_lxml_case, 100_000),
+    'parse_page[lxml]': (_parse_case('lxml'), 100_000),
+    'parse_page[html.parser]': (_parse_case('html.parser'), 10_000),
+    'normalize_price': (_normalize_price_case, None),
+    'clean_availability': (_clean_availability_case, None),
+    'normalize_price_column': (_normalize_price_column_case, None),
+    'clean_availability_column': (_clean_availability_column_case, None),
+    'deduplicate_products': (_deduplicate_case, None),
+    'product_columns': (_product_columns_case, None),
+    'process_products': (_process_case, None),
+    'save_to_csv': (_save_case('save_to_csv', '.csv'), None),
+    'save_to_excel': (_save_case('save_to_excel', '.xlsx'), 100_000),
+    'save_to_jsonl': (_save_case('save_to_jsonl', '.jsonl'), None),
+}
+
+# Arrow formats need the optional pyarrow package
+if DataProcessor.format_unavailable('parquet') is None:
+    CASES['save_to_parquet'] = (_save_case('save_to_parquet', '.parquet'), None)
+    CASES['save_to_feather'] = (_save_case('save_to_feather', '.feather'), None)
+
+
+def time_case(run: Callable, repeat: int) -> float:
+    """Get the best wall time of ``repeat`` runs, with the garbage collector paused"""
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return best
+
+
+def load_baseline(path: str) -> Dict:
+    """Load the stored baseline, or an empty one"""
+    if not os.path.exists(path):
+        return {'results': {}}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baseline(path: str, results: Dict[str, float], previous: Dict):
+    """Merge new results into the baseline file"""
+    merged = {**previous.get('results', {}), **results}
+    baseline = {
+        'machine': platform.platform(),
+        'python': platform.python_version(),
+        'recorded_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'results': dict(sorted(merged.items()))
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2)
+        f.write('\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='Products per case')
+    parser.add_argument('--filter', default='', help='Only run cases whose name contains this text')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per case (best one is kept)')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed slowdown vs the baseline before failing (0.25 = 25%%)')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='Baseline file')
+    parser.add_argument('--save-baseline', action='store_true', help='Record the results as the new baseline')
+    args = parser.parse_args()
+    
+    baseline = load_baseline(args.baseline)
+    fixtures = Fixtures()
+    results = {}
+    regressions = []
+    
+    print(f"{'case':<26} {'size':>9} {'seconds':>10} {'ns/item':>10} {'baseline':>10} {'change':>8}")
+    for name, (setup, max_size) in CASES.items():
+        if args.filter not in name:
+            continue
+        sizes = sorted({min(size, max_size) if max_size else size for size in args.sizes})
+        for size in sizes:
+            key = f"{name}@{size}"
+            run = setup(fixtures, size)
+            try:
+                seconds = time_case(run, args.repeat)
+            finally:
+                # Export cases write up to hundreds of MB; don't leave them behind
+                cleanup = getattr(run, 'cleanup', None)
+                if cleanup:
+                    cleanup()
+            results[key] = seconds
+            
+            reference = baseline['results'].get(key)
+            if reference:
+                change = seconds / reference - 1
+                status = f"{change:+.0%}"
+                if change > args.threshold:
+                    status += ' !'
+                    regressions.append((key, change))
+                reference_text = f"{reference:.4f}"
+            else:
+                status, reference_text = 'new', '-'
+            print(f"{name:<26} {size:>9} {seconds:>10.4f} {seconds / size * 1e9:>10.0f} "
+                  f"{reference_text:>10} {status:>8}", flush=True)
+    
+    if args.save_baseline:
+        save_baseline(args.baseline, results, baseline)
+        print(f"\nSaved {len(results)} results to {args.baseline}")
+        return
+    
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for key, change in regressions:
+            print(f"  {key}: {change:+.0%}")
+        sys.exit(1)
+    print("\nNo regressions")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Parse-throughput comparison of the ProductScraper parser backends
+
+Usage:
+    python benchmarks/bench_parsers.py [--pages 50] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper import ProductScraper
+from catalogue_fixture import make_books, render_listing_page, PRODUCTS_PER_PAGE
+
+
+def build_pages(num_pages: int):
+    """Render the fixture listing pages as UTF-8 bytes"""
+    books = make_books(num_pages * PRODUCTS_PER_PAGE)
+    return [render_listing_page(books, page).encode('utf-8') for page in range(1, num_pages + 1)]
+
+
+def time_backend(parser: str, pages, repeat: int):
+    """
+    Parse every page ``repeat`` times with one backend
+    
+    Returns:
+        Tuple of (best seconds per pass, products from the last pass)
+    """
+    scraper = ProductScraper(parser=parser)
+    best = float('inf')
+    products = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        products = [scraper.parse_products(content, 'utf-8') for content in pages]
+        best = min(best, time.perf_counter() - start)
+    return best, products
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=50, help='Number of listing pages to parse')
+    parser.add_argument('--repeat', type=int, default=3, help='Passes per backend (best one is reported)')
+    args = parser.parse_args()
+    
+    pages = build_pages(args.pages)
+    total_bytes = sum(len(content) for content in pages)
+    print(f"Parsing {len(pages)} pages ({total_bytes / 1024:.0f} KiB), best of {args.repeat}\n")
+    
+    results = {}
+    for backend in ProductScraper.PARSERS:
+        results[backend] = time_backend(backend, pages, args.repeat)
+    
+    reference = results[ProductScraper.PARSERS[0]][1]
+    print(f"{'backend':<12} {'pages/s':>10} {'products/s':>12} {'MiB/s':>8} {'identical':>10}")
+    for backend, (seconds, products) in results.items():
+        num_products = sum(len(page) for page in products)
+        print(f"{backend:<12} {len(pages) / seconds:>10.1f} {num_products / seconds:>12.0f} "
+              f"{total_bytes / seconds / 2 ** 20:>8.2f} {str(products == reference):>10}")
+    
+    baseline = results['html.parser'][0]
+    for backend, (seconds, _) in results.items():
+        if backend != 'html.parser':
+            print(f"\n{backend} is {baseline / seconds:.1f}x faster than html.parser")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,370 @@
+"""
+Synthetic books.toscrape.com catalogue pages for benchmarks
+
+Generates listing pages with the same markup as the real site so the
+scraper's parsing path can be exercised without touching the network.
+"""
+import random
+from html import escape
+from typing import List, Dict
+
+RATING_WORDS = ['One', 'Two', 'Three', 'Four', 'Five']
+
+WORDS = [
+    'light', 'attic', 'velvet', 'soumission', 'sharp', 'objects', 'sapiens',
+    'requiem', 'red', 'dirty', 'little', 'secrets', 'coming', 'woman', 'boys',
+    'boat', 'black', 'maria', 'starving', 'hearts', 'shakespeare', 'sonnets',
+    'set', 'me', 'free', 'rip', 'it', 'up', 'and', 'start', 'again', 'our',
+    'band', 'could', 'be', 'your', 'life', 'olio', 'mesaerion', 'history',
+    'libertarianism', 'beginners', 'himalayas', 'full', 'moon', 'over', 'noah'
+]
+
+CATEGORIES = ['Poetry', 'Historical Fiction', 'Fiction', 'Mystery', 'History',
+              'Young Adult', 'Business', 'Default', 'Science', 'Travel']
+
+PRODUCTS_PER_PAGE = 20
+
+PAGE_HEADER = '''<!DOCTYPE html>
+<!--[if lt IE 7]>      <html lang="en-us" class="no-js lt-ie9 lt-ie8 lt-ie7"> <![endif]-->
+<!--[if IE 7]>         <html lang="en-us" class="no-js lt-ie9 lt-ie8"> <![endif]-->
+<!--[if IE 8]>         <html lang="en-us" class="no-js lt-ie9"> <![endif]-->
+<!--[if gt IE 8]><!--> <html lang="en-us" class="no-js"> <!--<![endif]-->
+    <head>
+        <title>
+    All products | Books to Scrape - Sandbox
+</title>
+        <meta http-equiv="content-type" content="text/html; charset=UTF-8" />
+        <meta name="created" content="24th Jun 2016 09:29" />
+        <meta name="description" content="" />
+        <meta name="viewport" content="width=device-width" />
+        <meta name="robots" content="NOARCHIVE,NOCACHE" />
+        <link rel="shortcut icon" href="{static}static/oscar/favicon.ico" />
+        <link rel="stylesheet" type="text/css" href="{static}static/oscar/css/styles.css" />
+        <link rel="stylesheet" type="text/css" href="{static}static/oscar/js/bootstrap-datetimepicker/bootstrap-datetimepicker.css" />
+    </head>
+    <body id="default" class="default">
+        <header class="header container-fluid">
+            <div class="page_inner">
+                <div class="row">
+                    <div class="col-sm-8 h1"><a href="{static}index.html">Books to Scrape</a><small> We love being scraped!</small>
+</div>
+                </div>
+            </div>
+        </header>
+        <div class="container-fluid page">
+            <div class="page_inner">
+<ul class="breadcrumb">
+    <li>
+        <a href="{static}index.html">Home</a>
+    </li>
+    <li class="active">All products</li>
+</ul>
+                <div class="row">
+                    <aside class="sidebar col-sm-4 col-md-3">
+                        <div class="side_categories">
+                            <ul class="nav nav-list">
+                                <li>
+                                    <a href="{static}catalogue/category/books_1/index.html">
+                                        Books
+                                    </a>
+                                    <ul>
+{categories}
+                                    </ul>
+                                </li>
+                            </ul>
+                        </div>
+                    </aside>
+                    <div class="col-sm-8 col-md-9">
+                        <div class="page-header action">
+                            <h1>All products</h1>
+                        </div>
+<form method="get" class="form-horizontal">
+    <div style="display:none">
+    </div>
+        <strong>{total}</strong> results - showing <strong>{first}</strong> to <strong>{last}</strong>.
+</form>
+<section>
+    <div class="alert alert-warning" role="alert"><strong>Warning!</strong> This is a demo website for web scraping purposes. Prices and ratings here were randomly assigned and have no real meaning.</div>
+    <div>
+        <ol class="row">
+'''
+
+PRODUCT_TEMPLATE = '''            <li class="col-xs-6 col-sm-4 col-md-3 col-lg-3">
+    <article class="product_pod">
+            <div class="image_container">
+                    <a href="{href}"><img src="{static}media/cache/{image}.jpg" alt="{title}" class="thumbnail"></a>
+            </div>
+                <p class="star-rating {rating}">
+                    <i class="icon-star"></i>
+                    <i class="icon-star"></i>
+                    <i class="icon-star"></i>
+                    <i class="icon-star"></i>
+                    <i class="icon-star"></i>
+                </p>
+            <h3><a href="{href}" title="{title}">{short_title}</a></h3>
+            <div class="product_price">
+        <p class="price_color">&pound;{price:.2f}</p>
+<p class="{availability_class}">
+    <i class="{availability_icon}"></i>
+        {availability}
+</p>
+    <form>
+        <button type="submit" class="btn btn-primary btn-block" data-loading-text="Adding...">Add to basket</button>
+    </form>
+            </div>
+    </article>
+</li>
+'''
+
+PAGE_FOOTER = '''        </ol>
+            <div>
+                <ul class="pager">
+                    <li class="current">
+                    Page {page} of {total_pages}
+                    </li>
+{next_link}
+                </ul>
+            </div>
+    </div>
+</section>
+                    </div>
+                </div><!-- /row -->
+            </div><!-- /page_inner -->
+        </div><!-- /container-fluid -->
+        <footer class="footer container-fluid">
+        </footer>
+        <script src="{static}static/oscar/js/jquery/jquery-1.9.1.min.js" type="text/javascript" charset="utf-8"></script>
+    </body>
+</html>
+'''
+
+
+def make_books(count: int, seed: int = 0) -> List[Dict]:
+    """
+    Generate deterministic book records
+    
+    Args:
+        count: Number of books
+        seed: Random seed
+    
+    Returns:
+        List of book dictionaries
+    """
+    rng = random.Random(seed)
+    books = []
+    for index in range(count):
+        book_id = count - index
+        words = rng.sample(WORDS, rng.randint(2, 7))
+        title = ' '.join(words).title()
+        in_stock = rng.random() > 0.1
+        books.append({
+            'id': book_id,
+            'slug': f"{'-'.join(words)}_{book_id}",
+            'title': title,
+            'price': round(rng.uniform(10, 60), 2),
+            'rating': rng.choice(RATING_WORDS),
+            'in_stock': in_stock,
+            'stock': rng.randint(1, 22) if in_stock else 0,
+            'upc': f"{rng.getrandbits(64):016x}",
+            'category': rng.choice(CATEGORIES),
+            'description': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(40, 120))).capitalize() + '.',
+            'image': f"{rng.getrandbits(128):032x}",
+        })
+    return books
+
+
+def render_listing_page(books: List[Dict], page: int, per_page: int = PRODUCTS_PER_PAGE) -> str:
+    """
+    Render one catalogue listing page
+    
+    Page 1 mirrors /index.html and later pages mirror
+    /catalogue/page-N.html, including their different relative links.
+    
+    Args:
+        books: Full catalogue as returned by make_books
+        page: 1-based page number
+        per_page: Products per page
+    
+    Returns:
+        HTML document
+    """
+    total_pages = max(1, (len(books) + per_page - 1) // per_page)
+    start = (page - 1) * per_page
+    page_books = books[start:start + per_page]
+    
+    if page == 1:
+        static, link_prefix = '', 'catalogue/'
+        next_href = 'catalogue/page-2.html'
+    else:
+        static, link_prefix = '../', ''
+        next_href = f"page-{page + 1}.html"
+    
+    categories = '\n'.join(
+        f'                                        <li><a href="{static}catalogue/category/books/'
+        f'{name.lower().replace(" ", "-")}_{i + 2}/index.html">{name}</a></li>'
+        for i, name in enumerate(CATEGORIES)
+    )
+    parts = [PAGE_HEADER.format(
+        static=static, categories=categories, total=len(books),
+        first=start + 1 if page_books else 0, last=start + len(page_books)
+    )]
+    
+    for book in page_books:
+        title = escape(book['title'])
+        short_title = title if len(title) <= 40 else title[:37] + '...'
+        parts.append(PRODUCT_TEMPLATE.format(
+            href=f"{link_prefix}{book['slug']}/index.html",
+            static=static,
+            image=book['image'],
+            title=title,
+            short_title=short_title,
+            rating=book['rating'],
+            price=book['price'],
+            availability_class='instock availability' if book['in_stock'] else 'availability',
+            availability_icon='icon-ok' if book['in_stock'] else 'icon-remove',
+            availability='In stock' if book['in_stock'] else 'Out of stock',
+        ))
+    
+    next_link = ''
+    if page < total_pages:
+        next_link = f'                    <li class="next"><a href="{next_href}">next</a></li>'
+    parts.append(PAGE_FOOTER.format(page=page, total_pages=total_pages, next_link=next_link, static=static))
+    return ''.join(parts)
+
+
+DETAIL_TEMPLATE = '''<!DOCTYPE html>
+<html lang="en-us" class="no-js">
+    <head>
+        <title>
+    {title} | Books to Scrape - Sandbox
+</title>
+        <meta http-equiv="content-type" content="text/html; charset=UTF-8" />
+        <meta name="robots" content="NOARCHIVE,NOCACHE" />
+        <link rel="stylesheet" type="text/css" href="../../static/oscar/css/styles.css" />
+    </head>
+    <body id="default" class="default">
+        <header class="header container-fluid">
+            <div class="page_inner">
+                <div class="row">
+                    <div class="col-sm-8 h1"><a href="../../index.html">Books to Scrape</a><small> We love being scraped!</small>
+</div>
+                </div>
+            </div>
+        </header>
+        <div class="container-fluid page">
+            <div class="page_inner">
+<ul class="breadcrumb">
+    <li>
+        <a href="../../index.html">Home</a>
+    </li>
+    <li>
+        <a href="../category/books_1/index.html">Books</a>
+    </li>
+    <li>
+        <a href="../category/books/{category_slug}/index.html">{category}</a>
+    </li>
+    <li class="active">{title}</li>
+</ul>
+<div id="messages">
+</div>
+<div class="content">
+    <div id="promotions">
+    </div>
+    <div id="content_inner">
+<article class="product_page"><!-- Start of product page -->
+    <div class="row">
+        <div class="col-sm-6">
+            <div id="product_gallery" class="carousel">
+                <div class="thumbnail">
+                    <div class="carousel-inner">
+                        <div class="item active">
+                            <img src="../../media/cache/{image}.jpg" alt="{title}" />
+                        </div>
+                    </div>
+                </div>
+            </div>
+        </div>
+        <div class="col-sm-6 product_main">
+            <h1>{title}</h1>
+<p class="price_color">&pound;{price:.2f}</p>
+<p class="{availability_class}">
+    <i class="{availability_icon}"></i>
+        {availability}
+</p>
+    <p class="star-rating {rating}">
+        <i class="icon-star"></i>
+        <i class="icon-star"></i>
+        <i class="icon-star"></i>
+        <i class="icon-star"></i>
+        <i class="icon-star"></i>
+    </p>
+            <hr/>
+        </div><!-- /col-sm-6 -->
+    </div><!-- /row -->
+    <div id="product_description" class="sub-header">
+        <h2>Product Description</h2>
+    </div>
+    <p>{description}</p>
+    <div class="sub-header">
+        <h2>Product Information</h2>
+    </div>
+<table class="table table-striped">
+        <tr>
+            <th>UPC</th><td>{upc}</td>
+        </tr>
+        <tr>
+            <th>Product Type</th><td>Books</td>
+        </tr>
+        <tr>
+            <th>Price (excl. tax)</th><td>&pound;{price:.2f}</td>
+        </tr>
+        <tr>
+            <th>Price (incl. tax)</th><td>&pound;{price:.2f}</td>
+        </tr>
+        <tr>
+            <th>Tax</th><td>&pound;0.00</td>
+        </tr>
+        <tr>
+            <th>Availability</th>
+            <td>{availability}</td>
+        </tr>
+        <tr>
+            <th>Number of reviews</th>
+            <td>0</td>
+        </tr>
+</table>
+</article><!-- End of product page -->
+    </div>
+</div><!-- /content -->
+            </div>
+        </div>
+    </body>
+</html>
+'''
+
+
+def render_detail_page(book: Dict) -> str:
+    """
+    Render the detail page of one book (/catalogue/<slug>/index.html)
+    
+    Args:
+        book: Book dictionary from make_books
+    
+    Returns:
+        HTML document
+    """
+    category_index = CATEGORIES.index(book['category']) + 2
+    availability = f"In stock ({book['stock']} available)" if book['in_stock'] else 'Out of stock'
+    return DETAIL_TEMPLATE.format(
+        title=escape(book['title']),
+        category=escape(book['category']),
+        category_slug=f"{book['category'].lower().replace(' ', '-')}_{category_index}",
+        image=book['image'],
+        price=book['price'],
+        rating=book['rating'],
+        availability_class='instock availability' if book['in_stock'] else 'availability',
+        availability_icon='icon-ok' if book['in_stock'] else 'icon-remove',
+        availability=availability,
+        description=escape(book['description']),
+        upc=book['upc'],
+    )
@@ -0,0 +1,228 @@
+"""
+Local stand-in for books.toscrape.com
+
+Serves generated listing and detail pages in the real site's markup, with
+configurable latency, server errors and 429 throttling, so the whole
+scraper can be exercised and timed without touching the network.
+
+Usage:
+    python benchmarks/fake_site.py --pages 50 --latency 0.05 --port 8000
+
+then point the scraper at it with ProductScraper(base_url='http://127.0.0.1:8000').
+"""
+import argparse
+import gzip
+import random
+import re
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Optional
+
+from catalogue_fixture import make_books, render_listing_page, render_detail_page, PRODUCTS_PER_PAGE
+
+LISTING_PATTERN = re.compile(r'^/catalogue/page-(\d+)\.html$')
+DETAIL_PATTERN = re.compile(r'^/catalogue/([^/]+)/index\.html$')
+
+
+class FakeCatalogueHandler(BaseHTTPRequestHandler):
+    """Request handler; all settings live on the FakeCatalogue server object"""
+    
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; don't let Nagle delay the body
+    disable_nagle_algorithm = True
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def do_GET(self):
+        site = self.server.site
+        path = self.path.split('?', 1)[0]
+        
+        if site.latency > 0:
+            time.sleep(site.latency)
+        
+        fault = site.pick_fault()
+        if fault == 429:
+            self._send(429, b'Too Many Requests', {'Retry-After': str(site.retry_after)})
+            return
+        if fault == 500:
+            self._send(500, b'Internal Server Error')
+            return
+        
+        body = site.render(path)
+        if body is None:
+            self._send(404, b'Not Found')
+            return
+        self._send(200, body, {'Content-Type': 'text/html; charset=utf-8'})
+    
+    def _send(self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None):
+        """Write a complete response, gzip-encoded when the client accepts it"""
+        site = self.server.site
+        site.count(status)
+        
+        if site.compress and status == 200 and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body, compresslevel=6)
+            headers = {**(headers or {}), 'Content-Encoding': 'gzip'}
+        
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeCatalogue:
+    """
+    Threaded HTTP server with a generated catalogue
+    
+    Listing pages are served at /index.html and /catalogue/page-N.html,
+    detail pages at /catalogue/<slug>/index.html. Rendered pages are
+    cached, so the server costs little CPU next to the scraper.
+    
+    Usable as a context manager::
+        
+        with FakeCatalogue(pages=20, latency=0.05) as site:
+            ProductScraper(base_url=site.url).scrape_multiple_pages()
+    """
+    
+    def __init__(self, pages: int = 50, latency: float = 0.0, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, retry_after: int = 1, compress: bool = True,
+                 host: str = '127.0.0.1', port: int = 0, seed: int = 0):
+        """
+        Initialize the server (call start to begin serving)
+        
+        Args:
+            pages: Number of listing pages (PRODUCTS_PER_PAGE products each)
+            latency: Seconds added to every response
+            error_rate: Fraction of requests answered with HTTP 500
+            throttle_rate: Fraction of requests answered with HTTP 429
+            retry_after: Retry-After seconds sent with each 429
+            compress: gzip responses for clients that accept it
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free one)
+            seed: Seed for the catalogue and the injected faults
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.compress = compress
+        
+        self.books = make_books(pages * PRODUCTS_PER_PAGE, seed=seed)
+        self.books_by_slug = {book['slug']: book for book in self.books}
+        self.num_pages = pages
+        
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._rendered: Dict[str, bytes] = {}
+        self.status_counts: Dict[int, int] = {}
+        
+        self._server = ThreadingHTTPServer((host, port), FakeCatalogueHandler)
+        self._server.daemon_threads = True
+        self._server.site = self
+        self._thread = None
+    
+    @property
+    def url(self) -> str:
+        """Base URL of the running server"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def pick_fault(self) -> Optional[int]:
+        """Decide whether the current request fails (429, 500 or None)"""
+        with self._lock:
+            roll = self._rng.random()
+        if roll < self.throttle_rate:
+            return 429
+        if roll < self.throttle_rate + self.error_rate:
+            return 500
+        return None
+    
+    def count(self, status: int):
+        """Count a response by status code"""
+        with self._lock:
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+    
+    def render(self, path: str) -> Optional[bytes]:
+        """
+        Get the body served at a path
+        
+        Args:
+            path: Request path
+        
+        Returns:
+            UTF-8 HTML, or None if nothing lives at the path
+        """
+        body = self._rendered.get(path)
+        if body is not None:
+            return body
+        
+        if path in ('/', '/index.html'):
+            page = 1
+        else:
+            match = LISTING_PATTERN.match(path)
+            page = int(match.group(1)) if match else None
+        
+        if page is not None:
+            if not 1 <= page <= self.num_pages:
+                return None
+            body = render_listing_page(self.books, page).encode('utf-8')
+        else:
+            match = DETAIL_PATTERN.match(path)
+            book = self.books_by_slug.get(match.group(1)) if match else None
+            if book is None:
+                return None
+            body = render_detail_page(book).encode('utf-8')
+        
+        self._rendered[path] = body
+        return body
+    
+    def start(self) -> 'FakeCatalogue':
+        """Start serving in a background thread"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """Stop serving and close the socket"""
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def __enter__(self) -> 'FakeCatalogue':
+        return self.start()
+    
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a generated books.toscrape.com catalogue locally")
+    parser.add_argument('--pages', type=int, default=50, help='Number of listing pages')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of HTTP 500 responses')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of HTTP 429 responses')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with 429s')
+    parser.add_argument('--no-compress', action='store_true', help='Never gzip responses')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on')
+    args = parser.parse_args()
+    
+    site = FakeCatalogue(
+        pages=args.pages, latency=args.latency, error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate, retry_after=args.retry_after,
+        compress=not args.no_compress, port=args.port
+    )
+    print(f"Serving {args.pages} pages ({len(site.books)} books) at {site.url}/index.html (Ctrl+C to stop)")
+    site.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        site.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+"""
+Change detection between crawls of the catalogue
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class ChangeTracker:
+    """
+    SQLite store of page and product fingerprints from previous crawls
+    
+    Every listing page URL keeps a fingerprint of its body, and every
+    product keeps a fingerprint of its fields keyed by its ``url``. A page
+    whose body is unchanged is not parsed again: its products are read back
+    from the store. During a crawl ``diff_page`` returns the new and changed
+    products of each page and ``finish_run`` the removed ones, each tagged
+    with a ``change`` field. Removals are only known after a crawl of the
+    whole catalogue: a product missing from its page may have moved to a
+    page that wasn't crawled. One crawl at a time can use a tracker.
+    """
+    
+    NEW = 'new'
+    CHANGED = 'changed'
+    REMOVED = 'removed'
+    
+    def __init__(self, path: str = 'change_tracker.sqlite'):
+        """
+        Initialize the tracker
+        
+        Args:
+            path: SQLite database file (created if missing)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        # Fingerprints of changed pages, committed together with their products by diff_page
+        self._pending_pages: Dict[str, str] = {}
+        # Product URLs seen by the current crawl
+        self._seen = set()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript('''
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS products (
+                url TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                page_url TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS products_page ON products (page_url, position);
+        ''')
+        self._db.commit()
+    
+    @staticmethod
+    def page_fingerprint(content: bytes) -> str:
+        """Get the fingerprint of a page body"""
+        return hashlib.sha256(content).hexdigest()
+    
+    @staticmethod
+    def product_fingerprint(product: Dict) -> str:
+        """Get the fingerprint of a product's fields"""
+        fields = {key: value for key, value in product.items() if key != 'change'}
+        return hashlib.sha1(json.dumps(fields, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+    
+    def unchanged_page_products(self, url: str, content: bytes) -> Optional[List[Dict]]:
+        """
+        Check a freshly fetched page against its last known fingerprint
+        
+        Args:
+            url: Page URL
+            content: Raw page body
+        
+        Returns:
+            The page's stored products if the body is unchanged, otherwise
+            None (the page must be parsed; its new fingerprint is kept until
+            the page's ``diff_page``)
+        """
+        fingerprint = self.page_fingerprint(content)
+        with self._lock:
+            row = self._db.execute('SELECT fingerprint FROM pages WHERE url = ?', (url,)).fetchone()
+            if row is None or row[0] != fingerprint:
+                self._pending_pages[url] = fingerprint
+                return None
+            rows = self._db.execute(
+                'SELECT data FROM products WHERE page_url = ? ORDER BY position', (url,)
+            ).fetchall()
+        
+        # A page that had products but lost them from the store must be parsed again
+        if not rows:
+            with self._lock:
+                self._pending_pages[url] = fingerprint
+            return None
+        return [json.loads(data) for (data,) in rows]
+    
+    def start_run(self):
+        """Begin a crawl: forget which products the previous crawl saw"""
+        with self._lock:
+            self._seen = set()
+    
+    def diff_page(self, page_url: str, products: List[Dict]) -> List[Dict]:
+        """
+        Compare a crawled page's products with the store and record them
+        
+        Args:
+            page_url: Page URL
+            products: Products on the page
+        
+        Returns:
+            Products that are new or changed, each with a ``change`` field set
+            to NEW or CHANGED. Products without a URL can't be tracked and are
+            always returned as new.
+        """
+        now = time.time()
+        changes = []
+        
+        with self._lock:
+            for position, product in enumerate(products):
+                url = product.get('url')
+                if not url:
+                    changes.append({**product, 'change': self.NEW})
+                    continue
+                if url in self._seen:
+                    continue
+                self._seen.add(url)
+                
+                fingerprint = self.product_fingerprint(product)
+                row = self._db.execute('SELECT fingerprint FROM products WHERE url = ?', (url,)).fetchone()
+                if row is None or row[0] != fingerprint:
+                    changes.append({**product, 'change': self.NEW if row is None else self.CHANGED})
+                self._db.execute(
+                    'INSERT OR REPLACE INTO products VALUES (?, ?, ?, ?, ?, ?)',
+                    (url, fingerprint, page_url, position, json.dumps(product), now)
+                )
+            
+            # Products that left the page are kept (they may have moved to a page not crawled
+            # yet) but no longer belong to it, so an unchanged page never reads them back
+            on_page = {product.get('url') for product in products}
+            for (url,) in self._db.execute('SELECT url FROM products WHERE page_url = ?', (page_url,)).fetchall():
+                if url not in on_page:
+                    self._db.execute("UPDATE products SET page_url = '' WHERE url = ?", (url,))
+            
+            # The page fingerprint is only trusted once its products are stored
+            fingerprint = self._pending_pages.pop(page_url, None)
+            if fingerprint:
+                self._db.execute('INSERT OR REPLACE INTO pages VALUES (?, ?, ?)', (page_url, fingerprint, now))
+            self._db.commit()
+        
+        return changes
+    
+    def finish_run(self, complete: bool = False) -> List[Dict]:
+        """
+        End a crawl and collect the products that disappeared
+        
+        Args:
+            complete: True if the crawl covered the whole catalogue. Only then
+                is a stored product that wasn't seen removed; after a partial
+                crawl nothing is, since unseen products may just have moved
+                to a page that wasn't crawled.
+        
+        Returns:
+            Removed products with their last known fields and a ``change``
+            field set to REMOVED
+        """
+        if not complete:
+            return []
+        
+        removed = []
+        with self._lock:
+            candidates = self._db.execute('SELECT url, data FROM products').fetchall()
+            for url, data in candidates:
+                if url not in self._seen:
+                    removed.append({**json.loads(data), 'change': self.REMOVED})
+                    self._db.execute('DELETE FROM products WHERE url = ?', (url,))
+            self._db.commit()
+        
+        return removed
+    
+    def clear(self):
+        """Forget every fingerprint, so the next crawl reports all products as new"""
+        with self._lock:
+            self._pending_pages.clear()
+            self._db.execute('DELETE FROM pages')
+            self._db.execute('DELETE FROM products')
+            self._db.commit()
@@ -0,0 +1,196 @@
+"""
+On-disk checkpoints that make long crawls resumable
+"""
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+
+class CrawlCheckpoint:
+    """
+    SQLite store of completed listing pages, keyed by job ID
+    
+    Each finished page is saved together with the products extracted from
+    it, so an interrupted crawl can be resumed by its job ID and only the
+    missing pages are fetched again. A job's pages are dropped once it
+    finishes, so the store only holds crawls that can still be resumed.
+    """
+    
+    JOB_QUERY = (
+        'SELECT j.job_id, j.num_pages, j.page_count, j.created_at, j.updated_at, j.finished, '
+        '(SELECT COUNT(*) FROM pages p WHERE p.job_id = j.job_id) FROM jobs j'
+    )
+    
+    def __init__(self, path: str = 'crawl_checkpoints.sqlite'):
+        """
+        Initialize the checkpoint store
+        
+        Args:
+            path: SQLite database file (created if missing)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                num_pages INTEGER,
+                page_count INTEGER,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                finished INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                job_id TEXT NOT NULL,
+                page_number INTEGER NOT NULL,
+                products TEXT NOT NULL,
+                completed_at REAL NOT NULL,
+                PRIMARY KEY (job_id, page_number)
+            );
+        ''')
+        self._db.commit()
+    
+    @staticmethod
+    def new_job_id() -> str:
+        """Generate a fresh job ID"""
+        return uuid.uuid4().hex[:12]
+    
+    def start_job(self, job_id: str, num_pages: Optional[int]) -> Dict:
+        """
+        Register a job, or fetch it if it already exists
+        
+        Args:
+            job_id: Job ID
+            num_pages: Number of pages requested (None for all pages);
+                ignored when resuming an existing job
+        
+        Returns:
+            Job dictionary
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                'INSERT OR IGNORE INTO jobs (job_id, num_pages, created_at, updated_at) VALUES (?, ?, ?, ?)',
+                (job_id, num_pages, now, now)
+            )
+            self._db.commit()
+        return self.get_job(job_id)
+    
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        """
+        Get a job's settings and progress
+        
+        Args:
+            job_id: Job ID
+        
+        Returns:
+            Job dictionary, or None if the job is unknown
+        """
+        with self._lock:
+            row = self._db.execute(self.JOB_QUERY + ' WHERE j.job_id = ?', (job_id,)).fetchone()
+        return self._job_from_row(row) if row else None
+    
+    @staticmethod
+    def _job_from_row(row) -> Dict:
+        """Convert a jobs row into a dictionary"""
+        return {
+            'job_id': row[0],
+            'num_pages': row[1],
+            'page_count': row[2],
+            'created_at': row[3],
+            'updated_at': row[4],
+            'finished': bool(row[5]),
+            'pages_done': row[6]
+        }
+    
+    def list_jobs(self, unfinished_only: bool = False) -> List[Dict]:
+        """
+        List jobs, most recently updated first
+        
+        Args:
+            unfinished_only: Only list jobs that can still be resumed
+        
+        Returns:
+            List of job dictionaries
+        """
+        query = self.JOB_QUERY
+        if unfinished_only:
+            query += ' WHERE j.finished = 0'
+        with self._lock:
+            rows = self._db.execute(query + ' ORDER BY j.updated_at DESC').fetchall()
+        return [self._job_from_row(row) for row in rows]
+    
+    def latest_unfinished_job(self) -> Optional[Dict]:
+        """Get the most recently updated job that has not finished"""
+        jobs = self.list_jobs(unfinished_only=True)
+        return jobs[0] if jobs else None
+    
+    def set_page_count(self, job_id: str, page_count: int):
+        """Record the catalogue's total page count for a job"""
+        with self._lock:
+            self._db.execute(
+                'UPDATE jobs SET page_count = ?, updated_at = ? WHERE job_id = ?',
+                (page_count, time.time(), job_id)
+            )
+            self._db.commit()
+    
+    def save_page(self, job_id: str, page_number: int, products: List[Dict]):
+        """
+        Record a completed page and its products
+        
+        Args:
+            job_id: Job ID
+            page_number: Page number
+            products: Products extracted from the page
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)',
+                (job_id, page_number, json.dumps(products), now)
+            )
+            self._db.execute('UPDATE jobs SET updated_at = ? WHERE job_id = ?', (now, job_id))
+            self._db.commit()
+    
+    def load_pages(self, job_id: str) -> Dict[int, List[Dict]]:
+        """
+        Get the pages a job has already completed
+        
+        Args:
+            job_id: Job ID
+        
+        Returns:
+            Dictionary mapping page number to its products
+        """
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT page_number, products FROM pages WHERE job_id = ?', (job_id,)
+            ).fetchall()
+        return {page_number: json.loads(products) for page_number, products in rows}
+    
+    def finish_job(self, job_id: str):
+        """
+        Mark a job as complete so it is no longer offered for resuming
+        
+        Its saved pages are deleted, since nothing will resume from them;
+        only the job row is kept, as a record of the crawl.
+        
+        Args:
+            job_id: Job ID
+        """
+        with self._lock:
+            self._db.execute('DELETE FROM pages WHERE job_id = ?', (job_id,))
+            self._db.execute(
+                'UPDATE jobs SET finished = 1, updated_at = ? WHERE job_id = ?', (time.time(), job_id)
+            )
+            self._db.commit()
+    
+    def delete_job(self, job_id: str):
+        """Remove a job and its saved pages"""
+        with self._lock:
+            self._db.execute('DELETE FROM pages WHERE job_id = ?', (job_id,))
+            self._db.execute('DELETE FROM jobs WHERE job_id = ?', (job_id,))
+            self._db.commit()
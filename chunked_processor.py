@@ -0,0 +1,455 @@
+"""
+Out-of-core product processing for crawls too large to hold in memory
+"""
+import math
+import os
+import shutil
+import sqlite3
+import tempfile
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from data_processor import DataProcessor, IncrementalCSVWriter
+from product_columns import ProductColumns
+from tracing import tracer
+
+
+class BloomFilter:
+    """
+    Fixed-size set membership test with no false negatives
+    
+    Sized up front for ``capacity`` keys at the given false-positive rate
+    (about 1.2 bytes per key at 1%). Adding more keys than that still works
+    but the false-positive rate climbs. Keys are hashed with ``hash()``,
+    which is randomized per process, so a filter is only valid for the
+    process that built it.
+    """
+    
+    def __init__(self, capacity: int, false_positive_rate: float = 0.01):
+        """
+        Initialize an empty filter
+        
+        Args:
+            capacity: Number of keys the filter is sized for
+            false_positive_rate: Wanted chance that an unseen key tests positive
+        """
+        capacity = max(1, int(capacity))
+        self.num_bits = max(64, math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = np.zeros((self.num_bits + 7) // 8, dtype=np.uint8)
+        self._rounds = np.arange(self.num_hashes, dtype=np.uint64)
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the bit array"""
+        return self._bits.nbytes
+    
+    def _positions(self, keys: List[str]) -> np.ndarray:
+        """Get the bit positions of every key, one row per key (double hashing)"""
+        hashes = np.fromiter((hash(key) for key in keys), dtype=np.int64, count=len(keys)).view(np.uint64)
+        first = hashes & np.uint64(0xFFFFFFFF)
+        second = (hashes >> np.uint64(32)) | np.uint64(1)
+        return (first[:, None] + self._rounds * second[:, None]) % np.uint64(self.num_bits)
+    
+    def add_many(self, keys: List[str]):
+        """Add keys to the filter"""
+        if not keys:
+            return
+        positions = self._positions(keys).ravel()
+        np.bitwise_or.at(self._bits, positions >> np.uint64(3),
+                         np.left_shift(1, positions & np.uint64(7)).astype(np.uint8))
+    
+    def contains_many(self, keys: List[str]) -> np.ndarray:
+        """
+        Test keys against the filter
+        
+        Args:
+            keys: Keys to look up
+        
+        Returns:
+            Boolean array, False where a key was certainly never added
+        """
+        if not keys:
+            return np.zeros(0, dtype=bool)
+        positions = self._positions(keys)
+        bits = self._bits[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)
+        return (bits & 1).astype(bool).all(axis=1)
+
+
+class SeenIndex:
+    """
+    Exact record of the keys seen so far, kept on disk with a Bloom filter in front
+    
+    Most keys of a crawl are new, and the filter says so without touching
+    the disk; only keys the filter reports as possibly seen are looked up
+    in the SQLite index. Memory use is the filter plus SQLite's page cache,
+    however many keys are stored.
+    """
+    
+    # SQLite page cache, in KiB
+    CACHE_KIB = 8192
+    
+    # Keys per IN (...) lookup, below SQLite's bound-parameter limit
+    LOOKUP_BATCH = 900
+    
+    def __init__(self, path: Optional[str] = None, capacity: int = 1_000_000,
+                 false_positive_rate: float = 0.01):
+        """
+        Initialize the index
+        
+        Args:
+            path: SQLite file; None uses a temporary file removed by close()
+            capacity: Expected number of distinct keys (sizes the Bloom filter)
+            false_positive_rate: Bloom filter false-positive rate
+        """
+        self._temporary = path is None
+        if path is None:
+            handle, path = tempfile.mkstemp(prefix='pricespy_seen_', suffix='.sqlite')
+            os.close(handle)
+        self.path = path
+        self.bloom = BloomFilter(capacity, false_positive_rate)
+        self.lookups = 0
+        self.false_positives = 0
+        
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        # Rebuilt from scratch on every run, so durability is not needed
+        self._db.executescript(f'''
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            PRAGMA cache_size = -{self.CACHE_KIB};
+            DROP TABLE IF EXISTS seen;
+            CREATE TABLE seen (key TEXT PRIMARY KEY) WITHOUT ROWID;
+        ''')
+    
+    def _stored(self, keys: List[str]) -> set:
+        """Get which of the keys are already in the on-disk index"""
+        found = set()
+        for start in range(0, len(keys), self.LOOKUP_BATCH):
+            batch = keys[start:start + self.LOOKUP_BATCH]
+            placeholders = ','.join('?' * len(batch))
+            found.update(row[0] for row in self._db.execute(
+                f'SELECT key FROM seen WHERE key IN ({placeholders})', batch))
+        return found
+    
+    def add_new(self, keys: List[str]) -> List[bool]:
+        """
+        Record a batch of keys
+        
+        Args:
+            keys: Keys in arrival order (may repeat within the batch)
+        
+        Returns:
+            One flag per key: True for the first occurrence of a key ever seen
+        """
+        maybe_seen = self.bloom.contains_many(keys)
+        candidates = [key for key, maybe in zip(keys, maybe_seen) if maybe]
+        stored = self._stored(candidates) if candidates else set()
+        self.lookups += len(candidates)
+        self.false_positives += len(candidates) - len(stored)
+        
+        flags = []
+        new_keys = []
+        batch_keys = set()
+        for key in keys:
+            is_new = key not in stored and key not in batch_keys
+            if is_new:
+                batch_keys.add(key)
+                new_keys.append(key)
+            flags.append(is_new)
+        
+        if new_keys:
+            self.bloom.add_many(new_keys)
+            self._db.executemany('INSERT INTO seen VALUES (?)', ((key,) for key in new_keys))
+            self._db.commit()
+        return flags
+    
+    def close(self):
+        """Close the database, deleting it if it was temporary"""
+        self._db.close()
+        if self._temporary and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class ChunkedResult:
+    """
+    Processed products spilled to disk as a sequence of DataFrame chunks
+    
+    Summary statistics are gathered while the chunks are written, so they
+    are available without reading anything back. Remove the spill files
+    with ``cleanup`` (or use the result as a context manager).
+    """
+    
+    def __init__(self, directory: str):
+        """
+        Initialize an empty result
+        
+        Args:
+            directory: Directory the chunk files are written to
+        """
+        self.directory = directory
+        self.paths: List[str] = []
+        self.total_products = 0
+        self.duplicates = 0
+        self.columns: List[str] = []
+        self._dtypes: Dict[str, Optional[object]] = {}
+        self._price_sum = 0.0
+        self._price_min = math.inf
+        self._price_max = -math.inf
+        self._rating_sum = 0.0
+        self._rating_count = 0
+    
+    def __len__(self) -> int:
+        return self.total_products
+    
+    def __enter__(self) -> 'ChunkedResult':
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.cleanup()
+        return False
+    
+    def add_chunk(self, df: pd.DataFrame):
+        """Spill one processed chunk and fold it into the statistics"""
+        path = os.path.join(self.directory, f'chunk-{len(self.paths):05d}.pkl')
+        df.to_pickle(path)
+        self.paths.append(path)
+        self.total_products += len(df)
+        self.columns = [col for col in DataProcessor.COLUMN_ORDER if col in self.columns or col in df.columns]
+        self._merge_dtypes(df)
+        
+        if 'price_numeric' in df.columns:
+            prices = DataProcessor.widen_float_column(df['price_numeric'])
+            self._price_sum += float(prices.sum())
+            self._price_min = min(self._price_min, float(prices.min()))
+            self._price_max = max(self._price_max, float(prices.max()))
+        if 'rating' in df.columns:
+            ratings = df['rating'].astype(float)
+            self._rating_sum += float(ratings.sum())
+            self._rating_count += int(ratings.count())
+    
+    def _merge_dtypes(self, df: pd.DataFrame):
+        """
+        Widen each column's dtype to cover this chunk too
+        
+        Every chunk infers its own dtypes, so a column of whole numbers is
+        int64 in a chunk without gaps and float64 in one with a missing
+        value. The widest dtype seen is what the whole crawl would have got
+        in one DataFrame. A chunk without the column only needs it to hold
+        missing values.
+        """
+        for col in self.columns:
+            if col not in df.columns:
+                self._dtypes[col] = self._nullable(col, self._dtypes[col]) if col in self._dtypes else None
+                continue
+            dtype = df[col].dtype
+            if col not in self._dtypes:
+                # First chunk with the column; any earlier chunk lacked it
+                self._dtypes[col] = self._nullable(col, dtype) if len(self.paths) > 1 else dtype
+            elif self._dtypes[col] is None:
+                self._dtypes[col] = self._nullable(col, dtype)
+            else:
+                self._dtypes[col] = self._common_dtype(self._dtypes[col], dtype)
+    
+    @staticmethod
+    def _nullable(col: str, dtype):
+        """The dtype a numpy int or bool column gets once a value is missing"""
+        if isinstance(dtype, np.dtype) and dtype.kind in 'iu':
+            # Byte fields switch to pandas' nullable Int8, other whole numbers to float
+            return pd.Int8Dtype() if col in ProductColumns.BYTE_FIELDS else np.dtype('float64')
+        if isinstance(dtype, np.dtype) and dtype.kind == 'b':
+            return np.dtype(object)
+        return dtype
+    
+    @staticmethod
+    def _common_dtype(first, second):
+        """Smallest dtype holding both, with categoricals left to pandas"""
+        if first == second or isinstance(first, pd.CategoricalDtype) or isinstance(second, pd.CategoricalDtype):
+            return first
+        if first.kind in 'iuf' and second.kind in 'iuf':
+            common = np.result_type(getattr(first, 'numpy_dtype', first), getattr(second, 'numpy_dtype', second))
+            for dtype in (first, second):
+                # Keep the nullable dtype a chunk with gaps got (Int8 ratings)
+                if isinstance(dtype, pd.api.extensions.ExtensionDtype) and dtype.numpy_dtype == common:
+                    return dtype
+            return common
+        return np.dtype(object)
+    
+    def iter_frames(self) -> Iterator[pd.DataFrame]:
+        """Read the chunks back one at a time, each with every result column"""
+        for path in self.paths:
+            df = pd.read_pickle(path).reindex(columns=self.columns)
+            for col in self.columns:
+                dtype = self._dtypes[col]
+                if dtype is not None and not isinstance(dtype, pd.CategoricalDtype) and df[col].dtype != dtype:
+                    df[col] = df[col].astype(dtype)
+            yield df
+    
+    def to_frame(self) -> pd.DataFrame:
+        """Load every chunk into one DataFrame (only if it fits in memory)"""
+        if not self.paths:
+            return pd.DataFrame()
+        return pd.concat(self.iter_frames(), ignore_index=True)
+    
+    def get_summary_stats(self) -> Dict[str, float]:
+        """Get the same statistics as DataProcessor.get_summary_stats, over every chunk"""
+        if not self.total_products:
+            return DataProcessor.get_summary_stats(pd.DataFrame())
+        
+        stats = {'total_products': self.total_products}
+        if 'price_numeric' in self.columns:
+            stats['avg_price'] = self._price_sum / self.total_products
+            stats['min_price'] = self._price_min
+            stats['max_price'] = self._price_max
+        if 'rating' in self.columns:
+            stats['avg_rating'] = self._rating_sum / self._rating_count if self._rating_count else math.nan
+        return stats
+    
+    def save_to_csv(self, filename: str) -> bool:
+        """
+        Write every chunk to one CSV file, one chunk in memory at a time
+        
+        Args:
+            filename: Output filename
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            # Every chunk is written as soon as it is read; the file appears complete or not at all
+            with IncrementalCSVWriter(filename, buffer_rows=1, columns=self.columns) as writer:
+                for df in self.iter_frames():
+                    writer.write(df)
+            return True
+        except Exception as e:
+            print(f"Error saving to CSV: {e}")
+            return False
+    
+    def cleanup(self):
+        """Delete the spilled chunks"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.paths = []
+
+
+class ChunkedProcessor:
+    """
+    Deduplicate and clean products in fixed-size chunks under a memory budget
+    
+    Products are deduplicated against a SeenIndex as they stream in,
+    collected into ProductColumns, and every ``chunk_size`` unique products
+    are cleaned and spilled to disk. Memory use is bounded by one chunk
+    plus the Bloom filter, however large the crawl::
+        
+        processor = ChunkedProcessor(memory_budget_mb=256, expected_products=5_000_000)
+        with processor.process(scraper.iter_products()) as result:
+            result.save_to_csv('products.csv')
+    """
+    
+    # Peak bytes per product while a chunk is collected, cleaned and spilled
+    BYTES_PER_PRODUCT = 1200
+    
+    # Memory set aside for the interpreter, pandas and SQLite's page cache
+    BASE_MEMORY_MB = 96
+    
+    # Products checked against the seen index at once
+    DEDUP_BATCH = 4096
+    
+    def __init__(self, chunk_size: Optional[int] = None, memory_budget_mb: Optional[float] = None,
+                 spill_dir: Optional[str] = None, expected_products: int = 1_000_000,
+                 false_positive_rate: float = 0.01, key: str = 'url'):
+        """
+        Initialize the processor
+        
+        Args:
+            chunk_size: Unique products per chunk; derived from
+                memory_budget_mb when not given (100,000 without either)
+            memory_budget_mb: Total memory the processing may use
+            spill_dir: Where chunk files and the seen index go (system
+                temporary directory by default)
+            expected_products: Products the crawl is expected to yield,
+                used to size the Bloom filter
+            false_positive_rate: Bloom filter false-positive rate; each
+                false positive costs one index lookup, never a wrong result
+            key: Field identifying a product
+        """
+        self.spill_dir = spill_dir
+        self.expected_products = expected_products
+        self.false_positive_rate = false_positive_rate
+        self.key = key
+        
+        if chunk_size is None:
+            if memory_budget_mb is None:
+                chunk_size = 100_000
+            else:
+                bloom_bytes = BloomFilter(expected_products, false_positive_rate).nbytes
+                available = (memory_budget_mb - self.BASE_MEMORY_MB) * 1024 * 1024 - bloom_bytes
+                if available < 1000 * self.BYTES_PER_PRODUCT:
+                    raise ValueError(f"A {memory_budget_mb} MB budget leaves no room for a chunk of products")
+                chunk_size = int(available // self.BYTES_PER_PRODUCT)
+        self.chunk_size = max(1, int(chunk_size))
+    
+    def process(self, products: Iterable[Dict]) -> ChunkedResult:
+        """
+        Deduplicate, clean and spill products
+        
+        Args:
+            products: Any iterable of product dictionaries (e.g. the
+                generator returned by ProductScraper.iter_products)
+        
+        Returns:
+            ChunkedResult holding the spilled chunks
+        """
+        if self.spill_dir:
+            os.makedirs(self.spill_dir, exist_ok=True)
+        result = ChunkedResult(tempfile.mkdtemp(prefix='pricespy_chunks_', dir=self.spill_dir))
+        index = SeenIndex(os.path.join(result.directory, 'seen.sqlite'),
+                          self.expected_products, self.false_positive_rate)
+        
+        columns = ProductColumns(key=None)
+        pending = []
+        # Never take more than the chunk has room for, so a chunk can't outgrow chunk_size
+        batch_size = min(self.DEDUP_BATCH, self.chunk_size)
+        try:
+            for product in products:
+                pending.append(product)
+                if len(pending) >= batch_size:
+                    self._add_unique(pending, index, columns, result)
+                    pending = []
+                    if len(columns) >= self.chunk_size:
+                        self._spill(columns, result)
+                        columns = ProductColumns(key=None)
+                    batch_size = min(self.DEDUP_BATCH, self.chunk_size - len(columns))
+            self._add_unique(pending, index, columns, result)
+            if len(columns):
+                self._spill(columns, result)
+        except BaseException:
+            result.cleanup()
+            raise
+        finally:
+            index.close()
+        
+        if result.duplicates > 0:
+            print(f"Removed {result.duplicates} duplicate products")
+        if index.lookups:
+            print(f"Seen index: {index.lookups} disk lookups, {index.false_positives} Bloom false positives")
+        return result
+    
+    def _add_unique(self, batch: List[Dict], index: SeenIndex, columns: ProductColumns, result: ChunkedResult):
+        """Add the products of a batch whose key was never seen (products without one are kept)"""
+        keyed = [product for product in batch if product.get(self.key)]
+        is_new = iter(index.add_new([product[self.key] for product in keyed]))
+        for product in batch:
+            if not product.get(self.key) or next(is_new):
+                columns.append(product)
+            else:
+                result.duplicates += 1
+    
+    def _spill(self, columns: ProductColumns, result: ChunkedResult):
+        """Clean one chunk and write it to disk"""
+        with metrics.PROCESS_SECONDS.time(), tracer.span('process_chunk', 'processing', products=len(columns)):
+            df = DataProcessor.clean_frame(columns.to_frame())
+            result.add_chunk(df)
+        metrics.PRODUCTS_PROCESSED.inc(len(df))
+        print(f"Spilled chunk {len(result.paths)} ({len(df)} products)")
@@ -0,0 +1,167 @@
+"""
+Per-host circuit breaker that stops hammering a site that is down
+"""
+import threading
+import time
+from typing import Dict
+from urllib.parse import urlparse
+
+
+class HostCircuit:
+    """Circuit state of a single host"""
+    
+    def __init__(self):
+        self.state = CircuitBreaker.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started = None
+        # When the circuit first opened since the host last answered (None while closed)
+        self.down_since = None
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker
+    
+    After ``failure_threshold`` consecutive failures the host's circuit
+    opens and requests to it are refused without being sent. Once
+    ``reset_timeout`` has passed the circuit half-opens and lets a single
+    probe request through: if it succeeds the circuit closes again, if it
+    fails the circuit reopens for another ``reset_timeout``.
+    
+    Refused requests are meant to be retried once the circuit lets a probe
+    through, not counted as failed attempts; ``outage`` tells callers how
+    long the host has been down so they can give up after ``max_outage``.
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, max_outage: float = 600.0):
+        """
+        Initialize the circuit breaker
+        
+        Args:
+            failure_threshold: Consecutive failures that open a host's circuit
+                (0 or less disables the breaker)
+            reset_timeout: Seconds an open circuit waits before letting a
+                probe request through
+            max_outage: Seconds a host may stay down before requests refused
+                by its circuit are given up on
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_outage = max_outage
+        self._circuits: Dict[str, HostCircuit] = {}
+        self._lock = threading.Lock()
+    
+    def _circuit(self, url: str) -> HostCircuit:
+        """Get (or create) the circuit for the host of a URL (caller holds the lock)"""
+        host = urlparse(url).netloc.lower()
+        circuit = self._circuits.get(host)
+        if circuit is None:
+            circuit = HostCircuit()
+            self._circuits[host] = circuit
+        return circuit
+    
+    def allow(self, url: str) -> bool:
+        """
+        Check whether a request to the host of ``url`` may be sent
+        
+        Args:
+            url: URL about to be requested
+        
+        Returns:
+            True if the circuit is closed, or if this request is the probe
+            of a half-open circuit
+        """
+        if self.failure_threshold <= 0:
+            return True
+        
+        with self._lock:
+            circuit = self._circuit(url)
+            if circuit.state == self.CLOSED:
+                return True
+            
+            now = time.monotonic()
+            if circuit.state == self.OPEN:
+                if now - circuit.opened_at < self.reset_timeout:
+                    return False
+                circuit.state = self.HALF_OPEN
+                circuit.probe_started = None
+            
+            # Half-open: one probe at a time; a probe that never reported back is replaced
+            if circuit.probe_started is not None and now - circuit.probe_started < self.reset_timeout:
+                return False
+            circuit.probe_started = now
+            return True
+    
+    def retry_in(self, url: str) -> float:
+        """
+        Get the time until a refused request to the host of ``url`` is worth retrying
+        
+        Args:
+            url: Refused URL
+        
+        Returns:
+            Delay in seconds
+        """
+        with self._lock:
+            circuit = self._circuit(url)
+            if circuit.state == self.OPEN:
+                return max(0.0, circuit.opened_at + self.reset_timeout - time.monotonic())
+            if circuit.state == self.HALF_OPEN:
+                # The probe is in flight; check back soon rather than waiting out its timeout
+                return min(1.0, self.reset_timeout)
+            return 0.0
+    
+    def outage(self, url: str) -> float:
+        """
+        Get how long the host of ``url`` has been down
+        
+        Args:
+            url: Any URL on the host
+        
+        Returns:
+            Seconds since its circuit first opened, 0 while it is closed
+        """
+        with self._lock:
+            circuit = self._circuit(url)
+            if circuit.down_since is None:
+                return 0.0
+            return time.monotonic() - circuit.down_since
+    
+    def record_success(self, url: str):
+        """Report that the host of ``url`` answered, closing its circuit"""
+        with self._lock:
+            circuit = self._circuit(url)
+            if circuit.state != self.CLOSED:
+                print(f"Circuit for {urlparse(url).netloc} closed, host recovered")
+            circuit.state = self.CLOSED
+            circuit.failures = 0
+            circuit.probe_started = None
+            circuit.down_since = None
+    
+    def record_failure(self, url: str):
+        """Report that a request to the host of ``url`` failed"""
+        if self.failure_threshold <= 0:
+            return
+        
+        with self._lock:
+            circuit = self._circuit(url)
+            circuit.failures += 1
+            if circuit.state == self.HALF_OPEN or circuit.failures >= self.failure_threshold:
+                if circuit.state != self.OPEN:
+                    print(f"Circuit for {urlparse(url).netloc} opened after {circuit.failures} "
+                          f"consecutive failures, pausing it for {self.reset_timeout:g}s")
+                circuit.state = self.OPEN
+                circuit.opened_at = time.monotonic()
+                circuit.probe_started = None
+                if circuit.down_since is None:
+                    circuit.down_since = circuit.opened_at
+    
+    def state(self, url: str) -> str:
+        """Get the circuit state (CLOSED, OPEN or HALF_OPEN) of the host of ``url``"""
+        with self._lock:
+            return self._circuit(url).state
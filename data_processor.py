@@ -1,14 +1,47 @@
 """
 Data processing module for cleaning and exporting scraped product data
 """
+import numpy as np
+import os
 import pandas as pd
 import re
-from typing import List, Dict
+from abc import ABC, abstractmethod
+from typing import List, Dict, Iterable, Optional, Union
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+import metrics
+from product_columns import ProductColumns
+from tracing import tracer
 
 
 class DataProcessor:
     """Process and export scraped product data"""
     
+    # output_format -> file extension, for the formats save() can write
+    OUTPUT_FORMATS = {
+        'csv': '.csv',
+        'excel': '.xlsx',
+        'parquet': '.parquet',
+        'feather': '.feather',
+        'jsonl': '.jsonl'
+    }
+    
+    # Formats written through pyarrow
+    ARROW_FORMATS = ('parquet', 'feather')
+    
+    PARQUET_COMPRESSIONS = ('snappy', 'zstd')
+    
+    # Rows converted to JSON at a time by save_to_jsonl
+    JSONL_CHUNK_ROWS = 50_000
+    
+    # Columns of a processed DataFrame, in display order (other fields are dropped)
+    COLUMN_ORDER = ['title', 'price', 'price_numeric', 'rating', 'availability', 'url',
+                    'upc', 'category', 'stock_count', 'description', 'change']
+    
     @staticmethod
     def normalize_price(price_str: str) -> float:
         """
@@ -16,7 +49,7 @@ class DataProcessor:
         
         Args:
             price_str: Price string (e.g., '£51.77')
-            
+        
         Returns:
             Float value of price
         """
@@ -38,7 +71,7 @@ class DataProcessor:
         
         Args:
             availability_str: Raw availability string
-            
+        
         Returns:
             Cleaned availability status
         """
@@ -57,13 +90,92 @@ class DataProcessor:
             return cleaned
     
     @staticmethod
-    def deduplicate_products(products: List[Dict]) -> List[Dict]:
+    def normalize_price_column(prices: pd.Series) -> pd.Series:
+        """
+        Convert a column of price strings to floats, like normalize_price
+        
+        Each distinct price is converted once, with vectorized string
+        operations, and the results are spread back over the rows.
+        
+        Args:
+            prices: Column of price strings
+        
+        Returns:
+            Float column with the same index (0.0 where normalize_price gives 0.0)
+        """
+        codes, uniques = pd.factorize(prices)
+        uniques = pd.Series(uniques, dtype=object)
+        
+        cleaned = uniques.str.replace(r'[^\d.]', '', regex=True)
+        values = pd.to_numeric(cleaned, errors='coerce')
+        
+        # float() accepts a few spellings to_numeric doesn't (e.g. non-ASCII digits)
+        retry = values.isna() & cleaned.str.len().gt(0)
+        if retry.any():
+            values[retry] = uniques[retry].map(DataProcessor.normalize_price)
+        
+        # Missing prices have code -1, which picks the trailing 0.0
+        values = np.append(values.fillna(0.0).to_numpy(dtype=float), 0.0)
+        return pd.Series(values[codes], index=prices.index)
+    
+    @staticmethod
+    def clean_availability_column(values: pd.Series) -> pd.Series:
+        """
+        Clean a column of availability strings, like clean_availability
+        
+        Args:
+            values: Column of raw availability strings
+        
+        Returns:
+            Column of cleaned statuses with the same index
+        """
+        codes, uniques = pd.factorize(values)
+        uniques = pd.Series(uniques, dtype=object)
+        
+        cleaned = uniques.str.strip()
+        lowered = cleaned.str.lower()
+        statuses = np.select(
+            [uniques.eq(''), lowered.str.contains('in stock', regex=False, na=False),
+             lowered.str.contains('out of stock', regex=False, na=False)],
+            ['Unknown', 'In stock', 'Out of stock'],
+            default=cleaned.to_numpy(dtype=object)
+        ).astype(object)
+        
+        # Missing values have code -1, which picks the trailing "Unknown"
+        statuses = np.append(statuses, 'Unknown').astype(object)
+        return pd.Series(statuses[codes], index=values.index, dtype=object)
+    
+    @staticmethod
+    def widen_float_column(values: pd.Series) -> pd.Series:
+        """
+        Convert a float column to float64 without float32 rounding noise
+        
+        A float32 51.77 is 51.77000045776367 as a double; going through the
+        shortest repr of each distinct value gives back 51.77.
+        
+        Args:
+            values: Numeric column
+        
+        Returns:
+            float64 column with the same index
+        """
+        if values.dtype != np.float32:
+            return values.astype(float)
+        
+        codes, uniques = pd.factorize(values)
+        widened = pd.Series(uniques, dtype=np.float32).astype(str).astype(float).to_numpy()
+        # Missing values have code -1, which picks the trailing NaN
+        return pd.Series(np.append(widened, np.nan)[codes], index=values.index)
+    
+    @staticmethod
+    def deduplicate_products(products: Iterable[Dict]) -> List[Dict]:
         """
         Remove duplicate products based on URL
         
         Args:
-            products: List of product dictionaries
-            
+            products: List (or any iterable, e.g. a generator streaming
+                products as they are scraped) of product dictionaries
+        
         Returns:
             Deduplicated list of products
         """
@@ -73,8 +185,10 @@ class DataProcessor:
         # Use URL as the unique identifier
         seen_urls = set()
         unique_products = []
+        total = 0
         
         for product in products:
+            total += 1
             url = product.get('url')
             if url and url not in seen_urls:
                 seen_urls.add(url)
@@ -83,43 +197,99 @@ class DataProcessor:
                 # If no URL, keep it anyway (shouldn't happen with our scraper)
                 unique_products.append(product)
         
-        duplicates_removed = len(products) - len(unique_products)
+        duplicates_removed = total - len(unique_products)
         if duplicates_removed > 0:
             print(f"Removed {duplicates_removed} duplicate products")
         
         return unique_products
     
     @staticmethod
-    def process_products(products: List[Dict]) -> pd.DataFrame:
+    def drop_duplicate_urls(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Drop rows whose URL already appeared earlier (vectorized)
+        
+        Like df.drop_duplicates('url'), except that rows without a URL are
+        all kept, as deduplicate_products does.
+        
+        Args:
+            df: Product rows
+        
+        Returns:
+            DataFrame without the repeated rows (index renumbered from 0)
+        """
+        if 'url' not in df.columns:
+            return df
+        urls = df['url']
+        keep = ~urls.duplicated() | urls.fillna('').eq('')
+        if keep.all():
+            return df
+        return df[keep.to_numpy()].reset_index(drop=True)
+    
+    @staticmethod
+    def process_products(products: Union[Iterable[Dict], ProductColumns]) -> pd.DataFrame:
         """
         Process raw product data into a clean DataFrame
         
         Args:
-            products: List of product dictionaries
-            
+            products: List (or any iterable, e.g. a generator streaming
+                products as they are scraped) of product dictionaries, or a
+                ProductColumns buffer they were collected into
+        
         Returns:
-            Processed pandas DataFrame
+            Processed pandas DataFrame with compact dtypes: categorical
+            availability, float32 price_numeric and int8 rating (Int8 if
+            some ratings are missing); price stays a column of strings
         """
+        with metrics.PROCESS_SECONDS.time(), tracer.span('process_products', 'processing'):
+            df = DataProcessor._process_products(products)
+        metrics.PRODUCTS_PROCESSED.inc(len(df))
+        return df
+    
+    @staticmethod
+    def _process_products(products: Union[Iterable[Dict], ProductColumns]) -> pd.DataFrame:
+        """Deduplicate and clean products (process_products without the timing)"""
         if not products:
             return pd.DataFrame()
         
-        # Deduplicate first
-        unique_products = DataProcessor.deduplicate_products(products)
+        # Collect into columns without a per-row seen-set; duplicates are dropped on the
+        # frame. A buffer built elsewhere may already have dropped some as they arrived.
+        if not isinstance(products, ProductColumns):
+            products = ProductColumns(products, key=None)
+        if not products:
+            return pd.DataFrame()
         
-        # Convert to DataFrame
-        df = pd.DataFrame(unique_products)
+        df = products.to_frame()
+        unique = DataProcessor.drop_duplicate_urls(df)
+        duplicates = products.duplicates + len(df) - len(unique)
+        if duplicates > 0:
+            print(f"Removed {duplicates} duplicate products")
         
-        # Normalize price column
+        return DataProcessor.clean_frame(unique)
+    
+    @staticmethod
+    def clean_frame(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Clean a DataFrame of already deduplicated products
+        
+        Args:
+            df: Raw product columns, e.g. from ProductColumns.to_frame
+        
+        Returns:
+            DataFrame with price_numeric added, availability cleaned and
+            the columns in display order
+        """
+        # Normalize price column. float32 holds about 7 significant digits and no
+        # two-decimal price exactly; prices below 100,000 still come back unchanged
+        # through widen_float_column, larger ones (and sums) pick up rounding error
         if 'price' in df.columns:
-            df['price_numeric'] = df['price'].apply(DataProcessor.normalize_price)
+            df['price_numeric'] = DataProcessor.normalize_price_column(df['price']).astype(np.float32)
         
         # Clean availability column
         if 'availability' in df.columns:
-            df['availability'] = df['availability'].apply(DataProcessor.clean_availability)
+            df['availability'] = DataProcessor.clean_availability_column(df['availability']).astype('category')
         
         # Reorder columns for better readability
-        column_order = ['title', 'price', 'price_numeric', 'rating', 'availability', 'url']
-        existing_columns = [col for col in column_order if col in df.columns]
+        existing_columns = [col for col in DataProcessor.COLUMN_ORDER if col in df.columns]
         df = df[existing_columns]
         
         return df
@@ -132,12 +302,13 @@ class DataProcessor:
         Args:
             df: DataFrame to save
             filename: Output filename
-            
+        
         Returns:
             True if successful, False otherwise
         """
         try:
-            df.to_csv(filename, index=False, encoding='utf-8')
+            with metrics.EXPORT_SECONDS.time(format='csv'), tracer.span('save_to_csv', 'processing'):
+                df.to_csv(filename, index=False, encoding='utf-8')
             print(f"Data saved to {filename}")
             return True
         except Exception as e:
@@ -152,12 +323,15 @@ class DataProcessor:
         Args:
             df: DataFrame to save
             filename: Output filename
-            
+        
         Returns:
             True if successful, False otherwise
         """
         try:
-            with pd.ExcelWriter(filename, engine='openpyxl') as writer:
+            with metrics.EXPORT_SECONDS.time(format='excel'), tracer.span('save_to_excel', 'processing'), \
+                    pd.ExcelWriter(filename, engine='openpyxl') as writer:
+                # Excel cells hold doubles, so float32 columns are widened first
+                df = DataProcessor._widen_float32_columns(df)
                 df.to_excel(writer, index=False, sheet_name='Products')
                 
                 # Auto-adjust column widths
@@ -177,6 +351,162 @@ class DataProcessor:
             print(f"Error saving to Excel: {e}")
             return False
     
+    @staticmethod
+    def save_to_parquet(df: pd.DataFrame, filename: str, compression: str = 'snappy') -> bool:
+        """
+        Save DataFrame to a Parquet file (requires pyarrow)
+        
+        Column types are kept (categoricals are stored dictionary-encoded),
+        and the file is typically a fraction of the CSV size and much faster
+        to read back.
+        
+        Args:
+            df: DataFrame to save
+            filename: Output filename
+            compression: 'snappy' (faster) or 'zstd' (smaller)
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            if compression not in DataProcessor.PARQUET_COMPRESSIONS:
+                raise ValueError(f"Unknown compression '{compression}', expected one of "
+                                 f"{', '.join(DataProcessor.PARQUET_COMPRESSIONS)}")
+            DataProcessor._require_pyarrow('parquet')
+            with metrics.EXPORT_SECONDS.time(format='parquet'), tracer.span('save_to_parquet', 'processing'):
+                df.to_parquet(filename, engine='pyarrow', compression=compression, index=False)
+            print(f"Data saved to {filename}")
+            return True
+        except Exception as e:
+            print(f"Error saving to Parquet: {e}")
+            return False
+    
+    @staticmethod
+    def save_to_feather(df: pd.DataFrame, filename: str) -> bool:
+        """
+        Save DataFrame to a Feather (Arrow IPC) file (requires pyarrow)
+        
+        Args:
+            df: DataFrame to save
+            filename: Output filename
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            DataProcessor._require_pyarrow('feather')
+            with metrics.EXPORT_SECONDS.time(format='feather'), tracer.span('save_to_feather', 'processing'):
+                # Feather stores no index, so it must be the default one
+                df.reset_index(drop=True).to_feather(filename)
+            print(f"Data saved to {filename}")
+            return True
+        except Exception as e:
+            print(f"Error saving to Feather: {e}")
+            return False
+    
+    @staticmethod
+    def save_to_jsonl(df: pd.DataFrame, filename: str) -> bool:
+        """
+        Save DataFrame as JSON Lines, one product object per line
+        
+        Rows are converted JSONL_CHUNK_ROWS at a time, so only one chunk of
+        JSON text is in memory at once.
+        
+        Args:
+            df: DataFrame to save
+            filename: Output filename
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            with metrics.EXPORT_SECONDS.time(format='jsonl'), tracer.span('save_to_jsonl', 'processing'), \
+                    open(filename, 'w', encoding='utf-8', newline='') as f:
+                for start in range(0, len(df), DataProcessor.JSONL_CHUNK_ROWS):
+                    chunk = DataProcessor._widen_float32_columns(df.iloc[start:start + DataProcessor.JSONL_CHUNK_ROWS])
+                    f.write(chunk.to_json(orient='records', lines=True, force_ascii=False))
+            print(f"Data saved to {filename}")
+            return True
+        except Exception as e:
+            print(f"Error saving to JSONL: {e}")
+            return False
+    
+    @staticmethod
+    def save(df: pd.DataFrame, filename: str, output_format: str, compression: Optional[str] = None) -> bool:
+        """
+        Save DataFrame in one of OUTPUT_FORMATS
+        
+        Args:
+            df: DataFrame to save
+            filename: Output filename
+            output_format: Key of OUTPUT_FORMATS
+            compression: Parquet compression (default snappy); ignored by other formats
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        if output_format == 'csv':
+            return DataProcessor.save_to_csv(df, filename)
+        if output_format == 'excel':
+            return DataProcessor.save_to_excel(df, filename)
+        if output_format == 'parquet':
+            return DataProcessor.save_to_parquet(df, filename, compression or 'snappy')
+        if output_format == 'feather':
+            return DataProcessor.save_to_feather(df, filename)
+        if output_format == 'jsonl':
+            return DataProcessor.save_to_jsonl(df, filename)
+        print(f"Error saving: unknown output format '{output_format}'")
+        return False
+    
+    @staticmethod
+    def open_writer(output_format: str, filename: str,
+                    buffer_rows: int = 10_000) -> Optional['IncrementalWriter']:
+        """
+        Open an incremental writer for a format that supports appending
+        
+        Args:
+            output_format: Key of OUTPUT_FORMATS
+            filename: Final output filename
+            buffer_rows: Rows held in memory before they are written out
+        
+        Returns:
+            IncrementalCSVWriter or IncrementalJSONLWriter, or None if the
+            format can only be written in one go
+        """
+        writer_class = INCREMENTAL_WRITERS.get(output_format)
+        return writer_class(filename, buffer_rows) if writer_class else None
+    
+    @staticmethod
+    def format_unavailable(output_format: str) -> Optional[str]:
+        """
+        Check whether an output format can be written here
+        
+        Args:
+            output_format: Key of OUTPUT_FORMATS
+        
+        Returns:
+            Reason it can't be written, or None if it can
+        """
+        if output_format not in DataProcessor.OUTPUT_FORMATS:
+            return f"Unknown output format '{output_format}', expected one of {', '.join(DataProcessor.OUTPUT_FORMATS)}"
+        if output_format in DataProcessor.ARROW_FORMATS and pyarrow is None:
+            return f"{output_format.capitalize()} output requires the pyarrow package: pip install pyarrow"
+        return None
+    
+    @staticmethod
+    def _require_pyarrow(output_format: str):
+        """Raise ImportError if pyarrow is needed for a format but not installed"""
+        if pyarrow is None:
+            raise ImportError(f"{output_format.capitalize()} output requires the pyarrow package: pip install pyarrow")
+    
+    @staticmethod
+    def _widen_float32_columns(df: pd.DataFrame) -> pd.DataFrame:
+        """Get df with float32 columns widened by widen_float_column, for text and Excel output"""
+        float32_columns = df.select_dtypes(np.float32).columns
+        if not len(float32_columns):
+            return df
+        return df.assign(**{col: DataProcessor.widen_float_column(df[col]) for col in float32_columns})
+    
     @staticmethod
     def get_summary_stats(df: pd.DataFrame) -> Dict[str, any]:
         """
@@ -184,7 +514,7 @@ class DataProcessor:
         
         Args:
             df: DataFrame to analyze
-            
+        
         Returns:
             Dictionary with summary statistics
         """
@@ -201,12 +531,179 @@ class DataProcessor:
             'total_products': len(df)
         }
         
+        # Plain floats, so the stats stay JSON serializable whatever the column dtypes
         if 'price_numeric' in df.columns:
-            stats['avg_price'] = df['price_numeric'].mean()
-            stats['min_price'] = df['price_numeric'].min()
-            stats['max_price'] = df['price_numeric'].max()
+            prices = DataProcessor.widen_float_column(df['price_numeric'])
+            stats['avg_price'] = float(prices.mean())
+            stats['min_price'] = float(prices.min())
+            stats['max_price'] = float(prices.max())
         
         if 'rating' in df.columns:
-            stats['avg_rating'] = df['rating'].mean()
+            stats['avg_rating'] = float(df['rating'].astype(float).mean())
         
         return stats
+
+
+class IncrementalWriter(ABC):
+    """
+    Output file that takes processed rows batch by batch while a crawl runs
+    
+    Rows go to ``<filename>.part``; they are buffered up to ``buffer_rows``
+    and then written and synced, so memory stays bounded and a crash loses
+    at most one buffer. ``close`` renames the finished file into place in
+    one step, so ``filename`` never holds a half-written result. Used as a
+    context manager, an exception leaves the partial file behind instead::
+        
+        with DataProcessor.open_writer('csv', 'products.csv') as writer:
+            for batch in batches:
+                writer.write(DataProcessor.clean_frame(batch))
+    """
+    
+    FORMAT = None
+    
+    def __init__(self, filename: str, buffer_rows: int = 10_000, columns: Optional[List[str]] = None):
+        """
+        Open the temporary file
+        
+        Args:
+            filename: Final output filename
+            buffer_rows: Rows held in memory before they are written out
+            columns: Output columns (default: those of the first batch)
+        """
+        self.filename = filename
+        self.temp_filename = filename + '.part'
+        self.buffer_rows = max(1, int(buffer_rows))
+        self.columns = list(columns) if columns is not None else None
+        self.rows_written = 0
+        self.closed = False
+        self._buffer: List[pd.DataFrame] = []
+        self._buffered_rows = 0
+        self._file = open(self.temp_filename, 'w', encoding='utf-8', newline='')
+    
+    def __enter__(self) -> 'IncrementalWriter':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+    
+    def write(self, df: pd.DataFrame):
+        """
+        Add a batch of processed rows
+        
+        The first non-empty batch fixes the columns; later batches are
+        aligned to them (missing columns are left empty, extra ones dropped).
+        
+        Args:
+            df: Processed rows, e.g. from DataProcessor.clean_frame
+        """
+        if self.closed:
+            raise ValueError(f"{self.filename} is already closed")
+        if df.empty:
+            return
+        if self.columns is None:
+            self.columns = list(df.columns)
+        self._buffer.append(df)
+        self._buffered_rows += len(df)
+        if self._buffered_rows >= self.buffer_rows:
+            self.flush()
+    
+    def flush(self):
+        """Write the buffered rows and sync them to disk"""
+        if not self._buffer:
+            return
+        frame = pd.concat(self._buffer, ignore_index=True).reindex(columns=self.columns)
+        self._buffer = []
+        self._buffered_rows = 0
+        
+        with metrics.EXPORT_SECONDS.time(format=self.FORMAT), tracer.span('write_batch', 'processing',
+                                                                          format=self.FORMAT, rows=len(frame)):
+            self._write_rows(frame)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self.rows_written += len(frame)
+    
+    @abstractmethod
+    def _write_rows(self, df: pd.DataFrame):
+        """Append rows to the open file (implemented by each format)"""
+    
+    @abstractmethod
+    def _write_empty(self):
+        """Write what an empty result looks like (called when no row was written)"""
+    
+    def close(self):
+        """
+        Write what is left and move the file to its final name
+        
+        If writing fails, the file is closed anyway and left under its
+        temporary name, as by abort.
+        """
+        if self.closed:
+            return
+        try:
+            self.flush()
+            if not self.rows_written:
+                self._write_empty()
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        finally:
+            self._file.close()
+            self.closed = True
+        os.replace(self.temp_filename, self.filename)
+        print(f"Data saved to {self.filename}")
+    
+    def abort(self):
+        """Stop writing and keep the rows written so far in the .part file"""
+        if self.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._file.close()
+            self.closed = True
+        print(f"Partial results kept in {self.temp_filename} ({self.rows_written} rows)")
+    
+    def discard(self):
+        """Stop writing and delete the partial file"""
+        if not self.closed:
+            self._file.close()
+            self.closed = True
+        if os.path.exists(self.temp_filename):
+            os.remove(self.temp_filename)
+
+
+class IncrementalCSVWriter(IncrementalWriter):
+    """Incremental writer producing the same file as DataProcessor.save_to_csv"""
+    
+    FORMAT = 'csv'
+    
+    def _write_rows(self, df: pd.DataFrame):
+        df.to_csv(self._file, index=False, header=self.rows_written == 0)
+    
+    def _write_empty(self):
+        if self.columns:
+            pd.DataFrame(columns=self.columns).to_csv(self._file, index=False)
+
+
+class IncrementalJSONLWriter(IncrementalWriter):
+    """Incremental writer producing the same file as DataProcessor.save_to_jsonl"""
+    
+    FORMAT = 'jsonl'
+    
+    def _write_rows(self, df: pd.DataFrame):
+        df = DataProcessor._widen_float32_columns(df)
+        self._file.write(df.to_json(orient='records', lines=True, force_ascii=False))
+    
+    def _write_empty(self):
+        # An empty JSON Lines file has no lines at all
+        pass
+
+
+# output_format -> writer class, for the formats that can be appended to
+INCREMENTAL_WRITERS = {
+    'csv': IncrementalCSVWriter,
+    'jsonl': IncrementalJSONLWriter
+}
@@ -0,0 +1,254 @@
+"""
+Persistent HTTP response cache with conditional revalidation
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+class HttpCache:
+    """
+    On-disk cache of response bodies and their validators
+    
+    Bodies are stored as files and indexed in a small SQLite database
+    together with their ETag/Last-Modified headers. Cached entries are
+    revalidated with If-None-Match/If-Modified-Since, so an unchanged page
+    costs a 304 instead of a full download. The products extracted from a
+    body can be stored next to it, which lets a 304 skip parsing as well.
+    """
+    
+    def __init__(self, directory: str = '.http_cache', max_size_mb: float = 100.0,
+                 ttl: float = 7 * 24 * 3600):
+        """
+        Initialize the cache
+        
+        Args:
+            directory: Directory holding the index and the cached bodies
+            max_size_mb: Size cap; least recently used entries are evicted beyond it
+            ttl: Seconds an entry stays usable after it was last validated
+                by the server; expired entries are dropped and refetched
+        """
+        self.directory = directory
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self.ttl = ttl
+        self._bodies_dir = os.path.join(directory, 'bodies')
+        os.makedirs(self._bodies_dir, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(directory, 'index.sqlite'), check_same_thread=False)
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_type TEXT,
+                size INTEGER NOT NULL,
+                validated_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                products TEXT
+            )
+        ''')
+        self._db.commit()
+    
+    def _body_path(self, url: str) -> str:
+        """Get the file that holds the cached body of a URL"""
+        return os.path.join(self._bodies_dir, hashlib.sha1(url.encode('utf-8')).hexdigest())
+    
+    def lookup(self, url: str) -> Optional[Dict]:
+        """
+        Get the cache entry for a URL
+        
+        Args:
+            url: Requested URL
+        
+        Returns:
+            Entry dictionary, or None if the URL is not cached or has expired
+        """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT etag, last_modified, content_type, validated_at FROM entries WHERE url = ?',
+                (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            
+            etag, last_modified, content_type, validated_at = row
+            now = time.time()
+            expired = now - validated_at > self.ttl
+            if expired:
+                self._delete(url)
+            else:
+                self._db.execute('UPDATE entries SET last_access = ? WHERE url = ?', (now, url))
+            self._db.commit()
+        
+        if expired:
+            return None
+        
+        return {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'content_type': content_type
+        }
+    
+    @staticmethod
+    def conditional_headers(entry: Dict) -> Dict[str, str]:
+        """
+        Build the revalidation headers for a cache entry
+        
+        Args:
+            entry: Entry returned by lookup
+        
+        Returns:
+            Request headers (empty if the entry has no validators)
+        """
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+    
+    def store(self, url: str, response: requests.Response):
+        """
+        Store a fresh 200 response, replacing any previous entry
+        
+        Responses without an ETag or Last-Modified header can't be
+        revalidated and are not cached.
+        
+        Args:
+            url: Requested URL
+            response: Successful response
+        """
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+        
+        body = response.content
+        path = self._body_path(url)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(body)
+        os.replace(temp_path, path)
+        
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, NULL)',
+                (url, etag, last_modified, response.headers.get('Content-Type'), len(body), now, now)
+            )
+            self._evict()
+            self._db.commit()
+    
+    def revalidated(self, url: str, response: requests.Response) -> Optional[requests.Response]:
+        """
+        Turn a 304 Not Modified into the cached response
+        
+        Args:
+            url: Requested URL
+            response: The 304 response from the server
+        
+        Returns:
+            Response built from the cached body, or None if the body is gone
+        """
+        try:
+            with open(self._body_path(url), 'rb') as f:
+                body = f.read()
+        except OSError:
+            return None
+        
+        with self._lock:
+            row = self._db.execute(
+                'SELECT etag, last_modified, content_type FROM entries WHERE url = ?', (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            
+            # A 304 may carry updated validators
+            etag = response.headers.get('ETag') or row[0]
+            last_modified = response.headers.get('Last-Modified') or row[1]
+            now = time.time()
+            self._db.execute(
+                'UPDATE entries SET etag = ?, last_modified = ?, validated_at = ?, last_access = ? '
+                'WHERE url = ?',
+                (etag, last_modified, now, now, url)
+            )
+            self._db.commit()
+        
+        cached = requests.Response()
+        cached._content = body
+        cached.status_code = 200
+        cached.url = url
+        cached.headers = CaseInsensitiveDict({
+            key: value for key, value in (
+                ('Content-Type', row[2]), ('ETag', etag), ('Last-Modified', last_modified)
+            ) if value
+        })
+        cached.from_cache = True
+        return cached
+    
+    def get_products(self, url: str) -> Optional[List[Dict]]:
+        """
+        Get the products previously extracted from the cached body
+        
+        Args:
+            url: Page URL
+        
+        Returns:
+            List of product dictionaries, or None if none were stored
+        """
+        with self._lock:
+            row = self._db.execute('SELECT products FROM entries WHERE url = ?', (url,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return json.loads(row[0])
+    
+    def store_products(self, url: str, products: List[Dict]):
+        """
+        Store the products extracted from the cached body of a URL
+        
+        Args:
+            url: Page URL
+            products: List of product dictionaries
+        """
+        with self._lock:
+            self._db.execute(
+                'UPDATE entries SET products = ? WHERE url = ?', (json.dumps(products), url)
+            )
+            self._db.commit()
+    
+    def _delete(self, url: str):
+        """Remove an entry and its body (caller holds the lock)"""
+        self._db.execute('DELETE FROM entries WHERE url = ?', (url,))
+        try:
+            os.remove(self._body_path(url))
+        except OSError:
+            pass
+    
+    def _evict(self):
+        """Drop least recently used entries until the cache fits its size cap (caller holds the lock)"""
+        total = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_size:
+            return
+        
+        rows = self._db.execute('SELECT url, size FROM entries ORDER BY last_access').fetchall()
+        for url, size in rows:
+            if total <= self.max_size:
+                break
+            self._delete(url)
+            total -= size
+    
+    def clear(self):
+        """Remove every cached entry"""
+        with self._lock:
+            for (url,) in self._db.execute('SELECT url FROM entries').fetchall():
+                self._delete(url)
+            self._db.commit()
@@ -0,0 +1,270 @@
+"""
+Job queue with priorities and a bounded worker pool, for running several scrapes at once
+"""
+import heapq
+import itertools
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from log_buffer import LogBuffer
+
+
+class JobCancelled(Exception):
+    """Raised inside a job's task once the job has been cancelled"""
+
+
+class Job:
+    """A queued or running unit of work with its own state, log and result file"""
+    
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+    FINISHED = (COMPLETED, FAILED, CANCELLED)
+    
+    def __init__(self, job_id: str, params: Dict, priority: int = 0, log_capacity: int = 1000):
+        """
+        Initialize the job
+        
+        Args:
+            job_id: Unique job ID
+            params: Task parameters (e.g. num_pages, output_format)
+            priority: Higher runs first; equal priorities run in submission order
+            log_capacity: Log lines kept for the job
+        """
+        self.job_id = job_id
+        self.params = dict(params)
+        self.priority = priority
+        
+        self.state = self.QUEUED
+        self.status = 'Queued'
+        self.progress = 0
+        self.total_pages = 0
+        self.current_page = 0
+        self.stats: Dict = {}
+        self.result_file: Optional[str] = None
+        
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        
+        self.logs = LogBuffer(log_capacity)
+        self._cancel = threading.Event()
+    
+    @property
+    def is_running(self) -> bool:
+        """True while the job is queued or running"""
+        return self.state not in self.FINISHED
+    
+    @property
+    def cancel_requested(self) -> bool:
+        """True once cancel was called"""
+        return self._cancel.is_set()
+    
+    def check_cancelled(self):
+        """Raise JobCancelled if the job was cancelled; tasks call this between steps"""
+        if self._cancel.is_set():
+            raise JobCancelled()
+    
+    def log(self, message: str):
+        """Add a timestamped line to the job's log"""
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        log_entry = f"[{timestamp}] {message}"
+        self.logs.append(log_entry)
+        print(f"[{self.job_id}] {log_entry}")
+    
+    def update(self, **fields):
+        """Set state fields (status, progress, stats, ...) and wake up stream readers"""
+        for name, value in fields.items():
+            setattr(self, name, value)
+        self.logs.notify()
+    
+    def to_dict(self) -> Dict:
+        """Get the job state without its log lines (constant size)"""
+        return {
+            'job_id': self.job_id,
+            'state': self.state,
+            'is_running': self.is_running,
+            'priority': self.priority,
+            'params': self.params,
+            'status': self.status,
+            'progress': self.progress,
+            'total_pages': self.total_pages,
+            'current_page': self.current_page,
+            'stats': self.stats,
+            'result_file': self.result_file,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'last_log_id': self.logs.last_id
+        }
+
+
+class JobScheduler:
+    """
+    Runs jobs from a priority queue on a fixed number of worker threads
+    
+    ``submit`` queues a job and returns at once; idle workers take the
+    highest-priority queued job. A queued job can be cancelled outright; a
+    running one is asked to stop and ends at its next ``check_cancelled``.
+    Finished jobs are kept for inspection, up to ``max_finished`` of them.
+    """
+    
+    def __init__(self, run_job: Callable[[Job], None], max_workers: int = 2, max_finished: int = 100):
+        """
+        Initialize the scheduler and start its workers
+        
+        Args:
+            run_job: Function that performs a job; it returns normally on
+                success and raises on failure
+            max_workers: Number of jobs that run at the same time
+            max_finished: Finished jobs kept before the oldest are forgotten
+        """
+        self.run_job = run_job
+        self.max_workers = max(1, int(max_workers))
+        self.max_finished = max_finished
+        
+        self._jobs: Dict[str, Job] = {}
+        self._queue = []
+        self._order = itertools.count()
+        self._changed = threading.Condition()
+        self._shutdown = False
+        
+        self._workers = [
+            threading.Thread(target=self._work, name=f'JobWorker-{index}', daemon=True)
+            for index in range(self.max_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+    
+    def submit(self, job_id: str, params: Dict, priority: int = 0) -> Job:
+        """
+        Queue a new job
+        
+        Args:
+            job_id: Unique job ID; a finished job with the same ID is replaced
+            params: Task parameters
+            priority: Higher runs first
+        
+        Returns:
+            The queued Job
+        
+        Raises:
+            ValueError: If a job with this ID is still queued or running
+        """
+        with self._changed:
+            existing = self._jobs.get(job_id)
+            if existing and existing.is_running:
+                raise ValueError(f"Job {job_id} is already {existing.state}")
+            
+            job = Job(job_id, params, priority)
+            self._jobs[job_id] = job
+            heapq.heappush(self._queue, (-priority, next(self._order), job))
+            self._changed.notify()
+        job.log(f"Queued with priority {priority}")
+        return job
+    
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get a job by ID"""
+        with self._changed:
+            return self._jobs.get(job_id)
+    
+    def jobs(self) -> List[Job]:
+        """Get every known job, newest first"""
+        with self._changed:
+            return sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+    
+    def queue_position(self, job: Job) -> Optional[int]:
+        """Get the 1-based position of a queued job (None if it is not queued)"""
+        with self._changed:
+            if job.state != Job.QUEUED:
+                return None
+            queued = sorted(entry for entry in self._queue if entry[2].state == Job.QUEUED)
+            for position, (_, _, queued_job) in enumerate(queued, 1):
+                if queued_job is job:
+                    return position
+            return None
+    
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a job
+        
+        Args:
+            job_id: Job to cancel
+        
+        Returns:
+            The job (unchanged if it had already finished), or None if unknown
+        """
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is None or not job.is_running:
+                return job
+            job._cancel.set()
+            if job.state == Job.QUEUED:
+                # Its queue entry is skipped when a worker reaches it
+                job.update(state=Job.CANCELLED, status='Cancelled', finished_at=time.time())
+                job.log("Cancelled before it started")
+                self._prune()
+                return job
+        job.log("Cancellation requested, stopping after the current step...")
+        return job
+    
+    def shutdown(self, wait: bool = True):
+        """Stop taking jobs from the queue; running jobs are asked to stop"""
+        with self._changed:
+            self._shutdown = True
+            for job in self._jobs.values():
+                if job.state == Job.RUNNING:
+                    job._cancel.set()
+            self._changed.notify_all()
+        if wait:
+            for worker in self._workers:
+                worker.join()
+    
+    def _next_job(self) -> Optional[Job]:
+        """Take the highest-priority queued job, waiting for one (None on shutdown)"""
+        with self._changed:
+            while True:
+                while self._queue and self._queue[0][2].state != Job.QUEUED:
+                    heapq.heappop(self._queue)
+                if self._shutdown:
+                    return None
+                if self._queue:
+                    job = heapq.heappop(self._queue)[2]
+                    job.update(state=Job.RUNNING, status='Starting...', started_at=time.time())
+                    return job
+                self._changed.wait()
+    
+    def _work(self):
+        """Worker thread: run queued jobs until shutdown"""
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            
+            try:
+                self.run_job(job)
+                if job.state == Job.RUNNING:
+                    job.update(state=Job.COMPLETED)
+            except JobCancelled:
+                job.log("✗ Cancelled")
+                job.update(state=Job.CANCELLED, status='Cancelled')
+            except Exception as e:
+                job.log(f"✗ Error: {str(e)}")
+                job.update(state=Job.FAILED, status=f'Error: {str(e)}')
+            finally:
+                job.update(finished_at=time.time())
+                with self._changed:
+                    self._prune()
+    
+    def _prune(self):
+        """Forget the oldest finished jobs beyond max_finished (caller holds the lock)"""
+        finished = [job for job in self._jobs.values() if not job.is_running]
+        if len(finished) <= self.max_finished:
+            return
+        finished.sort(key=lambda job: job.finished_at or job.created_at)
+        for job in finished[:len(finished) - self.max_finished]:
+            del self._jobs[job.job_id]
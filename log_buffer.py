@@ -0,0 +1,122 @@
+"""
+Bounded, thread-safe log store that clients read incrementally with a cursor
+"""
+import threading
+from collections import deque
+from itertools import islice
+from typing import List, Optional, Tuple
+
+
+class LogBuffer:
+    """
+    Ring buffer of log lines with monotonically increasing IDs
+    
+    Writers append lines; readers keep the ID of the last line they saw
+    and ask only for newer ones, so a read costs the same however long
+    the job has been running. Once ``capacity`` lines are stored the oldest
+    are dropped; a reader that falls that far behind is told how many it
+    missed. Readers can also block until something changes, which is what
+    the Server-Sent Events stream does.
+    """
+    
+    def __init__(self, capacity: int = 1000):
+        """
+        Initialize the buffer
+        
+        Args:
+            capacity: Maximum number of lines kept
+        """
+        self.capacity = max(1, int(capacity))
+        self._lines = deque(maxlen=self.capacity)
+        self._last_id = 0
+        # Bumped by every append and notify, so waiters also wake on status-only changes
+        self._version = 0
+        self._changed = threading.Condition()
+    
+    @property
+    def last_id(self) -> int:
+        """ID of the newest line (0 before the first one)"""
+        with self._changed:
+            return self._last_id
+    
+    @property
+    def version(self) -> int:
+        """Change counter to pass to ``wait``"""
+        with self._changed:
+            return self._version
+    
+    def append(self, line: str) -> int:
+        """
+        Add a line and wake up waiting readers
+        
+        Args:
+            line: Log line
+        
+        Returns:
+            ID of the new line
+        """
+        with self._changed:
+            self._last_id += 1
+            self._lines.append((self._last_id, line))
+            self._version += 1
+            self._changed.notify_all()
+            return self._last_id
+    
+    def notify(self):
+        """Wake up waiting readers without adding a line (e.g. the job state changed)"""
+        with self._changed:
+            self._version += 1
+            self._changed.notify_all()
+    
+    def clear(self):
+        """Drop every line; IDs keep counting up so old cursors stay valid"""
+        with self._changed:
+            self._lines.clear()
+            self._version += 1
+            self._changed.notify_all()
+    
+    def since(self, cursor: int = 0, limit: Optional[int] = None) -> Tuple[List[Tuple[int, str]], int, int]:
+        """
+        Get the lines added after a cursor
+        
+        Args:
+            cursor: ID of the last line the reader has (0 for everything)
+            limit: Maximum number of lines to return (oldest first)
+        
+        Returns:
+            Tuple of (list of (id, line), new cursor, number of lines after
+            the cursor that were already dropped from the buffer)
+        """
+        with self._changed:
+            if cursor < 0 or cursor > self._last_id:
+                # Stale cursor, e.g. from before a server restart: start over
+                cursor = 0
+            newer = self._last_id - cursor
+            available = min(newer, len(self._lines))
+            # Only walk the newest lines, so the cost does not grow with the buffer
+            lines = list(islice(reversed(self._lines), available))[::-1]
+        
+        missed = newer - available
+        if limit is not None:
+            lines = lines[:max(0, limit)]
+        new_cursor = lines[-1][0] if lines else cursor + missed
+        return lines, new_cursor, missed
+    
+    def wait(self, version: int, timeout: Optional[float] = None) -> int:
+        """
+        Block until the buffer changed since ``version`` or the timeout ran out
+        
+        Args:
+            version: Value of ``version`` the reader last saw
+            timeout: Maximum seconds to wait
+        
+        Returns:
+            The current version
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: self._version != version, timeout)
+            return self._version
+    
+    def __len__(self) -> int:
+        with self._changed:
+            return len(self._lines)
@@ -9,6 +9,9 @@ import os
 
 from scraper import ProductScraper
 from data_processor import DataProcessor
+from product_columns import ProductColumns
+from checkpoint import CrawlCheckpoint
+from change_tracker import ChangeTracker
 
 
 class PriceSpyGUI:
@@ -26,7 +29,13 @@ class PriceSpyGUI:
         
         # Variables
         self.num_pages_var = tk.IntVar(value=1)
-        self.output_format_var = tk.StringVar(value="CSV")
+        self.all_pages_var = tk.BooleanVar(value=False)
+        self.resume_var = tk.BooleanVar(value=False)
+        self.checkpoints = CrawlCheckpoint()
+        self.incremental_var = tk.BooleanVar(value=False)
+        self.tracker = ChangeTracker()
+        self.output_format_var = tk.StringVar(value="csv")
+        self.compression_var = tk.StringVar(value="snappy")
         self.is_scraping = False
         
         # Create UI
@@ -75,24 +84,45 @@ class PriceSpyGUI:
             bg="#ecf0f1"
         ).pack(side=tk.LEFT)
         
-        pages_spinbox = tk.Spinbox(
+        self.pages_spinbox = tk.Spinbox(
             pages_frame,
             from_=1,
-            to=50,
+            to=10000,
             textvariable=self.num_pages_var,
             width=10,
             font=("Arial", 10)
         )
-        pages_spinbox.pack(side=tk.LEFT, padx=10)
+        self.pages_spinbox.pack(side=tk.LEFT, padx=10)
         
-        tk.Label(
+        tk.Checkbutton(
             pages_frame,
-            text="(1-50 pages)",
-            font=("Arial", 9),
-            fg="#7f8c8d",
+            text="All pages",
+            variable=self.all_pages_var,
+            command=self._toggle_all_pages,
+            font=("Arial", 10),
+            bg="#ecf0f1"
+        ).pack(side=tk.LEFT)
+        
+        # Resume option
+        resume_frame = tk.Frame(settings_frame, bg="#ecf0f1")
+        resume_frame.pack(fill=tk.X, pady=5)
+        
+        tk.Checkbutton(
+            resume_frame,
+            text="Resume last interrupted crawl",
+            variable=self.resume_var,
+            font=("Arial", 10),
             bg="#ecf0f1"
         ).pack(side=tk.LEFT)
         
+        tk.Checkbutton(
+            resume_frame,
+            text="Only changed products",
+            variable=self.incremental_var,
+            font=("Arial", 10),
+            bg="#ecf0f1"
+        ).pack(side=tk.LEFT, padx=10)
+        
         # Output format
         format_frame = tk.Frame(settings_frame, bg="#ecf0f1")
         format_frame.pack(fill=tk.X, pady=5)
@@ -104,25 +134,25 @@ class PriceSpyGUI:
             bg="#ecf0f1"
         ).pack(side=tk.LEFT)
         
-        csv_radio = tk.Radiobutton(
+        for label, value in (("CSV", "csv"), ("Excel", "excel"), ("Parquet", "parquet"),
+                             ("Feather", "feather"), ("JSONL", "jsonl")):
+            tk.Radiobutton(
+                format_frame,
+                text=label,
+                variable=self.output_format_var,
+                value=value,
+                font=("Arial", 10),
+                bg="#ecf0f1"
+            ).pack(side=tk.LEFT, padx=(10, 0))
+        
+        # Parquet compression
+        ttk.Combobox(
             format_frame,
-            text="CSV",
-            variable=self.output_format_var,
-            value="CSV",
-            font=("Arial", 10),
-            bg="#ecf0f1"
-        )
-        csv_radio.pack(side=tk.LEFT, padx=10)
-        
-        excel_radio = tk.Radiobutton(
-            format_frame,
-            text="Excel",
-            variable=self.output_format_var,
-            value="Excel",
-            font=("Arial", 10),
-            bg="#ecf0f1"
-        )
-        excel_radio.pack(side=tk.LEFT)
+            textvariable=self.compression_var,
+            values=DataProcessor.PARQUET_COMPRESSIONS,
+            state="readonly",
+            width=7
+        ).pack(side=tk.LEFT, padx=10)
         
         # Target website info
         info_frame = tk.Frame(settings_frame, bg="#ecf0f1")
@@ -212,16 +242,32 @@ class PriceSpyGUI:
         self.status_label.config(text=message)
         self._log(message)
         
+    def _toggle_all_pages(self):
+        """Enable the page count only when not scraping all pages"""
+        state = tk.DISABLED if self.all_pages_var.get() else tk.NORMAL
+        self.pages_spinbox.config(state=state)
+        
     def _start_scraping(self):
         """Start the scraping process in a separate thread"""
         if self.is_scraping:
             messagebox.showwarning("Already Running", "Scraping is already in progress!")
             return
         
-        # Validate inputs
-        num_pages = self.num_pages_var.get()
-        if num_pages < 1 or num_pages > 50:
-            messagebox.showerror("Invalid Input", "Number of pages must be between 1 and 50")
+        # Validate inputs; None scrapes every page (the scraper reads the real page
+        # count from the site) and a resumed crawl keeps its own page count
+        num_pages = None
+        if not self.all_pages_var.get() and not self.resume_var.get():
+            try:
+                num_pages = self.num_pages_var.get()
+            except tk.TclError:
+                num_pages = 0
+            if num_pages < 1:
+                messagebox.showerror("Invalid Input", "Number of pages must be at least 1")
+                return
+        
+        unavailable = DataProcessor.format_unavailable(self.output_format_var.get())
+        if unavailable:
+            messagebox.showerror("Output Format", unavailable)
             return
         
         # Disable button and clear log
@@ -231,32 +277,63 @@ class PriceSpyGUI:
         self.is_scraping = True
         
         # Start scraping in a separate thread
-        thread = threading.Thread(target=self._scrape_data, daemon=True)
+        thread = threading.Thread(target=self._scrape_data, args=(num_pages,), daemon=True)
         thread.start()
         
-    def _scrape_data(self):
-        """Perform the scraping operation (runs in separate thread)"""
+    def _scrape_data(self, num_pages):
+        """
+        Perform the scraping operation (runs in separate thread)
+        
+        Args:
+            num_pages: Validated number of pages to scrape, or None for all
+                pages (ignored when resuming)
+        """
         try:
-            num_pages = self.num_pages_var.get()
             output_format = self.output_format_var.get()
+            job_id = CrawlCheckpoint.new_job_id()
+            
+            if self.resume_var.get():
+                job = self.checkpoints.latest_unfinished_job()
+                if not job:
+                    self._log("No interrupted crawl to resume")
+                    messagebox.showinfo("Nothing to Resume", "There is no interrupted crawl to resume.")
+                    return
+                job_id = job['job_id']
+                num_pages = job['num_pages']
+                self._log(f"Resuming job {job_id} ({job['pages_done']} page(s) already done)")
             
             self._log("Initializing scraper...")
-            scraper = ProductScraper(rate_limit=0.5, max_retries=3)
+            incremental = self.incremental_var.get()
+            scraper = ProductScraper(
+                rate_limit=0.5,
+                max_retries=3,
+                checkpoint=self.checkpoints,
+                tracker=self.tracker if incremental else None
+            )
             
-            self._log(f"Starting to scrape {num_pages} page(s)...")
+            self._log(f"Starting to scrape {num_pages or 'all'} page(s) (job {job_id})...")
             
-            # Scrape products
-            products = scraper.scrape_multiple_pages(
+            # Scrape products straight into compact columns
+            products = ProductColumns(scraper.iter_products(
                 num_pages,
-                progress_callback=self._update_progress
-            )
+                progress_callback=self._update_progress,
+                job_id=job_id
+            ))
+            self._log(f"Network: {scraper.transport.stats.summary()}")
             
             if not products:
-                self._log("No products found!")
-                messagebox.showwarning("No Data", "No products were scraped. Please try again.")
+                if incremental:
+                    self._log("No products changed since the last crawl")
+                    messagebox.showinfo("No Changes", "No products changed since the last crawl.")
+                else:
+                    self._log("No products found!")
+                    messagebox.showwarning("No Data", "No products were scraped. Please try again.")
                 return
             
-            self._log(f"Successfully scraped {len(products)} products")
+            if incremental:
+                self._log(f"{products.received} products new, changed or removed since the last crawl")
+            else:
+                self._log(f"Successfully scraped {products.received} products")
             
             # Process data
             self._log("Processing and deduplicating data...")
@@ -274,12 +351,8 @@ class PriceSpyGUI:
             # Save to file
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             
-            if output_format == "CSV":
-                filename = f"pricespy_results_{timestamp}.csv"
-                success = processor.save_to_csv(df, filename)
-            else:
-                filename = f"pricespy_results_{timestamp}.xlsx"
-                success = processor.save_to_excel(df, filename)
+            filename = f"pricespy_results_{timestamp}{DataProcessor.OUTPUT_FORMATS[output_format]}"
+            success = processor.save(df, filename, output_format, self.compression_var.get())
             
             if success:
                 self._log(f"✓ Results saved to: {filename}")
@@ -0,0 +1,246 @@
+"""
+Process-wide counters and histograms for each pipeline stage, in Prometheus text format
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# Seconds; covers everything from a parsed page to a slow fetch or a large export
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value the way the text exposition format expects"""
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    """Escape a label value"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Render a {name="value",...} label set (empty string when there are no labels)"""
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+
+class Metric:
+    """Base class of a named metric with an optional fixed set of label names"""
+    
+    TYPE = 'untyped'
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+    
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        """Get the label values of a sample, in labelnames order"""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+    
+    def samples(self) -> List[str]:
+        """Get the exposition lines of every sample"""
+        raise NotImplementedError
+    
+    def render(self) -> str:
+        """Get the HELP/TYPE header and samples of this metric"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.TYPE}"]
+        lines.extend(self.samples())
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing count, e.g. requests sent or bytes downloaded"""
+    
+    TYPE = 'counter'
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        if not self.labelnames:
+            # Unlabelled counters are exported as 0 before their first increment
+            self._values[()] = 0.0
+    
+    def inc(self, amount: float = 1, **labels):
+        """
+        Increase the counter
+        
+        Args:
+            amount: Non-negative amount to add
+            **labels: Value of every label in labelnames
+        """
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def value(self, **labels) -> float:
+        """Get the current value of one label set"""
+        key = self._key(labels)
+        with self._lock:
+            return self._values.get(key, 0.0)
+    
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in values]
+
+
+class HistogramSeries:
+    """Bucket counts, sum and count of one label set of a histogram"""
+    
+    def __init__(self, buckets: int):
+        self.bucket_counts = [0] * buckets
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(Metric):
+    """Distribution of observed values (usually durations) over fixed buckets"""
+    
+    TYPE = 'histogram'
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        if not self.buckets or not math.isinf(self.buckets[-1]):
+            self.buckets += (math.inf,)
+        self._series: Dict[Tuple[str, ...], HistogramSeries] = {}
+        if not self.labelnames:
+            self._series[()] = HistogramSeries(len(self.buckets))
+    
+    def observe(self, value: float, **labels):
+        """
+        Record one observation
+        
+        Args:
+            value: Observed value (seconds for timings)
+            **labels: Value of every label in labelnames
+        """
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = HistogramSeries(len(self.buckets))
+                self._series[key] = series
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series.bucket_counts[index] += 1
+                    break
+            series.sum += value
+            series.count += 1
+    
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the wall time spent in a ``with`` block, even if it raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+    
+    def count(self, **labels) -> int:
+        """Get the number of observations of one label set"""
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            return series.count if series else 0
+    
+    def samples(self) -> List[str]:
+        with self._lock:
+            series_list = sorted(
+                (key, list(series.bucket_counts), series.sum, series.count)
+                for key, series in self._series.items()
+            )
+        
+        lines = []
+        for key, bucket_counts, total, count in series_list:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames + ('le',), key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together for a /metrics endpoint"""
+    
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+    
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+    
+    def register(self, metric: Metric) -> Metric:
+        """Add a metric; names must be unique"""
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Create and register a Counter"""
+        return self.register(Counter(name, documentation, labelnames))
+    
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Optional[Sequence[float]] = None) -> Histogram:
+        """Create and register a Histogram"""
+        return self.register(Histogram(name, documentation, labelnames, buckets or DEFAULT_BUCKETS))
+    
+    def render(self) -> str:
+        """Get every metric in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+
+# Shared by every scraper and processor in the process
+registry = MetricsRegistry()
+
+# Fetching (every HTTP attempt, retries included)
+FETCH_SECONDS = registry.histogram(
+    'pricespy_fetch_seconds', 'Time to fetch a page, per HTTP attempt')
+DOWNLOADED_BYTES = registry.counter(
+    'pricespy_downloaded_bytes_total', 'Response body bytes received over the network')
+HTTP_RESPONSES = registry.counter(
+    'pricespy_http_responses_total', 'HTTP responses by status code (error = no response)', ['status'])
+RETRIES = registry.counter(
+    'pricespy_retries_total', 'Requests scheduled for another attempt, by reason', ['reason'])
+
+# Listing pages
+PARSE_SECONDS = registry.histogram(
+    'pricespy_parse_seconds', 'Time spent building the document tree of a listing page')
+EXTRACT_SECONDS = registry.histogram(
+    'pricespy_extract_seconds', 'Time spent extracting the products of a listing page')
+PAGES_SCRAPED = registry.counter(
+    'pricespy_pages_scraped_total', 'Listing pages scraped')
+PRODUCTS_SCRAPED = registry.counter(
+    'pricespy_products_scraped_total', 'Products found on listing pages')
+
+# Processing and export
+PROCESS_SECONDS = registry.histogram(
+    'pricespy_process_seconds', 'Time spent cleaning and deduplicating a batch of products')
+PRODUCTS_PROCESSED = registry.counter(
+    'pricespy_products_processed_total', 'Unique products produced by processing')
+EXPORT_SECONDS = registry.histogram(
+    'pricespy_export_seconds', 'Time spent writing results to a file, by format', ['format'])
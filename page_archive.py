@@ -0,0 +1,164 @@
+"""
+Compressed, content-addressed archive of raw fetched pages
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class PageArchive:
+    """
+    Archive of every page body the scraper fetched
+    
+    Bodies are stored once per distinct content under their SHA-256 digest
+    (``blobs/ab/abcdef....html.gz`` or ``.html.zst``), and an append-only
+    ``index.jsonl`` maps each fetch (URL, time, encoding) to its blob.
+    Re-extracting fields from history is then a local I/O job.
+    """
+    
+    COMPRESSIONS = ('gzip', 'zstd')
+    
+    EXTENSIONS = {
+        'gzip': '.html.gz',
+        'zstd': '.html.zst'
+    }
+    
+    def __init__(self, directory: str = 'page_archive', compression: str = 'gzip', level: Optional[int] = None):
+        """
+        Initialize the archive
+        
+        Args:
+            directory: Archive directory (created if missing)
+            compression: 'gzip' or 'zstd' (requires the zstandard package)
+            level: Compression level (defaults to 6 for gzip, 10 for zstd)
+        """
+        if compression not in self.COMPRESSIONS:
+            raise ValueError(f"Unknown compression '{compression}', expected one of {', '.join(self.COMPRESSIONS)}")
+        if compression == 'zstd' and zstandard is None:
+            raise ImportError("zstd compression requires the zstandard package: pip install zstandard")
+        
+        self.directory = directory
+        self.compression = compression
+        self.level = level if level is not None else (6 if compression == 'gzip' else 10)
+        self.index_path = os.path.join(directory, 'index.jsonl')
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(directory, 'blobs'), exist_ok=True)
+    
+    def _blob_path(self, digest: str, compression: str) -> str:
+        """Get the file path of a blob"""
+        return os.path.join(self.directory, 'blobs', digest[:2], digest + self.EXTENSIONS[compression])
+    
+    def _compress(self, content: bytes) -> bytes:
+        """Compress a page body with the configured codec"""
+        if self.compression == 'zstd':
+            return zstandard.ZstdCompressor(level=self.level).compress(content)
+        return gzip.compress(content, compresslevel=self.level)
+    
+    def add(self, url: str, content: bytes, encoding: Optional[str] = None,
+            fetched_at: Optional[datetime] = None) -> str:
+        """
+        Archive a fetched page
+        
+        Args:
+            url: Page URL
+            content: Raw page body
+            encoding: Charset the body is encoded with
+            fetched_at: Fetch time (defaults to now)
+        
+        Returns:
+            SHA-256 digest of the body
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        
+        # Identical content is stored only once, whatever codec wrote it first
+        if not any(os.path.exists(self._blob_path(digest, c)) for c in self.COMPRESSIONS):
+            path = self._blob_path(digest, self.compression)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(self._compress(content))
+            os.replace(temp_path, path)
+        
+        record = {
+            'url': url,
+            'fetched_at': (fetched_at or datetime.now()).isoformat(timespec='seconds'),
+            'sha256': digest,
+            'encoding': encoding,
+            'size': len(content)
+        }
+        with self._lock:
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+        
+        return digest
+    
+    def read(self, digest: str) -> bytes:
+        """
+        Read an archived page body
+        
+        Args:
+            digest: SHA-256 digest from the index
+        
+        Returns:
+            Raw page body
+        """
+        path = self._blob_path(digest, 'gzip')
+        if os.path.exists(path):
+            with gzip.open(path, 'rb') as f:
+                return f.read()
+        
+        path = self._blob_path(digest, 'zstd')
+        if zstandard is None:
+            raise ImportError("Reading zstd blobs requires the zstandard package: pip install zstandard")
+        with open(path, 'rb') as f:
+            return zstandard.ZstdDecompressor().decompress(f.read())
+    
+    def iter_records(self) -> Iterator[Dict]:
+        """
+        Iterate over the index records in fetch order
+        
+        Yields:
+            Record dictionaries with url, fetched_at, sha256, encoding and size
+        """
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+    
+    def latest_records(self) -> Dict[str, Dict]:
+        """
+        Get the most recent index record of every archived URL
+        
+        Returns:
+            Dictionary mapping URL to its latest record
+        """
+        latest = {}
+        for record in self.iter_records():
+            latest[record['url']] = record
+        return latest
+    
+    def iter_pages(self, latest_only: bool = True) -> Iterator[Tuple[Dict, bytes]]:
+        """
+        Iterate over archived pages
+        
+        Args:
+            latest_only: Only yield the most recent fetch of each URL
+        
+        Yields:
+            Tuples of (index record, raw page body)
+        """
+        records = self.latest_records().values() if latest_only else self.iter_records()
+        for record in records:
+            yield record, self.read(record['sha256'])
@@ -0,0 +1,242 @@
+"""
+Column-oriented product buffer that keeps large crawls compact in memory
+"""
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class ProductColumns:
+    """
+    Products stored one column at a time instead of one dict per product
+    
+    A product dict costs several hundred bytes before its strings are
+    counted. Here every field is appended to its own column: availability
+    and categories (few distinct values) are stored as integer codes into a
+    table of distinct values, ratings as one byte each, and every other
+    field as a plain list. Equal prices share one string object, so the
+    price column costs a pointer per product while staying plain strings.
+    Products are deduplicated on ``key`` as they arrive, so duplicates are
+    never stored.
+    
+    ``to_frame`` turns the columns into a DataFrame with compact dtypes
+    without going through intermediate dicts::
+        
+        columns = ProductColumns(scraper.iter_products(50))
+        df = DataProcessor.process_products(columns)
+    """
+    
+    # Fields with few distinct values, stored as codes and returned as categoricals
+    CODED_FIELDS = ('availability', 'category')
+    
+    # Plain fields with few distinct values, whose equal values share one object
+    SHARED_FIELDS = ('price',)
+    
+    # Fields holding small integers (or None), stored as one signed byte each
+    BYTE_FIELDS = ('rating',)
+    
+    # Stands for None in a byte column
+    MISSING_BYTE = -1
+    
+    # Products collected before they are moved into the columns
+    BATCH_SIZE = 1024
+    
+    def __init__(self, products: Iterable[Dict] = (), key: Optional[str] = 'url'):
+        """
+        Initialize the buffer
+        
+        Args:
+            products: Products to add right away (any iterable, e.g. the
+                generator returned by ProductScraper.iter_products)
+            key: Field identifying a product; later products with an
+                already-seen value are dropped (None keeps every product,
+                and products without the field are always kept)
+        """
+        self.key = key
+        self._duplicates = 0
+        self._length = 0
+        self._fields: List[str] = []
+        self._lists: Dict[str, list] = {}
+        self._codes: Dict[str, array] = {}
+        self._values: Dict[str, Dict] = {}
+        self._bytes: Dict[str, array] = {}
+        self._shared: Dict[str, Dict] = {field: {} for field in self.SHARED_FIELDS}
+        self._seen = set()
+        self._columns = set()
+        self._pending: List[Dict] = []
+        
+        self.extend(products)
+    
+    def __len__(self) -> int:
+        self.flush()
+        return self._length
+    
+    @property
+    def duplicates(self) -> int:
+        """Number of products dropped because their key was already seen"""
+        self.flush()
+        return self._duplicates
+    
+    @property
+    def received(self) -> int:
+        """Number of products added, duplicates included"""
+        self.flush()
+        return self._length + self._duplicates
+    
+    @property
+    def fields(self) -> List[str]:
+        """Field names in the order they first appeared"""
+        self.flush()
+        return list(self._fields)
+    
+    def _add_field(self, field: str):
+        """Start a column, filled with None for the products already stored"""
+        self._fields.append(field)
+        if field in self.CODED_FIELDS:
+            self._codes[field] = array('i', [-1]) * self._length
+            self._values[field] = {}
+        elif field in self.BYTE_FIELDS:
+            self._bytes[field] = array('b', [self.MISSING_BYTE]) * self._length
+        else:
+            self._lists[field] = [None] * self._length
+    
+    def append(self, product: Dict):
+        """
+        Add one product
+        
+        Products are moved into the columns in batches of BATCH_SIZE, so
+        the cost per product stays close to that of a list comprehension.
+        
+        Args:
+            product: Product dictionary
+        """
+        self._pending.append(product)
+        if len(self._pending) >= self.BATCH_SIZE:
+            self.flush()
+    
+    def extend(self, products: Iterable[Dict]):
+        """
+        Add many products
+        
+        Args:
+            products: Iterable of product dictionaries
+        """
+        for product in products:
+            self._pending.append(product)
+            if len(self._pending) >= self.BATCH_SIZE:
+                self.flush()
+    
+    def flush(self):
+        """Move the products added since the last batch into the columns"""
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        
+        if self.key is not None:
+            key, seen, unique = self.key, self._seen, []
+            for product in batch:
+                identity = product.get(key)
+                if identity:
+                    if identity in seen:
+                        continue
+                    seen.add(identity)
+                unique.append(product)
+            self._duplicates += len(batch) - len(unique)
+            batch = unique
+        
+        fields = set().union(*batch)
+        if not fields <= self._columns:
+            # Keep first-seen field order for the new columns
+            for product in batch:
+                for field in product:
+                    if field not in self._columns:
+                        self._add_field(field)
+                        self._columns.add(field)
+        
+        for field, column in self._lists.items():
+            shared = self._shared.get(field)
+            if shared is None:
+                column.extend([product.get(field) for product in batch])
+            else:
+                column.extend([shared.setdefault(value, value)
+                               for value in [product.get(field) for product in batch]])
+        
+        for field, codes in self._codes.items():
+            values = self._values[field]
+            # None gets a code too; column() turns it back into a missing value
+            codes.extend([values.setdefault(product.get(field), len(values)) for product in batch])
+        
+        missing = self.MISSING_BYTE
+        for field, column in self._bytes.items():
+            column.extend([missing if value is None else value
+                           for value in [product.get(field) for product in batch]])
+        
+        self._length += len(batch)
+    
+    def __iter__(self) -> Iterator[Dict]:
+        """Rebuild the products as dictionaries (for code that needs dicts)"""
+        self.flush()
+        columns = [(field, self._column_values(field)) for field in self._fields]
+        for index in range(self._length):
+            yield {field: values[index] for field, values in columns}
+    
+    def _column_values(self, field: str) -> list:
+        """Get one column as a list of Python values (None where missing)"""
+        if field in self._lists:
+            return self._lists[field]
+        if field in self._codes:
+            table = list(self._values[field]) + [None]
+            return [table[code] for code in self._codes[field]]
+        return [None if value == self.MISSING_BYTE else value for value in self._bytes[field]]
+    
+    def column(self, field: str, start: int = 0) -> pd.Series:
+        """
+        Get one field as a compact Series
+        
+        Args:
+            field: Field name
+            start: Index of the first product to include
+        
+        Returns:
+            Categorical Series for coded fields, int8 (Int8 when values are
+            missing) for byte fields, and an inferred dtype otherwise
+        """
+        self.flush()
+        
+        if field in self._codes:
+            values = list(self._values[field])
+            codes = np.frombuffer(self._codes[field], dtype=np.int32)[start:]
+            if None in self._values[field]:
+                # Drop None from the categories and mark its rows as missing
+                none_code = self._values[field][None]
+                values.pop(none_code)
+                codes = np.where(codes == none_code, -1, codes - (codes > none_code))
+            categories = pd.Index(values, dtype=object)
+            return pd.Series(pd.Categorical.from_codes(codes, categories), name=field)
+        
+        if field in self._bytes:
+            values = np.frombuffer(self._bytes[field], dtype=np.int8)[start:].copy()
+            missing = values == self.MISSING_BYTE
+            if missing.any():
+                return pd.Series(pd.arrays.IntegerArray(values, missing), name=field)
+            return pd.Series(values, name=field)
+        
+        return pd.Series(self._lists[field][start:], name=field)
+    
+    def to_frame(self, start: int = 0) -> pd.DataFrame:
+        """
+        Build a DataFrame with one column per field, in first-seen order
+        
+        Args:
+            start: Index of the first product to include, e.g. the number
+                already exported when writing a crawl out as it runs
+        
+        Returns:
+            DataFrame of the products from ``start`` on (index starting at 0)
+        """
+        self.flush()
+        if start >= self._length:
+            return pd.DataFrame()
+        return pd.DataFrame({field: self.column(field, start) for field in self._fields})
@@ -0,0 +1,187 @@
+"""
+Rate limiting module shared by every scraper worker and retry
+"""
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """Token bucket holding the request budget of a single host"""
+    
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+    
+    def refill(self, now: float):
+        """Add the tokens earned since the last update"""
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+
+class RateLimiter:
+    """
+    Per-host token-bucket rate limiter
+    
+    Each call to ``acquire`` reserves the next free slot of the host's
+    bucket and sleeps only until that slot comes up, so concurrent workers
+    are spaced evenly instead of waking together. A host can also be
+    blocked for a while (e.g. after a 429 with ``Retry-After``), which
+    holds back every worker that talks to it.
+    """
+    
+    def __init__(self, requests_per_second: float = 1.0, burst: int = 1,
+                 backoff_base: float = 1.0, max_backoff: float = 60.0, max_retry_after: float = 300.0):
+        """
+        Initialize the rate limiter
+        
+        Args:
+            requests_per_second: Sustained request rate allowed per host
+                (0 or less disables rate limiting)
+            burst: Number of requests that may be sent back-to-back
+            backoff_base: Base delay in seconds for retry backoff
+            max_backoff: Upper bound for a single backoff delay in seconds
+            max_retry_after: Longest pause in seconds a server's Retry-After
+                may impose on a host; longer values are cut to this
+        """
+        self.requests_per_second = requests_per_second
+        self.burst = max(1, int(burst))
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _host(url: str) -> str:
+        """Get the bucket key for a URL"""
+        return urlparse(url).netloc.lower()
+    
+    def _bucket(self, url: str) -> TokenBucket:
+        """Get (or create) the bucket for the host of a URL"""
+        host = self._host(url)
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.requests_per_second, self.burst)
+                self._buckets[host] = bucket
+            return bucket
+    
+    def acquire(self, url: str) -> float:
+        """
+        Block until a request to the host of ``url`` is allowed
+        
+        Args:
+            url: URL about to be requested
+        
+        Returns:
+            Time spent waiting in seconds
+        """
+        bucket = self._bucket(url)
+        waited = 0.0
+        
+        while True:
+            with bucket.lock:
+                now = time.monotonic()
+                if now < bucket.blocked_until:
+                    delay = bucket.blocked_until - now
+                    reserved = False
+                elif self.requests_per_second <= 0:
+                    return waited
+                else:
+                    bucket.refill(now)
+                    bucket.tokens -= 1
+                    delay = max(0.0, -bucket.tokens / bucket.rate)
+                    reserved = True
+            
+            if delay > 0:
+                time.sleep(delay)
+                waited += delay
+            
+            if reserved:
+                # The host may have been blocked while we slept on our slot;
+                # if so, give the slot back and queue up again behind the pause
+                with bucket.lock:
+                    if time.monotonic() >= bucket.blocked_until:
+                        return waited
+                    bucket.tokens += 1
+    
+    def defer(self, url: str, delay: float):
+        """
+        Hold back all requests to the host of ``url`` for ``delay`` seconds
+        
+        Args:
+            url: URL whose host should be paused
+            delay: Pause length in seconds (at most ``max_retry_after``)
+        """
+        bucket = self._bucket(url)
+        with bucket.lock:
+            until = time.monotonic() + min(max(0.0, delay), self.max_retry_after)
+            if until > bucket.blocked_until:
+                bucket.blocked_until = until
+                # Don't let tokens pile up during the pause and burst afterwards
+                bucket.tokens = min(bucket.tokens, 0.0)
+                bucket.updated = until
+    
+    def backoff_delay(self, attempt: int) -> float:
+        """
+        Get a jittered exponential backoff delay ("full jitter")
+        
+        Args:
+            attempt: Zero-based retry attempt number
+        
+        Returns:
+            Delay in seconds
+        """
+        ceiling = min(self.max_backoff, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, ceiling)
+    
+    def retry_after_delay(self, value: Optional[str]) -> Optional[float]:
+        """
+        Get the pause a Retry-After header asks for, capped at ``max_retry_after``
+        
+        Args:
+            value: Header value, either delay-seconds or an HTTP-date
+        
+        Returns:
+            Delay in seconds, or None if the value is missing or invalid
+        """
+        delay = self.parse_retry_after(value)
+        if delay is None:
+            return None
+        return min(delay, self.max_retry_after)
+    
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """
+        Parse a Retry-After header value
+        
+        Args:
+            value: Header value, either delay-seconds or an HTTP-date
+        
+        Returns:
+            Delay in seconds, or None if the value is missing or invalid
+        """
+        if not value:
+            return None
+        
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Offline replay: run the scraper's extraction over saved listing pages
+
+Reads a directory of saved .html files or a PageArchive directory, parses
+every page on a process pool (no network access) and feeds the products
+into DataProcessor. The timing summary doubles as a deterministic
+throughput benchmark for the parsing path.
+
+Usage:
+    python replay.py page_archive -o products.csv
+    python replay.py saved_pages/ --workers 8 --parser lxml
+    python replay.py page_archive -o products.csv --memory-mb 512
+"""
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from scraper import ProductScraper
+from data_processor import DataProcessor
+from chunked_processor import ChunkedProcessor
+from page_archive import PageArchive
+
+# Per-process scraper, created once by the pool initializer
+_worker_scraper = None
+
+
+def _init_worker(parser: str):
+    """Create the scraper used by a pool worker"""
+    global _worker_scraper
+    _worker_scraper = ProductScraper(parser=parser)
+
+
+def _natural_key(path: str):
+    """Sort key that puts page-2 before page-10"""
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', path)]
+
+
+def _parse_task(task: Tuple[str, str, Optional[str]]) -> List[Dict[str, any]]:
+    """
+    Parse one saved page inside a pool worker
+    
+    Args:
+        task: Tuple of (kind, location, encoding) where kind is 'file'
+            (location is a path) or 'archive' (location is 'directory|digest')
+    
+    Returns:
+        List of product dictionaries
+    """
+    kind, location, encoding = task
+    if kind == 'archive':
+        directory, digest = location.rsplit('|', 1)
+        content = PageArchive(directory).read(digest)
+    else:
+        with open(location, 'rb') as f:
+            content = f.read()
+    
+    if not encoding:
+        encoding = ProductScraper.detect_encoding(content)
+    return _worker_scraper.parse_products(content, encoding)
+
+
+def collect_tasks(source: str) -> List[Tuple[str, str, Optional[str]]]:
+    """
+    List the pages to replay from a source
+    
+    Args:
+        source: PageArchive directory (has an index.jsonl), directory of
+            saved .html files, or a single .html file
+    
+    Returns:
+        List of parse tasks in page order (for an archive, only its
+        listing pages; other archived pages are skipped)
+    """
+    if os.path.isfile(source):
+        return [('file', source, None)]
+    
+    if os.path.exists(os.path.join(source, 'index.jsonl')):
+        # The archive also holds detail pages; replay only listing pages, by page number
+        pages = []
+        for url, record in PageArchive(source).latest_records().items():
+            page_number = ProductScraper.listing_page_number(url)
+            if page_number is not None:
+                pages.append((page_number, url, record))
+        pages.sort(key=lambda page: page[:2])
+        return [('archive', f"{source}|{record['sha256']}", record.get('encoding')) for _, _, record in pages]
+    
+    paths = []
+    for root, _, filenames in os.walk(source):
+        for filename in filenames:
+            if filename.lower().endswith(('.html', '.htm')):
+                paths.append(os.path.join(root, filename))
+    return [('file', path, None) for path in sorted(paths, key=_natural_key)]
+
+
+def iter_replay(source: str, max_workers: Optional[int] = None, parser: str = 'lxml',
+                progress_callback=None) -> Iterator[Dict[str, any]]:
+    """
+    Extract products from saved pages using all CPU cores, yielding them page by page
+    
+    Args:
+        source: See collect_tasks
+        max_workers: Number of worker processes (defaults to the CPU count)
+        parser: ProductScraper parser backend
+        progress_callback: Optional callback function(current, total, message)
+    
+    Yields:
+        Product dictionaries, in page order
+    """
+    tasks = collect_tasks(source)
+    if not tasks:
+        return
+    
+    max_workers = max_workers or os.cpu_count() or 1
+    # Large chunks keep IPC overhead low; several per worker keep the load balanced
+    chunksize = max(1, len(tasks) // (max_workers * 4))
+    
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(parser,)) as executor:
+        for index, products in enumerate(executor.map(_parse_task, tasks, chunksize=chunksize), 1):
+            yield from products
+            if progress_callback:
+                progress_callback(index, len(tasks), f"Parsed page {index}/{len(tasks)}...")
+
+
+def replay(source: str, max_workers: Optional[int] = None, parser: str = 'lxml',
+           progress_callback=None) -> List[Dict[str, any]]:
+    """
+    Extract products from saved pages using all CPU cores
+    
+    Args:
+        source: See collect_tasks
+        max_workers: Number of worker processes (defaults to the CPU count)
+        parser: ProductScraper parser backend
+        progress_callback: Optional callback function(current, total, message)
+    
+    Returns:
+        List of all product dictionaries, in page order
+    """
+    return list(iter_replay(source, max_workers, parser, progress_callback))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-extract products from saved listing pages without network access")
+    parser.add_argument('source', help='PageArchive directory, directory of .html files, or a single .html file')
+    parser.add_argument('-o', '--output', help='Output file (.csv, .xlsx, .parquet, .feather or .jsonl)')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--parser', choices=ProductScraper.PARSERS, default='lxml', help='HTML parser backend')
+    parser.add_argument('--memory-mb', type=float, default=None,
+                        help='Process in chunks spilled to disk, staying within this memory budget (CSV output only)')
+    parser.add_argument('--spill-dir', default=None, help='Directory for spilled chunks (default: system temp)')
+    args = parser.parse_args()
+    if args.memory_mb and args.output and not args.output.lower().endswith('.csv'):
+        parser.error('--memory-mb writes CSV; other formats need the whole result in memory')
+    
+    start = time.perf_counter()
+    num_pages = len(collect_tasks(args.source))
+    
+    if args.memory_mb:
+        # Listing pages hold 20 products, which sizes the dedup Bloom filter
+        processor = ChunkedProcessor(memory_budget_mb=args.memory_mb, spill_dir=args.spill_dir,
+                                     expected_products=max(1, num_pages * 20))
+        with processor.process(iter_replay(args.source, max_workers=args.workers, parser=args.parser)) as result:
+            print(f"Parsed and processed {num_pages} pages into {len(result)} unique products "
+                  f"in {time.perf_counter() - start:.2f}s ({len(result.paths)} chunks of up to "
+                  f"{processor.chunk_size} products)")
+            if args.output:
+                result.save_to_csv(args.output)
+        return
+    
+    products = replay(args.source, max_workers=args.workers, parser=args.parser)
+    parse_seconds = time.perf_counter() - start
+    
+    print(f"Parsed {num_pages} pages into {len(products)} products in {parse_seconds:.2f}s "
+          f"({num_pages / max(parse_seconds, 1e-9):.0f} pages/s, "
+          f"{len(products) / max(parse_seconds, 1e-9):.0f} products/s)")
+    
+    start = time.perf_counter()
+    processor = DataProcessor()
+    df = processor.process_products(products)
+    print(f"Processed {len(df)} unique products in {time.perf_counter() - start:.2f}s")
+    
+    if args.output:
+        # Format from the file extension; anything unrecognised is written as CSV
+        extension = os.path.splitext(args.output)[1].lower()
+        formats = {ext: name for name, ext in DataProcessor.OUTPUT_FORMATS.items()}
+        processor.save(df, args.output, formats.get(extension, 'csv'))
+
+
+if __name__ == '__main__':
+    main()
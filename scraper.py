@@ -2,10 +2,27 @@
 Web scraper module for extracting product data from books.toscrape.com
 """
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from lxml import etree
+import codecs
+import heapq
+import io
+import re
 import time
-from typing import List, Dict, Optional
-from urllib.parse import urljoin
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+from rate_limiter import RateLimiter
+from http_cache import HttpCache
+from page_archive import PageArchive
+from checkpoint import CrawlCheckpoint
+from change_tracker import ChangeTracker
+from transport import Transport
+from circuit_breaker import CircuitBreaker
+import metrics
+from tracing import tracer
 
 
 class ProductScraper:
@@ -23,45 +40,229 @@ class ProductScraper:
         'Five': 5
     }
     
-    def __init__(self, rate_limit: float = 1.0, max_retries: int = 3):
+    # Statuses whose Retry-After header pauses the whole host
+    THROTTLE_STATUSES = (429, 503)
+    
+    # Detail pages remembered between enrichment calls, least recently used dropped first
+    DETAILS_CACHE_SIZE = 10_000
+    
+    # Available HTML parser backends
+    PARSERS = ('lxml', 'html.parser')
+    
+    # "In stock (22 available)" on product detail pages
+    STOCK_PATTERN = re.compile(r'\((\d+)\s+available\)')
+    
+    # "Page 1 of 50" in the listing pager
+    PAGER_PATTERN = re.compile(rb'Page\s+\d+\s+of\s+(\d+)')
+    
+    # Listing page URLs as built by _page_url: <root>/index.html and <root>/catalogue/page-N.html
+    LISTING_URL_PATTERN = re.compile(r'/(?:(index)|catalogue/page-(\d+))\.html$')
+    
+    CHARSET_PATTERN = re.compile(r'charset=["\']?([\w.:-]+)', re.IGNORECASE)
+    META_CHARSET_PATTERN = re.compile(rb'<meta[^>]+charset=["\']?([\w.:-]+)', re.IGNORECASE)
+    
+    def __init__(self, rate_limit: float = 1.0, max_retries: int = 3, max_concurrency: int = 1,
+                 requests_per_second: Optional[float] = None, burst: int = 1,
+                 rate_limiter: Optional[RateLimiter] = None, parser: str = 'lxml',
+                 cache: Optional[HttpCache] = None, archive: Optional[PageArchive] = None,
+                 checkpoint: Optional[CrawlCheckpoint] = None,
+                 tracker: Optional[ChangeTracker] = None, transport: Optional[Transport] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None, base_url: Optional[str] = None):
         """
         Initialize the scraper
         
         Args:
-            rate_limit: Delay between requests in seconds
+            rate_limit: Delay between requests in seconds, also used as the
+                retry backoff base
             max_retries: Maximum number of retry attempts for failed requests
+            max_concurrency: Maximum number of pages fetched at the same time
+                (1 keeps the original one-page-at-a-time behaviour)
+            requests_per_second: Allowed request rate per host
+                (defaults to 1 / rate_limit)
+            burst: Number of requests per host that may be sent back-to-back
+            rate_limiter: Shared RateLimiter to use instead of creating one,
+                e.g. to apply one politeness budget to several scrapers
+            parser: HTML parser backend, one of PARSERS ('lxml' is fastest;
+                'html.parser' is the BeautifulSoup fallback)
+            cache: Optional HttpCache; cached pages are revalidated with
+                conditional requests and a 304 reuses the stored products
+            archive: Optional PageArchive that receives every fetched page
+            checkpoint: Optional CrawlCheckpoint that records finished pages
+                so crawls started with a job ID can be resumed
+            tracker: Optional ChangeTracker; unchanged listing pages are not
+                parsed again and scrape_multiple_pages returns only the
+                products that are new, changed or removed since the last crawl
+            transport: Optional Transport (connection pool, timeouts,
+                compression); defaults to one with a pool of max_concurrency
+                connections, a 5s connect and a 10s read timeout
+            circuit_breaker: Shared CircuitBreaker to use instead of creating
+                one that opens a host's circuit after 5 consecutive failures
+            base_url: Site root to scrape instead of MAIN_URL, e.g. a local
+                stand-in server serving the same markup
         """
+        if parser not in self.PARSERS:
+            raise ValueError(f"Unknown parser '{parser}', expected one of {', '.join(self.PARSERS)}")
+        
+        if base_url:
+            self.MAIN_URL = base_url.rstrip('/')
+            self.BASE_URL = self.MAIN_URL + '/catalogue/page-{}.html'
+        
         self.rate_limit = rate_limit
         self.max_retries = max_retries
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        self.max_concurrency = max(1, int(max_concurrency))
+        
+        if rate_limiter is None:
+            if requests_per_second is None:
+                requests_per_second = 1.0 / rate_limit if rate_limit > 0 else 0
+            rate_limiter = RateLimiter(
+                requests_per_second=requests_per_second,
+                burst=burst,
+                backoff_base=rate_limit if rate_limit > 0 else 1.0
+            )
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        
+        self.parser = parser
+        if parser == 'lxml':
+            self._compile_selectors()
+        
+        self.cache = cache
+        self.archive = archive
+        self.checkpoint = checkpoint
+        self.tracker = tracker
+        
+        # Detail-page fields already fetched, keyed by product URL (an LRU cache)
+        self._details: 'OrderedDict[str, Dict[str, any]]' = OrderedDict()
+        
+        self.transport = transport or Transport(pool_size=self.max_concurrency)
+        self.session = self.transport.session
     
     def _make_request(self, url: str) -> Optional[requests.Response]:
         """
         Make HTTP request with retry logic and exponential backoff
         
+        The calling thread sleeps between attempts; the concurrent page
+        scheduler uses _fetch directly and queues retries instead.
+        
         Args:
             url: URL to fetch
             
         Returns:
-            Response object or None if all retries failed
+            Response object or None if all retries failed. Responses served
+            from the cache after a 304 have ``from_cache`` set to True.
         """
-        for attempt in range(self.max_retries):
-            try:
-                response = self.session.get(url, timeout=10)
-                response.raise_for_status()
+        attempt = 0
+        while True:
+            response, retry_in, attempt = self._fetch(url, attempt)
+            if response is not None or retry_in is None:
                 return response
-            except requests.RequestException as e:
-                if attempt < self.max_retries - 1:
-                    wait_time = (2 ** attempt) * self.rate_limit
-                    print(f"Request failed, retrying in {wait_time}s... (attempt {attempt + 1}/{self.max_retries})")
-                    time.sleep(wait_time)
-                else:
-                    print(f"Failed to fetch {url} after {self.max_retries} attempts: {e}")
-                    return None
-        return None
+            with tracer.span('retry sleep', url=url, seconds=round(retry_in, 3)):
+                time.sleep(retry_in)
+    
+    def _fetch(self, url: str, attempt: int) -> Tuple[Optional[requests.Response], Optional[float], int]:
+        """
+        Make a single attempt at fetching a URL
+        
+        Args:
+            url: URL to fetch
+            attempt: Zero-based attempt number
+            
+        Returns:
+            Tuple of (response, retry delay, next attempt number). On success
+            the response is set. Otherwise the delay is the number of seconds
+            to wait before trying again, or None once all attempts are used
+            up. A request refused by an open circuit was never sent, so it
+            keeps its attempt number.
+        """
+        last_attempt = attempt >= self.max_retries - 1
+        
+        # An open circuit refuses the request without sending it: wait for the probe instead
+        if not self.circuit_breaker.allow(url):
+            outage = self.circuit_breaker.outage(url)
+            if outage >= self.circuit_breaker.max_outage:
+                print(f"Failed to fetch {url}: host down for {outage:.0f}s, circuit open")
+                return None, None, attempt
+            metrics.RETRIES.inc(reason='circuit_open')
+            return None, self.circuit_breaker.retry_in(url), attempt
+        
+        # Every attempt, retries included, goes through the shared limiter
+        with tracer.span('rate limit', url=url):
+            self.rate_limiter.acquire(url)
+        
+        headers = None
+        if self.cache:
+            entry = self.cache.lookup(url)
+            if entry:
+                headers = self.cache.conditional_headers(entry)
+        
+        try:
+            response = self._get(url, headers)
+            if response.status_code == 304 and self.cache:
+                cached = self.cache.revalidated(url, response)
+                if cached is not None:
+                    self.circuit_breaker.record_success(url)
+                    self._archive_response(url, cached)
+                    return cached, None, attempt + 1
+                # Body vanished from the cache: fetch it unconditionally
+                self.rate_limiter.acquire(url)
+                response = self._get(url)
+            response.raise_for_status()
+            self.circuit_breaker.record_success(url)
+            if self.cache:
+                self.cache.store(url, response)
+            self._archive_response(url, response)
+            return response, None, attempt + 1
+        except requests.RequestException as e:
+            response = getattr(e, 'response', None)
+            if response is None or response.status_code >= 500:
+                self.circuit_breaker.record_failure(url)
+            else:
+                # The host answered: a client error or throttling says nothing about an outage
+                self.circuit_breaker.record_success(url)
+            
+            if last_attempt:
+                print(f"Failed to fetch {url} after {self.max_retries} attempts: {e}")
+                return None, None, attempt + 1
+            
+            if response is not None and response.status_code in self.THROTTLE_STATUSES:
+                # The server is throttling us: pause the whole host, not just this worker
+                wait_time = self.rate_limiter.retry_after_delay(response.headers.get('Retry-After'))
+                if wait_time is None:
+                    wait_time = self.rate_limiter.backoff_delay(attempt)
+                print(f"Got HTTP {response.status_code}, pausing requests for {wait_time:.1f}s... "
+                      f"(attempt {attempt + 1}/{self.max_retries})")
+                self.rate_limiter.defer(url, wait_time)
+                metrics.RETRIES.inc(reason='throttled')
+            else:
+                wait_time = self.rate_limiter.backoff_delay(attempt)
+                print(f"Request failed, retrying in {wait_time:.1f}s... (attempt {attempt + 1}/{self.max_retries})")
+                metrics.RETRIES.inc(reason='error')
+            return None, wait_time, attempt + 1
+    
+    def _get(self, url: str, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """Send a single GET request, recording its latency, status code and size"""
+        start = time.perf_counter()
+        with tracer.span('GET', 'http', url=url) as span:
+            try:
+                response = self.session.get(url, timeout=self.transport.timeout, headers=headers)
+            except requests.RequestException:
+                metrics.HTTP_RESPONSES.inc(status='error')
+                raise
+            finally:
+                metrics.FETCH_SECONDS.observe(time.perf_counter() - start)
+            span.set(status=response.status_code)
+        
+        metrics.HTTP_RESPONSES.inc(status=response.status_code)
+        body = response.content
+        # Bytes as received, i.e. before decompression, when the raw stream can tell
+        tell = getattr(response.raw, 'tell', None)
+        metrics.DOWNLOADED_BYTES.inc(tell() if tell else len(body))
+        return response
+    
+    def _archive_response(self, url: str, response: requests.Response):
+        """Write a fetched page to the archive, if one is configured"""
+        if self.archive:
+            self.archive.add(url, response.content, self._declared_encoding(response))
     
     def _extract_rating(self, article) -> Optional[int]:
         """Extract rating from product article element"""
@@ -93,10 +294,7 @@ class ProductScraper:
             a_element = h3_element.find('a')
             if a_element and a_element.get('href'):
                 # Convert relative URL to absolute
-                relative_url = a_element['href']
-                # Remove '../../../' prefix if present
-                relative_url = relative_url.replace('../../../', 'catalogue/')
-                return urljoin(self.MAIN_URL, relative_url)
+                return self._build_product_url(a_element['href'])
         return None
     
     def _extract_title(self, article) -> Optional[str]:
@@ -108,6 +306,489 @@ class ProductScraper:
                 return a_element.get('title', a_element.text.strip())
         return None
     
+    def _compile_selectors(self):
+        """Compile the XPath selectors used by the lxml backend"""
+        self._xpath_text = etree.XPath("string()")
+        self._xpath_info_rows = etree.XPath("//table//tr[th and td]")
+        self._xpath_description = etree.XPath("//div[@id='product_description']/following-sibling::p[1]")
+        self._xpath_breadcrumb = etree.XPath(
+            "//ul[contains(concat(' ', normalize-space(@class), ' '), ' breadcrumb ')]/li"
+        )
+    
+    def _extract_product(self, article) -> Dict[str, any]:
+        """
+        Extract every field of a product article in a single walk
+        
+        Equivalent to calling all the _extract_* methods, but visits the
+        article's subtree once and stops as soon as every field is found.
+        
+        Args:
+            article: BeautifulSoup article.product_pod element
+            
+        Returns:
+            Product dictionary
+        """
+        product = {'title': None, 'price': None, 'rating': None, 'availability': "Unknown", 'url': None}
+        missing = {'link', 'price', 'rating', 'availability'}
+        h3_element = None
+        
+        for element in article.descendants:
+            name = element.name
+            if name == 'p':
+                classes = element.get('class', [])
+                if 'price' in missing and 'price_color' in classes:
+                    product['price'] = element.text.strip()
+                    missing.discard('price')
+                elif 'rating' in missing and 'star-rating' in classes:
+                    for css_class in classes:
+                        if css_class in self.RATING_MAP:
+                            product['rating'] = self.RATING_MAP[css_class]
+                            break
+                    missing.discard('rating')
+                elif 'availability' in missing and ' '.join(classes) == 'instock availability':
+                    product['availability'] = element.text.strip()
+                    missing.discard('availability')
+            elif name == 'h3':
+                if h3_element is None:
+                    h3_element = element
+            elif name == 'a' and 'link' in missing and h3_element is not None:
+                parent = element.parent
+                while parent is not h3_element and parent is not article:
+                    parent = parent.parent
+                if parent is h3_element:
+                    product['title'] = element.get('title', element.text.strip())
+                    if element.get('href'):
+                        product['url'] = self._build_product_url(element['href'])
+                    missing.discard('link')
+            
+            if not missing:
+                break
+        
+        return product
+    
+    def _extract_product_lxml(self, article) -> Dict[str, any]:
+        """
+        Extract every field of a product article in a single walk (lxml)
+        
+        Args:
+            article: lxml article.product_pod element
+            
+        Returns:
+            Product dictionary
+        """
+        product = {'title': None, 'price': None, 'rating': None, 'availability': "Unknown", 'url': None}
+        missing = {'link', 'price', 'rating', 'availability'}
+        h3_element = None
+        
+        for element in article.iter('p', 'h3', 'a'):
+            tag = element.tag
+            if tag == 'p':
+                classes = (element.get('class') or '').split()
+                if 'price' in missing and 'price_color' in classes:
+                    product['price'] = self._xpath_text(element).strip()
+                    missing.discard('price')
+                elif 'rating' in missing and 'star-rating' in classes:
+                    for css_class in classes:
+                        if css_class in self.RATING_MAP:
+                            product['rating'] = self.RATING_MAP[css_class]
+                            break
+                    missing.discard('rating')
+                elif 'availability' in missing and ' '.join(classes) == 'instock availability':
+                    product['availability'] = self._xpath_text(element).strip()
+                    missing.discard('availability')
+            elif tag == 'h3':
+                if h3_element is None:
+                    h3_element = element
+            elif 'link' in missing and h3_element is not None:
+                parent = element.getparent()
+                while parent is not h3_element and parent is not article:
+                    parent = parent.getparent()
+                if parent is h3_element:
+                    title = element.get('title')
+                    product['title'] = title if title is not None else self._xpath_text(element).strip()
+                    if element.get('href'):
+                        product['url'] = self._build_product_url(element.get('href'))
+                    missing.discard('link')
+            
+            if not missing:
+                break
+        
+        return product
+    
+    def _build_product_url(self, href: str) -> str:
+        """Convert a product link from a listing page into an absolute URL"""
+        if '://' in href or href.startswith('/'):
+            return urljoin(self.MAIN_URL, href)
+        
+        # Product pages all live under /catalogue/, but links are relative to
+        # the listing: 'catalogue/x/index.html' on the home page, 'x/index.html'
+        # on catalogue pages and '../../../x/index.html' on category pages
+        while href.startswith('../'):
+            href = href[3:]
+        if not href.startswith('catalogue/'):
+            href = 'catalogue/' + href
+        return urljoin(self.MAIN_URL, href)
+    
+    def _declared_encoding(self, response: requests.Response) -> str:
+        """
+        Get the charset a response declares for itself
+        
+        Args:
+            response: HTTP response
+            
+        Returns:
+            Codec name
+        """
+        return self.detect_encoding(response.content, response.headers.get('Content-Type', ''))
+    
+    @classmethod
+    def detect_encoding(cls, content: bytes, content_type: str = '') -> str:
+        """
+        Get the charset a page declares for itself
+        
+        Uses the Content-Type header, then the page's <meta> charset, and
+        falls back to UTF-8, so the parser never has to sniff the encoding.
+        
+        Args:
+            content: Raw page body
+            content_type: Content-Type header value, if known
+            
+        Returns:
+            Codec name
+        """
+        match = cls.CHARSET_PATTERN.search(content_type)
+        if match:
+            encoding = match.group(1)
+        else:
+            match = cls.META_CHARSET_PATTERN.search(content[:2048])
+            encoding = match.group(1).decode('ascii') if match else 'utf-8'
+        
+        try:
+            return codecs.lookup(encoding).name
+        except LookupError:
+            return 'utf-8'
+    
+    def parse_products(self, content: bytes, encoding: str = 'utf-8') -> List[Dict[str, any]]:
+        """
+        Extract products from the HTML of a listing page
+        
+        Args:
+            content: Raw page body
+            encoding: Charset the body is encoded with
+            
+        Returns:
+            List of product dictionaries
+        """
+        with tracer.span('parse_products', parser=self.parser, size=len(content)):
+            if self.parser == 'lxml':
+                return self._parse_products_lxml(content, encoding)
+            return self._parse_products_soup(content, encoding)
+    
+    def _parse_products_soup(self, content: bytes, encoding: str) -> List[Dict[str, any]]:
+        """Extract products with BeautifulSoup's html.parser backend"""
+        # Only build the product grid, not the whole document
+        with metrics.PARSE_SECONDS.time(), tracer.span('parse', parser='html.parser'):
+            soup = BeautifulSoup(
+                content,
+                'html.parser',
+                parse_only=SoupStrainer('article', class_='product_pod'),
+                from_encoding=encoding
+            )
+        products = []
+        
+        with metrics.EXTRACT_SECONDS.time(), tracer.span('extract'):
+            for article in soup.find_all('article', class_='product_pod'):
+                product = self._extract_product(article)
+                
+                # Only add if we have at least title and price
+                if product['title'] and product['price']:
+                    products.append(product)
+        
+        return products
+    
+    def _parse_products_lxml(self, content: bytes, encoding: str) -> List[Dict[str, any]]:
+        """Extract products with the lxml backend, streaming one article at a time"""
+        products = []
+        events = etree.iterparse(
+            io.BytesIO(content), events=('end',), tag='article', html=True, encoding=encoding
+        )
+        
+        # Parsing and extraction interleave here, so extraction time is summed per article
+        start = time.perf_counter()
+        extract_seconds = 0.0
+        for _, article in events:
+            if 'product_pod' not in (article.get('class') or '').split():
+                continue
+            
+            extract_start = time.perf_counter()
+            with tracer.span('extract'):
+                product = self._extract_product_lxml(article)
+            
+            # Only add if we have at least title and price
+            if product['title'] and product['price']:
+                products.append(product)
+            extract_seconds += time.perf_counter() - extract_start
+            
+            # Drop the finished article and its predecessors to keep memory flat
+            article.clear()
+            while article.getprevious() is not None:
+                del article.getparent()[0]
+        
+        metrics.EXTRACT_SECONDS.observe(extract_seconds)
+        metrics.PARSE_SECONDS.observe(time.perf_counter() - start - extract_seconds)
+        return products
+    
+    def parse_product_details(self, content: bytes, encoding: str = 'utf-8') -> Dict[str, any]:
+        """
+        Extract the fields only shown on a product detail page
+        
+        Args:
+            content: Raw page body
+            encoding: Charset the body is encoded with
+            
+        Returns:
+            Dictionary with upc, description, stock_count and category
+        """
+        if self.parser == 'lxml':
+            root = etree.fromstring(content, etree.HTMLParser(encoding=encoding))
+            if root is None:
+                return {}
+            info = {
+                self._xpath_text(row.find('th')).strip(): self._xpath_text(row.find('td')).strip()
+                for row in self._xpath_info_rows(root)
+            }
+            description_elements = self._xpath_description(root)
+            description = self._xpath_text(description_elements[0]).strip() if description_elements else None
+            breadcrumb = [self._xpath_text(item).strip() for item in self._xpath_breadcrumb(root)]
+        else:
+            soup = BeautifulSoup(content, 'html.parser', from_encoding=encoding)
+            info = {
+                row.th.text.strip(): row.td.text.strip()
+                for row in soup.select('table tr') if row.th and row.td
+            }
+            description_header = soup.find('div', id='product_description')
+            description_element = description_header.find_next_sibling('p') if description_header else None
+            description = description_element.text.strip() if description_element else None
+            breadcrumb_element = soup.find('ul', class_='breadcrumb')
+            breadcrumb = [item.text.strip() for item in breadcrumb_element.find_all('li')] if breadcrumb_element else []
+        
+        stock_match = self.STOCK_PATTERN.search(info.get('Availability', ''))
+        return {
+            'upc': info.get('UPC'),
+            'description': description,
+            'stock_count': int(stock_match.group(1)) if stock_match else 0,
+            # Home > Books > Category > Title
+            'category': breadcrumb[2] if len(breadcrumb) > 3 else None
+        }
+    
+    def scrape_product_details(self, url: str) -> Optional[Dict[str, any]]:
+        """
+        Fetch and parse a single product detail page
+        
+        Args:
+            url: Product page URL
+            
+        Returns:
+            Detail dictionary, or None if the page could not be fetched
+        """
+        response = self._make_request(url)
+        if not response:
+            return None
+        return self.parse_product_details(response.content, self._declared_encoding(response))
+    
+    def _product_details_attempt(self, url: str,
+                                 attempt: int) -> Tuple[Optional[Dict[str, any]], Optional[float], int]:
+        """
+        Make a single attempt at fetching a product detail page
+        
+        Args:
+            url: Product page URL
+            attempt: Zero-based attempt number
+            
+        Returns:
+            Tuple of (details, retry delay, next attempt number). Details are
+            None if the attempt failed; the delay says when to try again, or
+            is None once all attempts are used up.
+        """
+        response, retry_in, next_attempt = self._fetch(url, attempt)
+        if response is None:
+            return None, retry_in, next_attempt
+        return self.parse_product_details(response.content, self._declared_encoding(response)), None, next_attempt
+    
+    def iter_product_details(self, urls: Iterable[str],
+                             max_concurrency: Optional[int] = None) -> Iterator[Tuple[str, Optional[Dict[str, any]]]]:
+        """
+        Fetch product detail pages concurrently, yielding them as they finish
+        
+        Requests go through the same rate limiter and retry logic as listing
+        pages, and like the concurrent page scheduler a failed attempt
+        doesn't hold its worker: the URL is put back with a due time. URLs
+        whose details were already fetched by this scraper are not requested
+        again. Closing the generator early cancels the pages that haven't
+        started yet.
+        
+        Args:
+            urls: Product page URLs (duplicates are fetched once)
+            max_concurrency: Detail pages in flight at once
+                (defaults to the scraper's max_concurrency)
+            
+        Yields:
+            Tuples of (url, detail dictionary or None if the fetch failed)
+        """
+        queue = []
+        for url in dict.fromkeys(urls):
+            if url in self._details:
+                self._details.move_to_end(url)
+                yield url, self._details[url]
+            elif url:
+                queue.append(url)
+        
+        if not queue:
+            return
+        
+        workers = max(1, max_concurrency or self.max_concurrency)
+        queue.reverse()
+        # Failed attempts waiting for their due time: (due, url, next attempt)
+        retries = []
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = {}
+            try:
+                while True:
+                    # Keep the pool full: due retries first, then new URLs
+                    now = time.monotonic()
+                    while len(pending) < workers:
+                        if retries and retries[0][0] <= now:
+                            _, url, attempt = heapq.heappop(retries)
+                        elif queue:
+                            url, attempt = queue.pop(), 0
+                        else:
+                            break
+                        pending[executor.submit(self._product_details_attempt, url, attempt)] = url
+                    
+                    if not pending and not retries:
+                        break
+                    
+                    timeout = max(0.0, retries[0][0] - now) if retries else None
+                    if not pending:
+                        with tracer.span('wait for retry', seconds=round(timeout, 3)):
+                            time.sleep(timeout)
+                        continue
+                    
+                    with tracer.span('wait for details', in_flight=len(pending), queued_retries=len(retries)):
+                        done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        url = pending.pop(future)
+                        details, retry_in, next_attempt = future.result()
+                        if details is None and retry_in is not None:
+                            # Requeue instead of sleeping in the worker, which moves on to other URLs
+                            heapq.heappush(retries, (time.monotonic() + retry_in, url, next_attempt))
+                            continue
+                        if details is not None:
+                            self._remember_details(url, details)
+                        yield url, details
+            finally:
+                # The consumer may stop early: don't fetch pages nobody will read
+                for future in pending:
+                    future.cancel()
+    
+    def _remember_details(self, url: str, details: Dict[str, any]):
+        """Cache a product's detail fields, evicting the least recently used beyond DETAILS_CACHE_SIZE"""
+        self._details[url] = details
+        self._details.move_to_end(url)
+        while len(self._details) > self.DETAILS_CACHE_SIZE:
+            self._details.popitem(last=False)
+    
+    def iter_enriched_products(self, products: List[Dict[str, any]], max_concurrency: Optional[int] = None,
+                               progress_callback=None) -> Iterator[Dict[str, any]]:
+        """
+        Merge detail-page fields into products, yielding each as soon as it is ready
+        
+        Products are yielded in completion order so they can be streamed
+        into processing while other detail pages are still being fetched.
+        Products without a URL, or whose detail page failed, are yielded
+        unchanged.
+        
+        Args:
+            products: Product dictionaries from the listing pages
+            max_concurrency: Detail pages in flight at once
+            progress_callback: Optional callback function(current, total, message)
+            
+        Yields:
+            Enriched product dictionaries
+        """
+        by_url = {}
+        for product in products:
+            # A missing and an empty URL both mean there is no detail page
+            by_url.setdefault(product.get('url') or None, []).append(product)
+        without_url = by_url.pop(None, [])
+        
+        for index, (url, details) in enumerate(self.iter_product_details(by_url, max_concurrency), 1):
+            if progress_callback:
+                progress_callback(index, len(by_url), f"Fetched details {index}/{len(by_url)}...")
+            for product in by_url[url]:
+                yield {**product, **details} if details else product
+        
+        for product in without_url:
+            yield product
+    
+    def enrich_products(self, products: List[Dict[str, any]], max_concurrency: Optional[int] = None,
+                        progress_callback=None) -> List[Dict[str, any]]:
+        """
+        Add UPC, description, stock count and category from each product's detail page
+        
+        Args:
+            products: Product dictionaries from the listing pages
+            max_concurrency: Detail pages in flight at once
+            progress_callback: Optional callback function(current, total, message)
+            
+        Returns:
+            Enriched product dictionaries, in the order their detail pages
+            finished (see iter_enriched_products)
+        """
+        return list(self.iter_enriched_products(products, max_concurrency, progress_callback))
+    
+    def _page_url(self, page_number: int) -> str:
+        """Get the URL of a listing page"""
+        if page_number == 1:
+            return f"{self.MAIN_URL}/index.html"
+        return self.BASE_URL.format(page_number)
+    
+    @classmethod
+    def listing_page_number(cls, url: str) -> Optional[int]:
+        """
+        Get the page number of a listing page URL (the inverse of _page_url)
+        
+        Args:
+            url: Page URL
+            
+        Returns:
+            Page number, or None if the URL is not a listing page (e.g. a
+            product detail page, /catalogue/<slug>/index.html)
+        """
+        path = urlparse(url).path
+        match = cls.LISTING_URL_PATTERN.search(path)
+        if not match:
+            return None
+        if match.group(1):
+            # Only the site root's index.html is page 1
+            return 1 if '/catalogue/' not in path else None
+        return int(match.group(2))
+    
+    @classmethod
+    def parse_page_count(cls, content: bytes) -> Optional[int]:
+        """
+        Read the total number of listing pages from the pager
+        
+        Args:
+            content: Raw body of a listing page
+            
+        Returns:
+            Page count from "Page X of N", or None if the page has no pager
+        """
+        match = cls.PAGER_PATTERN.search(content)
+        return int(match.group(1)) if match else None
+    
     def scrape_page(self, page_number: int) -> List[Dict[str, any]]:
         """
         Scrape a single page of product listings
@@ -118,65 +799,356 @@ class ProductScraper:
         Returns:
             List of product dictionaries
         """
-        if page_number == 1:
-            url = "https://books.toscrape.com/index.html"
-        else:
-            url = self.BASE_URL.format(page_number)
+        products, _ = self._scrape_listing(page_number)
+        return products
+    
+    def _scrape_listing(self, page_number: int) -> Tuple[List[Dict[str, any]], Optional[int]]:
+        """
+        Scrape a single page of product listings and read its pager
+        
+        Args:
+            page_number: Page number to scrape
+            
+        Returns:
+            Tuple of (list of product dictionaries, total page count or None)
+        """
+        url = self._page_url(page_number)
         
         print(f"Scraping page {page_number}: {url}")
         
-        # Rate limiting
-        time.sleep(self.rate_limit)
+        with tracer.span('page', page=page_number):
+            response = self._make_request(url)
+            if not response:
+                return [], None
+            
+            products, page_count = self._listing_products(page_number, url, response)
+        self._count_page(products)
+        return products, page_count
+    
+    def _scrape_listing_attempt(self, page_number: int,
+                                attempt: int) -> Tuple[Optional[List[Dict[str, any]]], Optional[float], int]:
+        """
+        Make a single attempt at scraping a page of product listings
         
-        response = self._make_request(url)
-        if not response:
-            return []
+        Args:
+            page_number: Page number to scrape
+            attempt: Zero-based attempt number
+            
+        Returns:
+            Tuple of (products, retry delay, next attempt number). If the
+            attempt failed and may be retried, products is None and the delay
+            says when; once all attempts are used up, products is an empty list.
+        """
+        url = self._page_url(page_number)
         
-        soup = BeautifulSoup(response.content, 'html.parser')
-        products = []
+        if attempt == 0:
+            print(f"Scraping page {page_number}: {url}")
         
-        # Find all product articles
-        articles = soup.find_all('article', class_='product_pod')
+        with tracer.span('page', page=page_number, attempt=attempt):
+            response, retry_in, next_attempt = self._fetch(url, attempt)
+            if response is None:
+                return (None if retry_in is not None else []), retry_in, next_attempt
+            
+            products, _ = self._listing_products(page_number, url, response)
+        self._count_page(products)
+        return products, None, next_attempt
+    
+    def _listing_products(self, page_number: int, url: str,
+                          response: requests.Response) -> Tuple[List[Dict[str, any]], Optional[int]]:
+        """
+        Get the products and the page count of a fetched listing page
         
-        for article in articles:
-            product = {
-                'title': self._extract_title(article),
-                'price': self._extract_price(article),
-                'rating': self._extract_rating(article),
-                'availability': self._extract_availability(article),
-                'url': self._extract_product_url(article)
-            }
+        Args:
+            page_number: Page number
+            url: Page URL
+            response: Successful response
             
-            # Only add if we have at least title and price
-            if product['title'] and product['price']:
-                products.append(product)
+        Returns:
+            Tuple of (list of product dictionaries, total page count or None)
+        """
+        page_count = self.parse_page_count(response.content)
+        
+        if self.tracker:
+            products = self.tracker.unchanged_page_products(url, response.content)
+            if products is not None:
+                print(f"Page {page_number} unchanged, skipping {len(products)} products")
+                return products, page_count
+        
+        if getattr(response, 'from_cache', False):
+            products = self.cache.get_products(url)
+            if products is not None:
+                print(f"Page {page_number} not modified, reusing {len(products)} cached products")
+                return products, page_count
+        
+        products = self.parse_products(response.content, self._declared_encoding(response))
+        if self.cache:
+            self.cache.store_products(url, products)
         
         print(f"Found {len(products)} products on page {page_number}")
-        return products
+        return products, page_count
+    
+    @staticmethod
+    def _count_page(products: List[Dict[str, any]]):
+        """Add a fetched listing page to the throughput counters"""
+        metrics.PAGES_SCRAPED.inc()
+        metrics.PRODUCTS_SCRAPED.inc(len(products))
+    
+    def _record_page(self, job_id: Optional[str], page_number: int, products: List[Dict[str, any]]):
+        """Save a completed page to the checkpoint store, if one is configured"""
+        # Empty pages are not recorded so a resumed crawl retries them
+        if self.checkpoint and job_id and products:
+            self.checkpoint.save_page(job_id, page_number, products)
     
-    def scrape_multiple_pages(self, num_pages: int, progress_callback=None) -> List[Dict[str, any]]:
+    def scrape_multiple_pages(self, num_pages: Optional[int] = None, progress_callback=None,
+                              job_id: Optional[str] = None) -> List[Dict[str, any]]:
         """
         Scrape multiple pages of product listings
         
+        Collects everything ``iter_products`` yields into one list.
+        
         Args:
-            num_pages: Number of pages to scrape
+            num_pages: Number of pages to scrape; None or 0 scrapes every page
             progress_callback: Optional callback function(current, total, message)
+            job_id: Optional checkpoint job ID, see iter_products
             
         Returns:
-            List of all product dictionaries from all pages
+            List of all product dictionaries from all pages. With a change
+            tracker configured, only the products that are new, changed or
+            removed since the last crawl, each with a ``change`` field.
+        """
+        return list(self.iter_products(num_pages, progress_callback=progress_callback, job_id=job_id))
+    
+    def iter_products(self, num_pages: Optional[int] = None, progress_callback=None,
+                      job_id: Optional[str] = None) -> Iterator[Dict[str, any]]:
         """
-        all_products = []
+        Scrape multiple pages of product listings, yielding products as they are extracted
         
-        for page_num in range(1, num_pages + 1):
-            if progress_callback:
-                progress_callback(page_num, num_pages, f"Scraping page {page_num}/{num_pages}...")
+        The first page is fetched on its own to read the total page count
+        from its pager ("Page 1 of N"). The request is clamped to that count
+        and all remaining pages are scheduled at once. If the pager is
+        missing, pages are fetched until one comes back empty.
+        
+        Products are yielded in page order as soon as each page (and every
+        page before it) is done, so processing and export can start while
+        later pages are still being fetched. Only pages that finished out of
+        order are held back. Closing the generator early cancels the pages
+        that haven't started yet.
+        
+        Args:
+            num_pages: Number of pages to scrape; None or 0 scrapes every page
+            progress_callback: Optional callback function(current, total, message)
+            job_id: Optional job ID. With a checkpoint store configured, every
+                finished page is recorded under it, and running the same job
+                ID again resumes the crawl (with its original page request),
+                fetching only the missing pages.
             
-            products = self.scrape_page(page_num)
-            all_products.extend(products)
+        Yields:
+            Product dictionaries. With a change tracker configured, only the
+            products that are new, changed or removed since the last crawl,
+            each with a ``change`` field; removed ones come last.
+        """
+        done = {}
+        page_count = None
+        
+        if self.checkpoint and job_id:
+            job = self.checkpoint.start_job(job_id, num_pages)
+            num_pages = job['num_pages']
+            page_count = job['page_count']
+            done = self.checkpoint.load_pages(job_id)
+            if done:
+                print(f"Resuming job {job_id}: {len(done)} page(s) already done")
+        
+        if 1 not in done or not page_count:
+            first_products, page_count = self._scrape_listing(1)
+            if not first_products:
+                print("No products found on page 1. Stopping.")
+                return
+            done[1] = first_products
+            self._record_page(job_id, 1, first_products)
+            if self.checkpoint and job_id and page_count:
+                self.checkpoint.set_page_count(job_id, page_count)
+        
+        if page_count:
+            if num_pages and num_pages > page_count:
+                print(f"Catalogue has only {page_count} pages")
+            last_page = min(num_pages, page_count) if num_pages else page_count
+        else:
+            # No pager: fall back to stopping at the first empty page
+            last_page = num_pages or None
+        
+        if last_page:
+            done = {page_num: products for page_num, products in done.items() if page_num <= last_page}
+        
+        total = last_page or len(done)
+        if progress_callback:
+            progress_callback(len(done), total, f"Scraped {len(done)}/{last_page or '?'} pages...")
+        
+        if self.tracker:
+            self.tracker.start_run()
+        
+        crawled = set()
+        for page_num, products in self._iter_pages(done, last_page, not page_count, total, progress_callback, job_id):
+            if not products:
+                continue
+            crawled.add(page_num)
+            if self.tracker:
+                products = self.tracker.diff_page(self._page_url(page_num), products)
+            yield from products
+        
+        missing = [page_num for page_num in range(1, (last_page or 0) + 1) if page_num not in crawled]
+        if self.checkpoint and job_id:
+            if missing:
+                print(f"Job {job_id} is missing {len(missing)} page(s); run it again to resume")
+            else:
+                self.checkpoint.finish_job(job_id)
+        
+        if self.tracker:
+            # Products are only reported as removed after a crawl of the whole catalogue;
+            # one missing from a crawled page may have moved to a page that wasn't crawled
+            complete = bool(page_count) and last_page == page_count and not missing
+            yield from self.tracker.finish_run(complete=complete)
+    
+    def _iter_pages(self, done: Dict[int, List[Dict[str, any]]], last_page: Optional[int],
+                    stop_on_empty: bool, total: int, progress_callback=None,
+                    job_id: Optional[str] = None) -> Iterator[Tuple[int, List[Dict[str, any]]]]:
+        """
+        Scrape the listing pages that aren't done yet and yield every page in order
+        
+        Args:
+            done: Pages already scraped, mapping page number to its products
+                (consumed as the pages are yielded)
+            last_page: Last page to scrape, or None to stop at the first empty page
+            stop_on_empty: Treat an empty page as the end of the catalogue
+            total: Total number of pages, for progress reporting
+            progress_callback: Optional callback function(current, total, message)
+            job_id: Optional checkpoint job ID to record finished pages under
+            
+        Yields:
+            Tuples of (page number, list of product dictionaries)
+        """
+        if last_page and self.max_concurrency > 1:
+            remaining = [page_num for page_num in range(2, last_page + 1) if page_num not in done]
+            next_page = 1
+            pages = self._scrape_pages_concurrently(
+                remaining, last_page, stop_on_empty=stop_on_empty,
+                progress_callback=progress_callback, job_id=job_id, completed=len(done)
+            )
+            for page_num, products in pages:
+                done[page_num] = products
+                if stop_on_empty and not products:
+                    last_page = min(last_page, page_num - 1)
+                # Hand out every page that is now contiguous with the ones already yielded
+                while next_page <= last_page and next_page in done:
+                    yield next_page, done.pop(next_page)
+                    next_page += 1
+            while next_page <= last_page and next_page in done:
+                yield next_page, done.pop(next_page)
+                next_page += 1
+            return
+        
+        page_num = 1
+        while last_page is None or page_num <= last_page:
+            if page_num in done:
+                products = done.pop(page_num)
+            else:
+                if progress_callback:
+                    progress_callback(page_num, max(total, page_num),
+                                      f"Scraping page {page_num}/{last_page or '?'}...")
+                
+                products = self.scrape_page(page_num)
+                self._record_page(job_id, page_num, products)
+            
+            yield page_num, products
             
-            # Check if we got no products (might have reached the last page)
             if not products:
-                print(f"No products found on page {page_num}. Stopping.")
-                break
+                # Without a pager an empty page is the end of the catalogue; with one it is a
+                # failed page, left for iter_products to report as missing
+                if stop_on_empty:
+                    print(f"No products found on page {page_num}. Stopping.")
+                    break
+                print(f"No products found on page {page_num}, moving on")
+            page_num += 1
+    
+    def _scrape_pages_concurrently(self, pages: List[int], total: int, stop_on_empty: bool = False,
+                                   progress_callback=None, job_id: Optional[str] = None,
+                                   completed: int = 0) -> Iterator[Tuple[int, List[Dict[str, any]]]]:
+        """
+        Scrape pages with a thread pool sharing this scraper's session
         
-        return all_products
+        At most ``max_concurrency`` pages are in flight at once, and pages
+        are yielded (and the progress callback invoked) from the calling
+        thread as each one finishes. A failed attempt doesn't hold its
+        worker: the page is put back with a due time and the worker moves on
+        to the next page. With ``stop_on_empty`` the first empty page marks
+        the end of the catalogue: no further pages are scheduled or yielded.
+        
+        Args:
+            pages: Page numbers to scrape, in ascending order
+            total: Total number of pages, for progress reporting
+            stop_on_empty: Treat an empty page as the end of the catalogue
+            progress_callback: Optional callback function(current, total, message)
+            job_id: Optional checkpoint job ID to record finished pages under
+            completed: Number of pages already done, for progress reporting
+            
+        Yields:
+            Tuples of (page number, list of product dictionaries) in
+            completion order
+        """
+        last_page = pages[-1] if pages else 0
+        queue = list(reversed(pages))
+        # Failed attempts waiting for their due time: (due, page number, next attempt)
+        retries = []
+        
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            pending = {}
+            try:
+                while True:
+                    # Keep the pool full: due retries first, then new pages up to the last known page
+                    now = time.monotonic()
+                    while len(pending) < self.max_concurrency:
+                        if retries and retries[0][0] <= now:
+                            _, page_num, attempt = heapq.heappop(retries)
+                            if page_num > last_page:
+                                continue
+                        elif queue and queue[-1] <= last_page:
+                            page_num, attempt = queue.pop(), 0
+                        else:
+                            break
+                        future = executor.submit(self._scrape_listing_attempt, page_num, attempt)
+                        pending[future] = (page_num, attempt)
+                    
+                    if not pending and not retries:
+                        break
+                    
+                    timeout = max(0.0, retries[0][0] - now) if retries else None
+                    if not pending:
+                        with tracer.span('wait for retry', seconds=round(timeout, 3)):
+                            time.sleep(timeout)
+                        continue
+                    
+                    with tracer.span('wait for pages', in_flight=len(pending), queued_retries=len(retries)):
+                        done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        page_num, _ = pending.pop(future)
+                        products, retry_in, next_attempt = future.result()
+                        if products is None:
+                            # Requeue instead of sleeping in the worker, which moves on to other pages
+                            heapq.heappush(retries, (time.monotonic() + retry_in, page_num, next_attempt))
+                            continue
+                        
+                        self._record_page(job_id, page_num, products)
+                        completed += 1
+                        
+                        if progress_callback:
+                            progress_callback(completed, total, f"Scraped page {page_num}/{total}...")
+                        
+                        if page_num > last_page:
+                            continue
+                        if stop_on_empty and not products:
+                            print(f"No products found on page {page_num}. Stopping.")
+                            last_page = page_num - 1
+                        yield page_num, products
+            finally:
+                # The consumer may stop early: don't start pages nobody will read
+                for future in pending:
+                    future.cancel()
@@ -0,0 +1,129 @@
+"""
+Shared pytest setup: import paths, canned listing pages and a local stand-in for the catalogue site
+"""
+import hashlib
+import os
+import sys
+import threading
+import time
+from typing import List
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, 'benchmarks')]
+
+from fake_site import FakeCatalogue
+
+
+class CannedCatalogue(BaseAdapter):
+    """
+    Transport adapter serving books.toscrape.com listing pages from memory
+    
+    Page N holds ``per_page`` products titled "Book N-1", "Book N-2", ...
+    and a "Page N of M" pager. Responses carry an ETag, so a conditional
+    request for an unchanged page gets a 304; unknown URLs get a 404.
+    ``max_in_flight`` records how many requests were ever served at once.
+    """
+    
+    URL = 'https://books.toscrape.com'
+    
+    ARTICLE = ('<li><article class="product_pod"><p class="star-rating Three"></p>'
+               '<h3><a href="catalogue/{slug}/index.html" title="{title}">{title}</a></h3>'
+               '<div class="product_price"><p class="price_color">£{price}</p>'
+               '<p class="instock availability">In stock</p></div></article></li>')
+    
+    def __init__(self, pages: int = 3, per_page: int = 2, latency: float = 0.0):
+        super().__init__()
+        self.total_pages = pages
+        self.per_page = per_page
+        self.latency = latency
+        self.pages = {self.page_url(page): self.render(page) for page in range(1, pages + 1)}
+        self.requested: List[str] = []
+        self.not_modified = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def page_url(cls, page: int) -> str:
+        """URL of a listing page, as the scraper builds it"""
+        if page == 1:
+            return f'{cls.URL}/index.html'
+        return f'{cls.URL}/catalogue/page-{page}.html'
+    
+    def render(self, page: int, titles: List[str] = None) -> bytes:
+        """Listing page HTML with the given product titles (defaults to the page's own)"""
+        titles = titles if titles is not None else self.titles(page)
+        articles = ''.join(
+            self.ARTICLE.format(slug=title.lower().replace(' ', '-'), title=title, price=f'{10 + index}.99')
+            for index, title in enumerate(titles)
+        )
+        return (f'<html><head><meta charset="utf-8"></head><body><ol class="row">{articles}</ol>'
+                f'<ul class="pager"><li class="current">Page {page} of {self.total_pages}</li></ul>'
+                f'</body></html>').encode('utf-8')
+    
+    def titles(self, page: int = None) -> List[str]:
+        """Product titles of one page, or of every page in order"""
+        if page is None:
+            return [title for number in range(1, self.total_pages + 1) for title in self.titles(number)]
+        return [f'Book {page}-{index}' for index in range(1, self.per_page + 1)]
+    
+    def mount(self, scraper):
+        """Answer every request of a scraper's session from this catalogue"""
+        scraper.session.mount(self.URL, self)
+        return scraper
+    
+    def send(self, request, **kwargs):
+        with self._lock:
+            self.requested.append(request.url)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.latency)
+            return self._respond(request)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+    
+    def _respond(self, request) -> requests.Response:
+        response = requests.Response()
+        response.url = request.url
+        response.request = request
+        response.encoding = 'utf-8'
+        
+        body = self.pages.get(request.url)
+        if body is None:
+            response.status_code = 404
+            response._content = b''
+            return response
+        
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        response.headers = CaseInsensitiveDict({'Content-Type': 'text/html; charset=utf-8', 'ETag': etag})
+        if request.headers.get('If-None-Match') == etag:
+            self.not_modified += 1
+            response.status_code = 304
+            response._content = b''
+        else:
+            response.status_code = 200
+            response._content = body
+        return response
+    
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def canned():
+    """CannedCatalogue, to build listing pages that a scraper fetches without a network"""
+    return CannedCatalogue
+
+
+@pytest.fixture
+def site():
+    """A running FakeCatalogue with 20 listing pages (400 products)"""
+    with FakeCatalogue(pages=20) as catalogue:
+        yield catalogue
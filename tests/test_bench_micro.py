@@ -0,0 +1,34 @@
+"""
+Tests for the microbenchmark runner and its baseline check
+"""
+import json
+import sys
+
+import pytest
+
+import bench_micro
+
+
+def run_bench(monkeypatch, *args):
+    monkeypatch.setattr(sys, 'argv', ['bench_micro.py', '--sizes', '40', '--repeat', '1', *args])
+    bench_micro.main()
+
+
+def test_every_case_is_timed_and_saved_to_the_baseline(monkeypatch, tmp_path):
+    baseline = tmp_path / 'baselines.json'
+    
+    run_bench(monkeypatch, '--baseline', str(baseline), '--save-baseline')
+    
+    results = json.loads(baseline.read_text(encoding='utf-8'))['results']
+    assert set(results) == {f'{name}@40' for name in bench_micro.CASES}
+    assert all(seconds > 0 for seconds in results.values())
+
+
+def test_slowdown_beyond_the_threshold_fails_the_check(monkeypatch, tmp_path):
+    baseline = tmp_path / 'baselines.json'
+    baseline.write_text(json.dumps({'results': {'normalize_price@40': 1e-12}}), encoding='utf-8')
+    
+    with pytest.raises(SystemExit) as exit_info:
+        run_bench(monkeypatch, '--baseline', str(baseline), '--filter', 'normalize_price')
+    
+    assert exit_info.value.code == 1
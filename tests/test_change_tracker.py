@@ -0,0 +1,68 @@
+"""
+Tests for change detection between crawls
+"""
+from change_tracker import ChangeTracker
+from scraper import ProductScraper
+
+PAGE_1 = 'http://127.0.0.1/index.html'
+PAGE_2 = 'http://127.0.0.1/catalogue/page-2.html'
+
+
+def product(name: str, price: str = '£10.00'):
+    return {'title': name, 'price': price, 'url': f'http://127.0.0.1/catalogue/{name}/index.html'}
+
+
+def crawl(tracker: ChangeTracker, pages, complete: bool):
+    """Run one crawl over {page url: (body, products)}; returns every reported change"""
+    tracker.start_run()
+    changes = []
+    for page_url, (body, products) in pages.items():
+        stored = tracker.unchanged_page_products(page_url, body)
+        changes.extend(tracker.diff_page(page_url, stored if stored is not None else products))
+    return changes + tracker.finish_run(complete=complete)
+
+
+def test_second_crawl_reports_only_what_changed(canned, tmp_path):
+    tracker = ChangeTracker(str(tmp_path / 'tracker.sqlite'))
+    catalogue = canned(pages=3)
+    scraper = catalogue.mount(ProductScraper(requests_per_second=0, tracker=tracker))
+    
+    first = scraper.scrape_multiple_pages(None)
+    assert sorted(product['title'] for product in first) == sorted(catalogue.titles())
+    assert {product['change'] for product in first} == {ChangeTracker.NEW}
+    
+    assert scraper.scrape_multiple_pages(None) == []
+    
+    catalogue.pages[catalogue.page_url(2)] = catalogue.render(2, ['Book 2-1', 'Book 2-9'])
+    changes = scraper.scrape_multiple_pages(None)
+    
+    assert sorted((product['title'], product['change']) for product in changes) == [
+        ('Book 2-2', ChangeTracker.REMOVED), ('Book 2-9', ChangeTracker.NEW)
+    ]
+
+
+def test_product_moving_to_an_uncrawled_page_is_not_removed(tmp_path):
+    tracker = ChangeTracker(str(tmp_path / 'tracker.sqlite'))
+    a, b, c = product('a'), product('b'), product('c')
+    
+    crawl(tracker, {PAGE_1: (b'1', [a, b]), PAGE_2: (b'2', [c])}, complete=True)
+    
+    # b moved to page 2, which this partial crawl doesn't fetch
+    assert crawl(tracker, {PAGE_1: (b'1 without b', [a])}, complete=False) == []
+    
+    # A later crawl of page 1 alone must not read b back from the unchanged page
+    assert tracker.unchanged_page_products(PAGE_1, b'1 without b') == [a]
+    
+    # The next full crawl finds b on page 2: it is neither new nor removed
+    assert crawl(tracker, {PAGE_1: (b'1 without b', [a]), PAGE_2: (b'2 with b', [b, c])}, complete=True) == []
+
+
+def test_unseen_product_is_removed_after_a_complete_crawl(tmp_path):
+    tracker = ChangeTracker(str(tmp_path / 'tracker.sqlite'))
+    a, b = product('a'), product('b')
+    
+    crawl(tracker, {PAGE_1: (b'1', [a, b])}, complete=True)
+    changes = crawl(tracker, {PAGE_1: (b'1 without b', [a])}, complete=True)
+    
+    assert changes == [{**b, 'change': ChangeTracker.REMOVED}]
+    assert crawl(tracker, {PAGE_1: (b'1 without b', [a])}, complete=True) == []
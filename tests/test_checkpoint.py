@@ -0,0 +1,67 @@
+"""
+Tests for resumable crawl checkpoints
+"""
+from checkpoint import CrawlCheckpoint
+from scraper import ProductScraper
+
+
+def page_rows(checkpoint: CrawlCheckpoint) -> int:
+    return checkpoint._db.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+
+
+def test_job_progress_is_saved_and_reloaded(tmp_path):
+    path = str(tmp_path / 'checkpoints.sqlite')
+    checkpoint = CrawlCheckpoint(path)
+    checkpoint.start_job('job1', 3)
+    checkpoint.save_page('job1', 2, [{'title': 'Book 2-1'}])
+    checkpoint.save_page('job1', 1, [{'title': 'Book 1-1'}])
+    
+    reopened = CrawlCheckpoint(path)
+    
+    assert reopened.load_pages('job1') == {1: [{'title': 'Book 1-1'}], 2: [{'title': 'Book 2-1'}]}
+    job = reopened.latest_unfinished_job()
+    assert job['job_id'] == 'job1' and job['num_pages'] == 3 and job['pages_done'] == 2
+    
+    reopened.finish_job('job1')
+    
+    assert reopened.get_job('job1')['finished']
+    assert reopened.latest_unfinished_job() is None
+
+
+def test_resumed_crawl_skips_saved_pages(canned, tmp_path):
+    checkpoint = CrawlCheckpoint(str(tmp_path / 'checkpoints.sqlite'))
+    catalogue = canned(pages=3)
+    scraper = catalogue.mount(ProductScraper(requests_per_second=0, checkpoint=checkpoint))
+    checkpoint.start_job('job1', 3)
+    checkpoint.save_page('job1', 2, [{'title': 'Saved 2-1'}])
+    
+    products = scraper.scrape_multiple_pages(3, job_id='job1')
+    
+    assert catalogue.page_url(2) not in catalogue.requested
+    assert [product['title'] for product in products] == ['Book 1-1', 'Book 1-2', 'Saved 2-1', 'Book 3-1', 'Book 3-2']
+
+
+def test_finished_job_drops_its_pages(site, tmp_path):
+    checkpoint = CrawlCheckpoint(str(tmp_path / 'checkpoints.sqlite'))
+    scraper = ProductScraper(base_url=site.url, requests_per_second=0, checkpoint=checkpoint)
+    
+    products = scraper.scrape_multiple_pages(5, job_id='job1')
+    
+    assert len(products) == 100
+    assert page_rows(checkpoint) == 0
+    job = checkpoint.get_job('job1')
+    assert job['finished'] and job['pages_done'] == 0
+    assert checkpoint.latest_unfinished_job() is None
+
+
+def test_unfinished_job_keeps_its_pages(site, tmp_path):
+    checkpoint = CrawlCheckpoint(str(tmp_path / 'checkpoints.sqlite'))
+    scraper = ProductScraper(base_url=site.url, requests_per_second=0, max_retries=1, checkpoint=checkpoint)
+    render = site.render
+    site.render = lambda path: None if path == '/catalogue/page-4.html' else render(path)
+    
+    products = scraper.scrape_multiple_pages(5, job_id='job1')
+    
+    assert len(products) == 80
+    assert page_rows(checkpoint) == 4
+    assert checkpoint.latest_unfinished_job()['job_id'] == 'job1'
@@ -0,0 +1,79 @@
+"""
+Tests for out-of-core chunked processing
+"""
+import pytest
+
+from chunked_processor import BloomFilter, ChunkedProcessor, SeenIndex
+from data_processor import DataProcessor
+
+PRODUCTS = [
+    {'title': f'Book {index}', 'price': f'£{10 + index % 50}.50', 'rating': index % 5 + 1,
+     'availability': 'In stock', 'url': f'https://books.toscrape.com/catalogue/book_{index % 900}/index.html'}
+    for index in range(1000)
+]
+
+
+def test_chunked_result_matches_in_memory_processing(tmp_path):
+    expected = DataProcessor.process_products(PRODUCTS)
+    
+    with ChunkedProcessor(chunk_size=128, spill_dir=str(tmp_path)).process(iter(PRODUCTS)) as result:
+        assert result.paths
+        frame = result.to_frame()
+        stats = result.get_summary_stats()
+    
+    assert result.paths == []
+    assert frame['title'].tolist() == expected['title'].tolist()
+    assert frame['price_numeric'].tolist() == expected['price_numeric'].tolist()
+    assert frame['rating'].tolist() == expected['rating'].tolist()
+    assert stats == pytest.approx(DataProcessor.get_summary_stats(expected))
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, false_positive_rate=0.01)
+    bloom.add_many([f'seen-{index}' for index in range(1000)])
+    
+    assert bloom.contains_many([f'seen-{index}' for index in range(1000)]).all()
+    assert bloom.contains_many([f'other-{index}' for index in range(10_000)]).mean() < 0.03
+
+
+def test_seen_index_flags_only_first_occurrences(tmp_path):
+    index = SeenIndex(str(tmp_path / 'seen.sqlite'), capacity=100)
+    
+    assert index.add_new(['a', 'b', 'a']) == [True, True, False]
+    assert index.add_new(['b', 'c']) == [False, True]
+    index.close()
+
+
+def test_memory_budget_too_small_for_a_chunk_is_refused():
+    with pytest.raises(ValueError):
+        ChunkedProcessor(memory_budget_mb=64)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 100, 5000])
+def test_chunks_never_exceed_chunk_size(tmp_path, chunk_size):
+    processor = ChunkedProcessor(chunk_size=chunk_size, spill_dir=str(tmp_path), expected_products=1000)
+    
+    with processor.process(PRODUCTS) as result:
+        sizes = [len(df) for df in result.iter_frames()]
+        frame = result.to_frame()
+    
+    assert max(sizes) <= chunk_size
+    assert sum(sizes) == 900
+    expected = DataProcessor.process_products(PRODUCTS)
+    assert frame['url'].tolist() == expected['url'].tolist()
+
+
+def test_small_chunks_write_the_same_csv(tmp_path):
+    products = [
+        {'title': 'Complete', 'price': '£12.00', 'rating': 3, 'url': 'a', 'stock_count': 16},
+        {'title': 'Gaps', 'price': '£8.50', 'url': 'b'},
+        {'title': 'Tagged', 'price': '£4.25', 'rating': 5, 'url': 'c', 'in_stock': True},
+    ]
+    expected = tmp_path / 'expected.csv'
+    chunked = tmp_path / 'chunked.csv'
+    DataProcessor.save_to_csv(DataProcessor.process_products(products), str(expected))
+    
+    with ChunkedProcessor(chunk_size=1, spill_dir=str(tmp_path / 'spill')).process(products) as result:
+        assert result.save_to_csv(str(chunked))
+    
+    assert chunked.read_text() == expected.read_text()
@@ -0,0 +1,70 @@
+"""
+Tests for the per-host circuit breaker
+"""
+import time
+
+from circuit_breaker import CircuitBreaker
+
+URL = 'https://books.toscrape.com/catalogue/page-2.html'
+OTHER_HOST = 'https://example.com/index.html'
+
+
+def test_circuit_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    
+    for _ in range(2):
+        breaker.record_failure(URL)
+    assert breaker.allow(URL)
+    
+    breaker.record_failure(URL)
+    
+    assert breaker.state(URL) == CircuitBreaker.OPEN
+    assert not breaker.allow(URL)
+    assert 0 < breaker.retry_in(URL) <= 30
+    assert breaker.allow(OTHER_HOST)
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    
+    breaker.record_failure(URL)
+    breaker.record_success(URL)
+    breaker.record_failure(URL)
+    
+    assert breaker.state(URL) == CircuitBreaker.CLOSED
+
+
+def test_half_open_circuit_lets_one_probe_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure(URL)
+    time.sleep(0.1)
+    
+    assert breaker.allow(URL)
+    assert breaker.state(URL) == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow(URL)
+    
+    breaker.record_success(URL)
+    
+    assert breaker.state(URL) == CircuitBreaker.CLOSED
+    assert breaker.allow(URL)
+
+
+def test_failed_probe_reopens_the_circuit():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure(URL)
+    time.sleep(0.1)
+    assert breaker.allow(URL)
+    
+    breaker.record_failure(URL)
+    
+    assert breaker.state(URL) == CircuitBreaker.OPEN
+    assert not breaker.allow(URL)
+
+
+def test_zero_threshold_disables_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=0)
+    
+    for _ in range(10):
+        breaker.record_failure(URL)
+    
+    assert breaker.allow(URL)
@@ -0,0 +1,121 @@
+"""
+Tests for DataProcessor and the ProductColumns buffer it reads from
+"""
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_processor
+from data_processor import DataProcessor
+from product_columns import ProductColumns
+
+PRODUCTS = [
+    {'title': 'A Light in the Attic', 'price': '£51.77', 'rating': 3, 'availability': 'In stock',
+     'url': 'https://books.toscrape.com/catalogue/a-light-in-the-attic_1000/index.html'},
+    {'title': 'Tipping the Velvet', 'price': '£53.74', 'rating': None, 'availability': 'In stock',
+     'url': 'https://books.toscrape.com/catalogue/tipping-the-velvet_999/index.html'},
+    {'title': 'Soumission', 'price': '£50.10', 'rating': 1, 'availability': 'Out of stock',
+     'url': 'https://books.toscrape.com/catalogue/soumission_998/index.html'},
+    {'title': 'A Light in the Attic', 'price': '£51.77', 'rating': 3, 'availability': 'In stock',
+     'url': 'https://books.toscrape.com/catalogue/a-light-in-the-attic_1000/index.html'},
+]
+
+
+def test_column_cleaning_matches_the_per_value_functions():
+    prices = pd.Series(['£51.77', '£1,234.50', '', None, 'free', '£0.00', '£51.77', '£.5'], dtype=object)
+    availability = pd.Series(['\n  In stock (22 available)\n', 'Out of stock', '', None, '  Preorder ',
+                              'IN STOCK', 'In stock'], dtype=object)
+    
+    assert DataProcessor.normalize_price_column(prices).tolist() == [
+        DataProcessor.normalize_price(price) for price in prices
+    ]
+    assert DataProcessor.clean_availability_column(availability).tolist() == [
+        DataProcessor.clean_availability(value) for value in availability
+    ]
+
+
+def test_products_are_deduplicated_as_they_arrive():
+    columns = ProductColumns(iter(PRODUCTS))
+    
+    assert len(columns) == 3
+    assert columns.duplicates == 1
+    assert list(columns) == PRODUCTS[:3]
+
+
+def test_processed_frame_has_compact_dtypes():
+    df = DataProcessor.process_products(ProductColumns(PRODUCTS))
+    
+    assert df['price_numeric'].dtype == np.float32
+    assert df['rating'].dtype == pd.Int8Dtype()
+    assert df['availability'].dtype == 'category'
+    assert [None if pd.isna(rating) else rating for rating in df['rating']] == [3, None, 1]
+    # float32 prices come back as the prices that were parsed
+    stats = DataProcessor.get_summary_stats(df)
+    assert (stats['min_price'], stats['max_price']) == (50.10, 53.74)
+
+
+def test_price_stays_plain_strings():
+    df = DataProcessor.process_products(ProductColumns(PRODUCTS))
+    
+    assert df['price'].dtype == object
+    assert df['price'].tolist() == ['£51.77', '£53.74', '£50.10']
+    assert df['price'].sort_values().tolist() == ['£50.10', '£51.77', '£53.74']
+
+
+@pytest.mark.parametrize('ratings', [[3, None, 1], [3, 5, 1]])
+def test_csv_round_trip_with_missing_ratings(tmp_path, ratings):
+    products = [{**product, 'rating': rating} for product, rating in zip(PRODUCTS, ratings)]
+    path = str(tmp_path / 'products.csv')
+    
+    df = DataProcessor.process_products(products)
+    assert DataProcessor.save_to_csv(df, path)
+    loaded = pd.read_csv(path)
+    
+    assert loaded['title'].tolist() == [product['title'] for product in products]
+    assert loaded['price'].tolist() == [product['price'] for product in products]
+    assert loaded['price_numeric'].tolist() == [51.77, 53.74, 50.10]
+    assert loaded['availability'].tolist() == ['In stock', 'In stock', 'Out of stock']
+    assert [None if pd.isna(rating) else rating for rating in loaded['rating']] == ratings
+    # Ratings are written as integers, with an empty cell where one is missing
+    with open(path, encoding='utf-8') as f:
+        rows = f.read().splitlines()[1:]
+    assert [row.split(',')[3] for row in rows] == ['' if rating is None else str(rating) for rating in ratings]
+
+
+def test_jsonl_export_writes_one_product_per_line(tmp_path, monkeypatch):
+    monkeypatch.setattr(DataProcessor, 'JSONL_CHUNK_ROWS', 2)
+    path = tmp_path / 'products.jsonl'
+    
+    assert DataProcessor.save(DataProcessor.process_products(PRODUCTS), str(path), 'jsonl')
+    
+    rows = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+    assert [row['title'] for row in rows] == [product['title'] for product in PRODUCTS[:3]]
+    assert [row['price_numeric'] for row in rows] == [51.77, 53.74, 50.10]
+    assert [row['rating'] for row in rows] == [3, None, 1]
+
+
+@pytest.mark.parametrize('output_format', ['parquet', 'feather'])
+def test_arrow_formats_need_pyarrow(tmp_path, monkeypatch, output_format):
+    monkeypatch.setattr(data_processor, 'pyarrow', None)
+    path = str(tmp_path / f'products.{output_format}')
+    
+    assert 'pyarrow' in DataProcessor.format_unavailable(output_format)
+    assert not DataProcessor.save(DataProcessor.process_products(PRODUCTS), path, output_format)
+    assert DataProcessor.format_unavailable('csv') is None
+    assert 'Unknown' in DataProcessor.format_unavailable('xml')
+
+
+@pytest.mark.parametrize('output_format', ['parquet', 'feather'])
+def test_arrow_formats_keep_column_types(tmp_path, output_format):
+    pytest.importorskip('pyarrow')
+    path = str(tmp_path / f'products.{output_format}')
+    df = DataProcessor.process_products(PRODUCTS)
+    
+    assert DataProcessor.save(df, path, output_format)
+    
+    loaded = pd.read_parquet(path) if output_format == 'parquet' else pd.read_feather(path)
+    assert loaded['title'].tolist() == df['title'].tolist()
+    assert loaded['price_numeric'].dtype == np.float32
+    assert loaded['price_numeric'].tolist() == df['price_numeric'].tolist()
@@ -0,0 +1,23 @@
+"""
+Tests for the on-disk HTTP cache
+"""
+from http_cache import HttpCache
+from scraper import ProductScraper
+
+
+def test_unchanged_page_is_revalidated_and_reused(canned, tmp_path):
+    catalogue = canned(pages=2)
+    cache = HttpCache(str(tmp_path / 'cache'))
+    
+    first = catalogue.mount(ProductScraper(rate_limit=0, cache=cache)).scrape_page(2)
+    second = catalogue.mount(ProductScraper(rate_limit=0, cache=cache)).scrape_page(2)
+    
+    assert second == first
+    assert catalogue.not_modified == 1
+    
+    # A changed page is downloaded and parsed again
+    catalogue.pages[catalogue.page_url(2)] = catalogue.render(2, ['Book 2-9'])
+    third = catalogue.mount(ProductScraper(rate_limit=0, cache=cache)).scrape_page(2)
+    
+    assert [product['title'] for product in third] == ['Book 2-9']
+    assert catalogue.not_modified == 1
@@ -0,0 +1,78 @@
+"""
+Tests for the incremental CSV and JSON Lines writers
+"""
+import pytest
+
+from data_processor import DataProcessor, IncrementalCSVWriter, IncrementalWriter
+
+
+def test_base_writer_is_abstract(tmp_path):
+    with pytest.raises(TypeError):
+        IncrementalWriter(str(tmp_path / 'products.csv'))
+    assert not (tmp_path / 'products.csv.part').exists()
+
+
+def test_failed_close_still_closes_the_file(tmp_path, monkeypatch):
+    path = tmp_path / 'products.csv'
+    writer = DataProcessor.open_writer('csv', str(path))
+    writer.write(DataProcessor.process_products([{'title': 'A', 'price': '£1.00', 'url': 'a'}]))
+    
+    def fail(df):
+        raise OSError('disk full')
+    monkeypatch.setattr(writer, '_write_rows', fail)
+    
+    with pytest.raises(OSError):
+        writer.close()
+    
+    assert writer.closed and writer._file.closed
+    assert not path.exists() and (tmp_path / 'products.csv.part').exists()
+
+
+PRODUCTS = [
+    {'title': f'Book {index}', 'price': f'£{10 + index % 7}.99', 'rating': None if index % 5 == 0 else index % 5,
+     'availability': 'In stock', 'url': f'https://books.toscrape.com/catalogue/book_{index % 90}/index.html'}
+    for index in range(250)
+]
+
+
+@pytest.mark.parametrize('output_format', ['csv', 'jsonl'])
+def test_writer_matches_the_one_shot_export(tmp_path, output_format):
+    expected = tmp_path / f'expected.{output_format}'
+    written = tmp_path / f'written.{output_format}'
+    assert DataProcessor.save(DataProcessor.process_products(PRODUCTS), str(expected), output_format)
+    
+    # Hand over the rows page by page, as web_gui does
+    with DataProcessor.open_writer(output_format, str(written), buffer_rows=40) as writer:
+        seen = set()
+        for start in range(0, len(PRODUCTS), 20):
+            page = [product for product in PRODUCTS[start:start + 20] if product['url'] not in seen]
+            seen.update(product['url'] for product in page)
+            writer.write(DataProcessor.process_products(page))
+    
+    assert written.read_bytes() == expected.read_bytes()
+    assert not (tmp_path / f'written.{output_format}.part').exists()
+
+
+def test_interrupted_writer_keeps_only_the_partial_file(tmp_path):
+    path = tmp_path / 'products.csv'
+    
+    with pytest.raises(KeyboardInterrupt):
+        with DataProcessor.open_writer('csv', str(path), buffer_rows=1000) as writer:
+            writer.write(DataProcessor.process_products(PRODUCTS[:30]))
+            raise KeyboardInterrupt
+    
+    assert not path.exists()
+    assert writer.rows_written == 30
+    assert len((tmp_path / 'products.csv.part').read_text(encoding='utf-8').splitlines()) == 31
+    
+    writer.discard()
+    assert not (tmp_path / 'products.csv.part').exists()
+
+
+def test_empty_crawl_writes_a_header_only_csv(tmp_path):
+    path = tmp_path / 'products.csv'
+    
+    with IncrementalCSVWriter(str(path), columns=['title', 'price']) as writer:
+        writer.write(DataProcessor.process_products([]))
+    
+    assert path.read_text(encoding='utf-8') == 'title,price\n'
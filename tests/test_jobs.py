@@ -0,0 +1,104 @@
+"""
+Tests for the priority job scheduler
+"""
+import threading
+import time
+
+import pytest
+
+from jobs import Job, JobScheduler
+
+
+class Recorder:
+    """Job runner that records the order jobs start in; 'blocker' runs until released"""
+    
+    def __init__(self):
+        self.started = []
+        self.release = threading.Event()
+    
+    def __call__(self, job: Job):
+        self.started.append(job.job_id)
+        if job.job_id == 'blocker':
+            while not self.release.wait(0.01):
+                job.check_cancelled()
+        if job.params.get('fail'):
+            raise RuntimeError('page 3 failed')
+
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def wait_until_finished(scheduler: JobScheduler, *job_ids):
+    for job_id in job_ids:
+        wait_for(lambda: not scheduler.get(job_id).is_running)
+
+
+@pytest.fixture
+def recorder():
+    return Recorder()
+
+
+@pytest.fixture
+def scheduler(recorder):
+    scheduler = JobScheduler(recorder, max_workers=1)
+    yield scheduler
+    recorder.release.set()
+    scheduler.shutdown()
+
+
+def test_queued_jobs_run_by_priority_then_submission_order(scheduler, recorder):
+    blocker = scheduler.submit('blocker', {})
+    wait_for(lambda: blocker.state == Job.RUNNING)
+    scheduler.submit('low', {}, priority=0)
+    scheduler.submit('high', {}, priority=5)
+    scheduler.submit('high-later', {}, priority=5)
+    
+    assert scheduler.queue_position(scheduler.get('high')) == 1
+    assert scheduler.queue_position(scheduler.get('low')) == 3
+    
+    recorder.release.set()
+    wait_until_finished(scheduler, 'blocker', 'low', 'high', 'high-later')
+    
+    assert recorder.started == ['blocker', 'high', 'high-later', 'low']
+    assert scheduler.get('low').state == Job.COMPLETED
+
+
+def test_cancelled_queued_job_never_runs(scheduler, recorder):
+    scheduler.submit('blocker', {})
+    queued = scheduler.submit('queued', {})
+    
+    scheduler.cancel('queued')
+    recorder.release.set()
+    wait_until_finished(scheduler, 'blocker')
+    
+    assert queued.state == Job.CANCELLED
+    assert recorder.started == ['blocker']
+
+
+def test_running_job_stops_at_its_next_check(scheduler, recorder):
+    job = scheduler.submit('blocker', {})
+    wait_for(lambda: job.state == Job.RUNNING)
+    
+    scheduler.cancel('blocker')
+    wait_until_finished(scheduler, 'blocker')
+    
+    assert job.state == Job.CANCELLED
+
+
+def test_failing_job_is_marked_failed(scheduler):
+    job = scheduler.submit('broken', {'fail': True})
+    wait_until_finished(scheduler, 'broken')
+    
+    assert job.state == Job.FAILED
+    assert 'page 3 failed' in job.status
+
+
+def test_running_job_id_cannot_be_reused(scheduler):
+    scheduler.submit('blocker', {})
+    
+    with pytest.raises(ValueError):
+        scheduler.submit('blocker', {})
@@ -0,0 +1,62 @@
+"""
+Tests for the job log ring buffer
+"""
+import threading
+
+from log_buffer import LogBuffer
+
+
+def test_reader_gets_only_lines_after_its_cursor():
+    buffer = LogBuffer()
+    for index in range(3):
+        buffer.append(f'line {index}')
+    
+    lines, cursor, missed = buffer.since(0)
+    assert lines == [(1, 'line 0'), (2, 'line 1'), (3, 'line 2')]
+    assert (cursor, missed) == (3, 0)
+    
+    buffer.append('line 3')
+    
+    assert buffer.since(cursor) == ([(4, 'line 3')], 4, 0)
+    assert buffer.since(4) == ([], 4, 0)
+
+
+def test_reader_that_fell_behind_is_told_how_many_lines_it_missed():
+    buffer = LogBuffer(capacity=3)
+    for index in range(10):
+        buffer.append(f'line {index}')
+    
+    lines, cursor, missed = buffer.since(2)
+    
+    assert [line for _, line in lines] == ['line 7', 'line 8', 'line 9']
+    assert (cursor, missed) == (10, 5)
+    assert len(buffer) == 3
+
+
+def test_limit_returns_the_oldest_lines_first():
+    buffer = LogBuffer()
+    for index in range(5):
+        buffer.append(f'line {index}')
+    
+    lines, cursor, _ = buffer.since(0, limit=2)
+    
+    assert lines == [(1, 'line 0'), (2, 'line 1')]
+    assert buffer.since(cursor, limit=2)[0] == [(3, 'line 2'), (4, 'line 3')]
+
+
+def test_stale_cursor_starts_over():
+    buffer = LogBuffer()
+    buffer.append('line 0')
+    
+    assert buffer.since(99) == ([(1, 'line 0')], 1, 0)
+
+
+def test_waiting_reader_wakes_on_append():
+    buffer = LogBuffer()
+    version = buffer.version
+    timer = threading.Timer(0.05, buffer.append, args=('line 0',))
+    timer.start()
+    
+    assert buffer.wait(version, timeout=5) != version
+    assert buffer.wait(buffer.version, timeout=0.01) == buffer.version
+    timer.join()
@@ -0,0 +1,69 @@
+"""
+Tests for the metrics registry and the Prometheus text format
+"""
+import pytest
+
+import metrics
+from metrics import MetricsRegistry
+from scraper import ProductScraper
+
+
+def test_counter_samples_are_rendered_per_label_set():
+    registry = MetricsRegistry()
+    responses = registry.counter('responses_total', 'HTTP responses', ['status'])
+    
+    responses.inc(status=200)
+    responses.inc(2, status=200)
+    responses.inc(status=404)
+    
+    assert registry.render() == (
+        '# HELP responses_total HTTP responses\n'
+        '# TYPE responses_total counter\n'
+        'responses_total{status="200"} 3\n'
+        'responses_total{status="404"} 1\n'
+    )
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram('latency_seconds', 'Latency', buckets=(0.1, 1.0))
+    
+    for value in (0.05, 0.5, 0.7, 3.0):
+        latency.observe(value)
+    
+    lines = registry.render().splitlines()
+    assert lines[2:] == [
+        'latency_seconds_bucket{le="0.1"} 1',
+        'latency_seconds_bucket{le="1"} 3',
+        'latency_seconds_bucket{le="+Inf"} 4',
+        'latency_seconds_sum 4.25',
+        'latency_seconds_count 4',
+    ]
+
+
+def test_wrong_labels_and_duplicate_names_are_refused():
+    registry = MetricsRegistry()
+    responses = registry.counter('responses_total', 'HTTP responses', ['status'])
+    
+    with pytest.raises(ValueError):
+        responses.inc(code=200)
+    with pytest.raises(ValueError):
+        responses.inc(-1, status=200)
+    with pytest.raises(ValueError):
+        registry.counter('responses_total', 'Again')
+
+
+def test_scraping_records_pages_and_responses(canned):
+    catalogue = canned(pages=3)
+    scraper = catalogue.mount(ProductScraper(requests_per_second=0))
+    pages_before = metrics.PAGES_SCRAPED.value()
+    products_before = metrics.PRODUCTS_SCRAPED.value()
+    responses_before = metrics.HTTP_RESPONSES.value(status=200)
+    fetches_before = metrics.FETCH_SECONDS.count()
+    
+    scraper.scrape_multiple_pages(3)
+    
+    assert metrics.PAGES_SCRAPED.value() - pages_before == 3
+    assert metrics.PRODUCTS_SCRAPED.value() - products_before == 6
+    assert metrics.HTTP_RESPONSES.value(status=200) - responses_before == 3
+    assert metrics.FETCH_SECONDS.count() - fetches_before == 3
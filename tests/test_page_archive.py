@@ -0,0 +1,21 @@
+"""
+Tests for the compressed archive of fetched pages
+"""
+import glob
+import os
+
+from page_archive import PageArchive
+from scraper import ProductScraper
+
+
+def test_fetched_pages_are_archived_once_per_content(canned, tmp_path):
+    catalogue = canned(pages=2)
+    archive = PageArchive(str(tmp_path / 'archive'))
+    scraper = catalogue.mount(ProductScraper(rate_limit=0, archive=archive))
+    
+    scraper.scrape_multiple_pages(2)
+    scraper.scrape_multiple_pages(2)
+    
+    assert len(list(archive.iter_records())) == 4
+    assert len(glob.glob(os.path.join(archive.directory, 'blobs', '*', '*.html.gz'))) == 2
+    assert {record['url']: body for record, body in archive.iter_pages()} == catalogue.pages
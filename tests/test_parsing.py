@@ -0,0 +1,56 @@
+"""
+Tests for extracting products from listing and detail pages
+"""
+import pytest
+
+from catalogue_fixture import make_books, render_detail_page, render_listing_page
+from scraper import ProductScraper
+
+BOOKS = make_books(45)
+
+
+def listing(page: int) -> bytes:
+    return render_listing_page(BOOKS, page).encode('utf-8')
+
+
+def test_both_parsers_extract_the_same_products():
+    for page in (1, 2, 3):
+        lxml_products = ProductScraper(parser='lxml').parse_products(listing(page))
+        soup_products = ProductScraper(parser='html.parser').parse_products(listing(page))
+        
+        assert lxml_products == soup_products
+        assert len(lxml_products) == len(BOOKS[(page - 1) * 20:page * 20])
+
+
+@pytest.mark.parametrize('parser', ProductScraper.PARSERS)
+def test_listing_fields_match_the_catalogue(parser):
+    products = ProductScraper(parser=parser).parse_products(listing(1))
+    
+    expected = [{
+        'title': book['title'],
+        'price': f"£{book['price']:.2f}",
+        'rating': ProductScraper.RATING_MAP[book['rating']],
+        'availability': 'In stock' if book['in_stock'] else 'Unknown',
+        'url': f"https://books.toscrape.com/catalogue/{book['slug']}/index.html"
+    } for book in BOOKS[:20]]
+    assert products == expected
+
+
+def test_page_count_is_read_from_the_pager():
+    assert ProductScraper.parse_page_count(listing(1)) == 3
+    assert ProductScraper.parse_page_count(listing(3)) == 3
+    assert ProductScraper.parse_page_count(b'<html><body></body></html>') is None
+
+
+@pytest.mark.parametrize('parser', ProductScraper.PARSERS)
+def test_detail_page_fields(parser):
+    book = next(book for book in BOOKS if book['in_stock'])
+    
+    details = ProductScraper(parser=parser).parse_product_details(render_detail_page(book).encode('utf-8'))
+    
+    assert details == {
+        'upc': book['upc'],
+        'description': book['description'],
+        'stock_count': book['stock'],
+        'category': book['category']
+    }
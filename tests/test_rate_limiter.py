@@ -0,0 +1,60 @@
+"""
+Tests for the per-host rate limiter
+"""
+import time
+
+from rate_limiter import RateLimiter
+
+URL = 'https://books.toscrape.com/catalogue/page-2.html'
+
+
+def test_requests_to_one_host_are_spaced_out():
+    limiter = RateLimiter(requests_per_second=20)
+    
+    start = time.monotonic()
+    for _ in range(5):
+        limiter.acquire(URL)
+    
+    # The first request goes at once, the other four wait 1/20s each
+    assert 0.18 <= time.monotonic() - start < 0.5
+
+
+def test_hosts_have_separate_budgets():
+    limiter = RateLimiter(requests_per_second=1)
+    limiter.acquire(URL)
+    
+    start = time.monotonic()
+    limiter.acquire('https://example.com/other.html')
+    
+    assert time.monotonic() - start < 0.1
+
+
+def test_deferred_host_holds_back_every_request():
+    limiter = RateLimiter(requests_per_second=0)
+    limiter.defer(URL, 0.3)
+    
+    start = time.monotonic()
+    limiter.acquire(URL)
+    
+    assert time.monotonic() - start >= 0.25
+    assert RateLimiter.parse_retry_after('120') == 120
+    assert RateLimiter.parse_retry_after('soon') is None
+
+
+def test_retry_after_is_capped():
+    limiter = RateLimiter(max_retry_after=30)
+    
+    assert limiter.retry_after_delay('5') == 5
+    assert limiter.retry_after_delay('86400') == 30
+    assert limiter.retry_after_delay('Fri, 31 Dec 2100 23:59:59 GMT') == 30
+    assert limiter.retry_after_delay('soon') is None
+
+
+def test_defer_never_pauses_a_host_longer_than_the_cap():
+    limiter = RateLimiter(requests_per_second=0, max_retry_after=0.2)
+    limiter.defer(URL, 86400)
+    
+    start = time.monotonic()
+    limiter.acquire(URL)
+    
+    assert time.monotonic() - start < 1
@@ -0,0 +1,46 @@
+"""
+Tests for offline replay of archived pages
+"""
+from catalogue_fixture import make_books, render_listing_page
+from page_archive import PageArchive
+from replay import collect_tasks, replay
+from scraper import ProductScraper
+
+
+def test_saved_pages_are_replayed_in_page_order(tmp_path):
+    books = make_books(220)
+    for page in (1, 2, 10, 11):
+        (tmp_path / f'page-{page}.html').write_text(render_listing_page(books, page), encoding='utf-8')
+    
+    products = replay(str(tmp_path), max_workers=2)
+    
+    parser = ProductScraper()
+    expected = [product
+                for page in (1, 2, 10, 11)
+                for product in parser.parse_products((tmp_path / f'page-{page}.html').read_bytes())]
+    assert products == expected
+    assert len(products) == 4 * 20
+
+
+def test_archive_replays_listing_pages_in_page_order(site, tmp_path):
+    archive = PageArchive(str(tmp_path))
+    scraper = ProductScraper(base_url=site.url, requests_per_second=0, archive=archive, max_concurrency=4)
+    scraper.scrape_multiple_pages(12)
+    # Detail pages end up in the same archive
+    scraper.enrich_products(scraper.scrape_page(1)[:3])
+    
+    tasks = collect_tasks(str(tmp_path))
+    records = {record['sha256']: url for url, record in archive.latest_records().items()}
+    urls = [records[location.rsplit('|', 1)[1]] for _, location, _ in tasks]
+    
+    assert urls == [scraper._page_url(page) for page in range(1, 13)]
+    assert [product['title'] for product in replay(str(tmp_path), max_workers=2)] == \
+        [product['title'] for product in scraper.scrape_multiple_pages(12)]
+
+
+def test_listing_page_number():
+    scraper = ProductScraper(base_url='http://127.0.0.1:8000')
+    
+    assert ProductScraper.listing_page_number(scraper._page_url(1)) == 1
+    assert ProductScraper.listing_page_number(scraper._page_url(10)) == 10
+    assert ProductScraper.listing_page_number('http://127.0.0.1:8000/catalogue/a-book_1/index.html') is None
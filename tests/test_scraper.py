@@ -0,0 +1,176 @@
+"""
+Tests for ProductScraper against canned pages and the local fake site
+"""
+import threading
+import time
+from urllib.parse import urlparse
+
+import pytest
+
+from circuit_breaker import CircuitBreaker
+from scraper import ProductScraper
+
+
+@pytest.mark.parametrize('max_concurrency', [1, 4])
+def test_pages_are_returned_in_page_order(canned, max_concurrency):
+    catalogue = canned(pages=8, latency=0.02)
+    scraper = catalogue.mount(ProductScraper(rate_limit=0, max_concurrency=max_concurrency))
+    
+    products = scraper.scrape_multiple_pages(8)
+    
+    assert [product['title'] for product in products] == catalogue.titles()
+
+
+def test_at_most_max_concurrency_pages_are_in_flight(canned):
+    catalogue = canned(pages=8, latency=0.05)
+    scraper = catalogue.mount(ProductScraper(rate_limit=0, max_concurrency=3))
+    
+    scraper.scrape_multiple_pages(8)
+    
+    assert catalogue.max_in_flight == 3
+
+
+def test_page_count_is_read_from_the_first_page(canned):
+    catalogue = canned(pages=4)
+    scraper = catalogue.mount(ProductScraper(rate_limit=0, max_concurrency=2))
+    
+    products = scraper.scrape_multiple_pages()
+    
+    assert [product['title'] for product in products] == catalogue.titles()
+    # No request goes past the last page to find out where the catalogue ends
+    assert catalogue.page_url(5) not in catalogue.requested
+
+
+def test_iter_products_yields_before_the_crawl_ends(canned):
+    catalogue = canned(pages=3)
+    scraper = catalogue.mount(ProductScraper(rate_limit=0))
+    
+    products = scraper.iter_products(3)
+    first = next(products)
+    
+    assert first['title'] == 'Book 1-1'
+    assert catalogue.requested == [catalogue.page_url(1)]
+    assert [first['title']] + [product['title'] for product in products] == catalogue.titles()
+
+
+def make_scraper(site, **kwargs) -> ProductScraper:
+    """Scraper pointed at the fake site, without politeness delays"""
+    return ProductScraper(base_url=site.url, rate_limit=0.01, requests_per_second=0, **kwargs)
+
+
+def fail_for(site, seconds: float):
+    """Answer every request with HTTP 500 for a while"""
+    site.error_rate = 1.0
+    timer = threading.Timer(seconds, setattr, (site, 'error_rate', 0.0))
+    timer.start()
+    return timer
+
+
+def test_crawl_of_the_fake_site_finds_every_product(site):
+    scraper = make_scraper(site, max_concurrency=4)
+    
+    products = scraper.scrape_multiple_pages()
+    
+    assert len(products) == 400
+    assert len({product['url'] for product in products}) == 400
+
+
+@pytest.mark.parametrize('max_concurrency', [1, 3])
+def test_outage_longer_than_reset_timeout_completes_every_page(site, max_concurrency):
+    # One probe fails during the outage; refused requests must not use up the five attempts
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=1.0)
+    scraper = make_scraper(site, max_retries=5, max_concurrency=max_concurrency, circuit_breaker=breaker)
+    
+    # Let page 1 through so the page count is known, then take the site down
+    first_page = []
+    
+    def progress(current, total, message):
+        if not first_page:
+            first_page.append(fail_for(site, 1.5))
+    
+    products = scraper.scrape_multiple_pages(progress_callback=progress)
+    first_page[0].join()
+    
+    assert len(products) == 400
+    assert breaker.state(site.url) == CircuitBreaker.CLOSED
+
+
+def test_circuit_gives_up_after_max_outage(site):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.2, max_outage=0.5)
+    scraper = make_scraper(site, max_retries=100, circuit_breaker=breaker)
+    site.error_rate = 1.0
+    
+    assert scraper.scrape_page(2) == []
+    assert breaker.outage(site.url) >= 0.5
+
+
+@pytest.mark.parametrize('max_concurrency', [1, 3])
+def test_failed_page_does_not_stop_a_crawl_with_known_page_count(site, max_concurrency):
+    scraper = make_scraper(site, max_retries=1, max_concurrency=max_concurrency)
+    
+    # Page 3 fails every attempt; the pager on page 1 says there are 20 pages
+    render = site.render
+    site.render = lambda path: None if path == '/catalogue/page-3.html' else render(path)
+    
+    products = scraper.scrape_multiple_pages()
+    
+    assert len(products) == 380
+
+
+def test_closing_detail_generator_cancels_pending_fetches(site):
+    site.latency = 0.2
+    scraper = make_scraper(site, max_concurrency=2)
+    products = scraper.scrape_page(1) + scraper.scrape_page(2)
+    
+    start = time.perf_counter()
+    details = scraper.iter_product_details([product['url'] for product in products])
+    next(details)
+    details.close()
+    
+    # 40 pages at 0.2s over 2 workers would take 4s; only those already running are waited for
+    assert time.perf_counter() - start < 1.5
+
+
+def test_failed_detail_page_does_not_hold_its_worker(site):
+    scraper = make_scraper(site, max_retries=2, max_concurrency=1)
+    scraper.rate_limiter.backoff_delay = lambda attempt: 0.5
+    urls = [product['url'] for product in scraper.scrape_page(1)[:3]]
+    
+    # The first detail page fails once; the only worker should move on to the others meanwhile
+    failing = urlparse(urls[0]).path
+    render = site.render
+    failed = []
+    
+    def flaky(path):
+        if path == failing and not failed:
+            failed.append(path)
+            return None
+        return render(path)
+    
+    site.render = flaky
+    
+    order = [url for url, details in scraper.iter_product_details(urls) if details]
+    
+    assert order == urls[1:] + urls[:1]
+
+
+def test_enrichment_keeps_products_without_a_url(site):
+    scraper = make_scraper(site)
+    products = scraper.scrape_page(1)[:2] + [{'title': 'No link', 'url': ''}, {'title': 'No URL field'}]
+    
+    enriched = list(scraper.iter_enriched_products(products))
+    
+    assert sorted(product['title'] for product in enriched) == sorted(product['title'] for product in products)
+    assert all('upc' in product for product in enriched if product.get('url'))
+
+
+def test_detail_cache_keeps_only_the_most_recent_pages(site):
+    scraper = make_scraper(site)
+    scraper.DETAILS_CACHE_SIZE = 5
+    products = scraper.scrape_page(1)
+    
+    enriched = scraper.enrich_products(products)
+    
+    assert len(enriched) == len(products)
+    assert all('upc' in product for product in enriched)
+    assert len(scraper._details) == 5
@@ -0,0 +1,76 @@
+"""
+Tests for the timeline tracer
+"""
+import json
+import threading
+
+import pytest
+
+from scraper import ProductScraper
+from tracing import Tracer, NULL_SPAN, tracer
+
+
+def spans(trace: Tracer):
+    return [event for event in trace.events() if event['ph'] == 'X']
+
+
+def work(trace: Tracer):
+    with trace.span('inner'):
+        pass
+
+
+def test_disabled_tracer_records_nothing():
+    trace = Tracer()
+    
+    with trace.span('work') as span:
+        span.set(items=3)
+    
+    assert span is NULL_SPAN
+    assert spans(trace) == []
+
+
+def test_spans_are_saved_as_trace_events(tmp_path):
+    trace = Tracer()
+    path = tmp_path / 'crawl.trace.json'
+    
+    with trace.recording(str(path)):
+        with trace.span('outer', category='test', page=1) as span:
+            span.set(status=200)
+        worker = threading.Thread(target=work, args=(trace,), name='worker-1')
+        worker.start()
+        worker.join()
+    with trace.span('after stop'):
+        pass
+    
+    events = json.loads(path.read_text(encoding='utf-8'))['traceEvents']
+    complete = [event for event in events if event['ph'] == 'X']
+    assert [event['name'] for event in complete] == ['outer', 'inner']
+    assert complete[0]['cat'] == 'test' and complete[0]['args'] == {'page': 1, 'status': 200}
+    assert complete[0]['dur'] >= 0
+    thread_names = {event['args']['name'] for event in events if event['name'] == 'thread_name'}
+    assert 'worker-1' in thread_names
+
+
+def test_failing_span_records_the_error():
+    trace = Tracer()
+    trace.start()
+    
+    with pytest.raises(KeyError):
+        with trace.span('lookup'):
+            raise KeyError('title')
+    
+    assert spans(trace)[0]['args'] == {'error': 'KeyError'}
+
+
+def test_crawl_records_a_span_per_page_and_request(canned):
+    catalogue = canned(pages=3)
+    scraper = catalogue.mount(ProductScraper(requests_per_second=0))
+    tracer.start()
+    try:
+        scraper.scrape_multiple_pages(3)
+    finally:
+        tracer.stop()
+    
+    names = [event['name'] for event in spans(tracer)]
+    assert names.count('page') == 3
+    assert names.count('GET') == 3
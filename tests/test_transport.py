@@ -0,0 +1,64 @@
+"""
+Tests for the pooled keep-alive transport
+"""
+import gzip
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+from transport import Transport
+
+BODY = b'<html><body>' + b'<p>product</p>' * 500 + b'</body></html>'
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Serves BODY over HTTP/1.1, gzip-encoded when the client accepts it"""
+    
+    protocol_version = 'HTTP/1.1'
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def do_GET(self):
+        body = BODY
+        self.send_response(200)
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+def test_sequential_requests_share_one_connection(server_url):
+    transport = Transport(pool_size=2)
+    
+    for page in range(5):
+        response = transport.session.get(f'{server_url}/page-{page}.html', timeout=transport.timeout)
+        assert response.content == BODY
+    
+    stats = transport.stats.snapshot()
+    assert stats['requests'] == 5
+    assert stats['connections_opened'] == 1
+    assert stats['connections_reused'] == 4
+
+
+def test_compressed_bodies_are_counted_before_and_after_decoding(server_url):
+    transport = Transport()
+    
+    transport.session.get(server_url, timeout=transport.timeout)
+    
+    stats = transport.stats.snapshot()
+    assert stats['bytes_decoded'] == len(BODY)
+    assert stats['bytes_on_wire'] == len(gzip.compress(BODY))
@@ -0,0 +1,70 @@
+"""
+Tests for the web GUI's API
+"""
+import importlib
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Flask test client, with the GUI's SQLite stores created in a temporary directory"""
+    monkeypatch.chdir(tmp_path)
+    web_gui = importlib.import_module('web_gui')
+    return web_gui.app.test_client()
+
+
+@pytest.mark.parametrize('num_pages', ['three', None, [2], '0', 0])
+def test_invalid_page_count_is_rejected(client, num_pages):
+    response = client.post('/api/jobs', json={'num_pages': num_pages, 'output_format': 'csv'})
+    
+    assert response.status_code == 400
+    assert 'pages' in response.get_json()['error']
+
+
+def test_invalid_priority_is_rejected(client):
+    response = client.post('/api/jobs', json={'num_pages': 1, 'priority': 'high'})
+    
+    assert response.status_code == 400
+
+
+def test_metrics_are_served_in_prometheus_format(client):
+    response = client.get('/metrics')
+    
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    assert '# TYPE pricespy_pages_scraped_total counter' in response.get_data(as_text=True)
+
+
+def test_partial_results_of_a_crawl_are_discarded(client, tmp_path):
+    import web_gui
+    for name in ('pricespy_results_20260101_120000_abc123.csv.part',
+                 'pricespy_results_20260101_130000_abc123.jsonl.part',
+                 'pricespy_results_20260101_120000_other1.csv.part',
+                 'pricespy_results_20260101_140000_abc123.csv'):
+        (tmp_path / name).write_text('title\n')
+    
+    web_gui.discard_partial_results('abc123')
+    
+    assert sorted(path.name for path in tmp_path.glob('pricespy_results_*')) == [
+        'pricespy_results_20260101_120000_other1.csv.part',
+        'pricespy_results_20260101_140000_abc123.csv'
+    ]
+
+
+def test_cancelled_job_stops_waiting_for_the_tracker(client):
+    import web_gui
+    from jobs import Job, JobCancelled
+    job = Job('waiting', {'incremental': True})
+    threading.Timer(0.2, job._cancel.set).start()
+    
+    with web_gui.tracker_lock:
+        start = time.perf_counter()
+        with pytest.raises(JobCancelled):
+            with web_gui.tracker_turn(job):
+                pass
+    
+    assert time.perf_counter() - start < 2
+    assert not web_gui.tracker_lock.locked()
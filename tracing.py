@@ -0,0 +1,165 @@
+"""
+Opt-in timeline tracer writing Chrome trace-event JSON (opens in Perfetto or chrome://tracing)
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+
+class _NullSpan:
+    """Shared do-nothing span handed out while tracing is off"""
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        return False
+    
+    def set(self, **args):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """A timed step on the current thread; recorded when the ``with`` block ends"""
+    
+    __slots__ = ('tracer', 'name', 'category', 'args', 'start')
+    
+    def __init__(self, tracer: 'Tracer', name: str, category: str, args: Dict):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = 0
+    
+    def __enter__(self) -> 'Span':
+        self.start = time.perf_counter_ns()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer._add_complete(self.name, self.category, self.start, end, self.args)
+        return False
+    
+    def set(self, **args):
+        """Attach more arguments once they are known (e.g. the response status)"""
+        self.args.update(args)
+
+
+class Tracer:
+    """
+    Records spans of every thread for one timeline
+    
+    Disabled until ``start`` is called; while disabled ``span`` returns a
+    shared no-op object, so instrumented code pays only for one attribute
+    check and a call. Use it as::
+        
+        tracer.start()
+        scraper.scrape_multiple_pages(10)
+        tracer.stop()
+        tracer.save('crawl.trace.json')
+    
+    or ``with tracer.recording('crawl.trace.json'): ...``.
+    """
+    
+    def __init__(self):
+        self.enabled = False
+        self._events: List[Dict] = []
+        self._threads: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter_ns()
+        self._pid = os.getpid()
+    
+    def start(self):
+        """Discard earlier spans and start recording"""
+        with self._lock:
+            self._events = []
+            self._threads = {}
+            self._origin = time.perf_counter_ns()
+            self._pid = os.getpid()
+        self.enabled = True
+    
+    def stop(self):
+        """Stop recording; recorded spans are kept until the next start"""
+        self.enabled = False
+    
+    def span(self, name: str, category: str = 'scraper', **args):
+        """
+        Time a step of work
+        
+        Args:
+            name: Span name shown on the timeline
+            category: Event category, for filtering in the viewer
+            **args: Extra details shown when the span is selected
+        
+        Returns:
+            Context manager (a no-op when the tracer is disabled)
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, category, args)
+    
+    def _add_complete(self, name: str, category: str, start: int, end: int, args: Dict):
+        """Record a finished span as a complete ('X') event"""
+        self._append({'name': name, 'cat': category, 'ph': 'X',
+                      'ts': (start - self._origin) / 1000, 'dur': (end - start) / 1000, 'args': args})
+    
+    def _append(self, event: Dict):
+        """Add an event for the current thread, naming the thread on its first event"""
+        thread_id = threading.get_ident()
+        event['pid'] = self._pid
+        event['tid'] = thread_id
+        with self._lock:
+            if thread_id not in self._threads:
+                self._threads[thread_id] = threading.current_thread().name
+            self._events.append(event)
+    
+    def events(self) -> List[Dict]:
+        """Get the recorded events plus thread-name metadata, in trace-event format"""
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+        
+        metadata = [{'name': 'process_name', 'ph': 'M', 'pid': self._pid, 'tid': 0,
+                     'args': {'name': 'PriceSpy'}}]
+        for thread_id, thread_name in threads.items():
+            metadata.append({'name': 'thread_name', 'ph': 'M', 'pid': self._pid, 'tid': thread_id,
+                             'args': {'name': thread_name}})
+        return metadata + events
+    
+    def save(self, path: str) -> int:
+        """
+        Write the timeline as a Chrome trace-event JSON file
+        
+        Args:
+            path: Output file (open it at https://ui.perfetto.dev)
+        
+        Returns:
+            Number of spans written
+        """
+        events = self.events()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        return sum(1 for event in events if event['ph'] != 'M')
+    
+    @contextmanager
+    def recording(self, path: str) -> Iterator['Tracer']:
+        """Record everything inside a ``with`` block and save it to ``path``"""
+        self.start()
+        try:
+            yield self
+        finally:
+            self.stop()
+            count = self.save(path)
+            print(f"Trace with {count} spans saved to {path}")
+
+
+# Shared by every scraper and processor in the process; off unless started
+tracer = Tracer()
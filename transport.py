@@ -0,0 +1,146 @@
+"""
+HTTP transport for the scraper: pooled keep-alive connections with metrics
+"""
+import threading
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util import make_headers
+
+
+class TransportStats:
+    """Thread-safe counters of connection reuse and transfer size"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+        self.bytes_on_wire = 0
+        self.bytes_decoded = 0
+    
+    def record_connection(self):
+        """Count a newly opened TCP connection"""
+        with self._lock:
+            self.connections_opened += 1
+    
+    def record_response(self, wire_bytes: int, decoded_bytes: int):
+        """Count a finished response and its body size before and after decompression"""
+        with self._lock:
+            self.requests += 1
+            self.bytes_on_wire += wire_bytes
+            self.bytes_decoded += decoded_bytes
+    
+    def snapshot(self) -> Dict[str, int]:
+        """
+        Get a consistent copy of the counters
+        
+        Returns:
+            Dictionary with requests, connections_opened, connections_reused
+            (requests sent over an already open connection), bytes_on_wire
+            and bytes_decoded
+        """
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'connections_opened': self.connections_opened,
+                'connections_reused': max(0, self.requests - self.connections_opened),
+                'bytes_on_wire': self.bytes_on_wire,
+                'bytes_decoded': self.bytes_decoded
+            }
+    
+    def summary(self) -> str:
+        """Get a one-line human readable summary"""
+        stats = self.snapshot()
+        ratio = stats['bytes_on_wire'] / stats['bytes_decoded'] if stats['bytes_decoded'] else 1.0
+        return (f"{stats['requests']} requests over {stats['connections_opened']} connections "
+                f"({stats['connections_reused']} reused), "
+                f"{stats['bytes_on_wire'] / 1024:.0f} KB on the wire for "
+                f"{stats['bytes_decoded'] / 1024:.0f} KB of content ({ratio:.0%})")
+
+
+def _counting_pool(pool_cls, stats: TransportStats):
+    """Subclass a urllib3 connection pool so every new TCP connection is counted"""
+    
+    class CountingConnection(pool_cls.ConnectionCls):
+        def connect(self):
+            super().connect()
+            stats.record_connection()
+    
+    class CountingPool(pool_cls):
+        ConnectionCls = CountingConnection
+    
+    return CountingPool
+
+
+class InstrumentedAdapter(HTTPAdapter):
+    """HTTPAdapter that feeds TransportStats"""
+    
+    def __init__(self, stats: TransportStats, **kwargs):
+        self.stats = stats
+        super().__init__(**kwargs)
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _counting_pool(HTTPConnectionPool, self.stats),
+            'https': _counting_pool(HTTPSConnectionPool, self.stats)
+        }
+    
+    def send(self, request, stream=False, **kwargs):
+        response = super().send(request, stream=stream, **kwargs)
+        if not stream:
+            # Read the body now, while the raw stream still knows how many bytes came off the socket
+            decoded = len(response.content)
+            self.stats.record_response(response.raw.tell() if response.raw else decoded, decoded)
+        return response
+
+
+class Transport:
+    """
+    requests.Session tuned for the scraper
+    
+    The connection pool is sized to the number of concurrent workers so
+    every worker keeps its own keep-alive connection instead of opening
+    a new one per request. Compressed responses are requested explicitly
+    (gzip and deflate, plus brotli when the ``brotli`` package is
+    installed), and ``stats`` counts connections opened vs reused and body
+    bytes on the wire vs decoded.
+    """
+    
+    USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    
+    def __init__(self, pool_size: int = 10, connect_timeout: float = 5.0, read_timeout: float = 10.0,
+                 compression: bool = True, user_agent: Optional[str] = None):
+        """
+        Initialize the transport
+        
+        Args:
+            pool_size: Keep-alive connections kept per host; match it to the
+                number of requests in flight
+            connect_timeout: Seconds to wait for a TCP/TLS connection
+            read_timeout: Seconds to wait between bytes of the response
+            compression: Ask for compressed responses
+            user_agent: User-Agent header (defaults to USER_AGENT)
+        """
+        self.pool_size = max(1, int(pool_size))
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.stats = TransportStats()
+        
+        self.session = requests.Session()
+        adapter = InstrumentedAdapter(self.stats, pool_maxsize=self.pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        self.session.headers.update({'User-Agent': user_agent or self.USER_AGENT})
+        # Only advertises the codecs urllib3 can actually decode here
+        self.session.headers['Accept-Encoding'] = (
+            make_headers(accept_encoding=True)['accept-encoding'] if compression else 'identity'
+        )
+    
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        """(connect, read) timeout tuple for requests"""
+        return (self.connect_timeout, self.read_timeout)
@@ -2,114 +2,217 @@
 Web-based GUI for PriceSpy Lite scraper (Flask alternative to Tkinter)
 Works on all platforms including macOS with Tkinter issues
 """
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, render_template, request, jsonify, send_file, Response
 import os
+import glob
+import json
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
 import threading
-import time
 
 from scraper import ProductScraper
 from data_processor import DataProcessor
+from product_columns import ProductColumns
+from checkpoint import CrawlCheckpoint
+from change_tracker import ChangeTracker
+from rate_limiter import RateLimiter
+from circuit_breaker import CircuitBreaker
+from jobs import Job, JobCancelled, JobScheduler
+import metrics
 
 
 app = Flask(__name__)
 
-# Global state for scraping progress
-scraping_state = {
-    'is_running': False,
-    'progress': 0,
-    'total_pages': 0,
-    'current_page': 0,
-    'status': 'Ready',
-    'logs': [],
-    'result_file': None,
-    'stats': {}
-}
-
-
-def log_message(message):
-    """Add a log message with timestamp"""
-    timestamp = datetime.now().strftime("%H:%M:%S")
-    log_entry = f"[{timestamp}] {message}"
-    scraping_state['logs'].append(log_entry)
-    print(log_entry)
-
-
-def update_progress(current, total, message):
-    """Update progress callback"""
-    scraping_state['current_page'] = current
-    scraping_state['total_pages'] = total
-    scraping_state['progress'] = int((current / total) * 100)
-    scraping_state['status'] = message
-    log_message(message)
-
-
-def scrape_task(num_pages, output_format):
-    """Background scraping task"""
+# Scrapes that run at the same time; further jobs wait in the priority queue
+MAX_CONCURRENT_JOBS = 2
+
+# Seconds between keep-alive comments on an idle event stream
+STREAM_HEARTBEAT = 15
+
+# One politeness budget for every job: concurrent jobs share 2 requests/s per host
+rate_limiter = RateLimiter(requests_per_second=2.0, backoff_base=0.5)
+circuit_breaker = CircuitBreaker()
+
+# Finished pages of every crawl, so interrupted crawls can be resumed
+checkpoints = CrawlCheckpoint()
+
+# Page and product fingerprints of previous crawls, for change-only runs
+tracker = ChangeTracker()
+# The tracker holds the state of one run at a time, so change-only jobs take turns
+tracker_lock = threading.Lock()
+# Seconds between cancellation checks while a change-only job waits for its turn
+TRACKER_WAIT_POLL = 0.5
+
+
+def discard_partial_results(job_id):
+    """Delete the .part files left by earlier interrupted runs of a crawl"""
+    for path in glob.glob(f"pricespy_results_*_{job_id}.*.part"):
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f"Could not delete {path}: {e}")
+
+
+@contextmanager
+def tracker_turn(job):
+    """Hold tracker_lock for a change-only job; a job cancelled while it waits gives up its turn"""
+    if not tracker_lock.acquire(blocking=False):
+        job.log("Waiting for another change-only crawl to finish...")
+        while not tracker_lock.acquire(timeout=TRACKER_WAIT_POLL):
+            job.check_cancelled()
     try:
-        scraping_state['is_running'] = True
-        scraping_state['logs'] = []
-        scraping_state['progress'] = 0
-        scraping_state['result_file'] = None
-        
-        log_message("Initializing scraper...")
-        scraper = ProductScraper(rate_limit=0.5, max_retries=3)
-        
-        log_message(f"Starting to scrape {num_pages} page(s)...")
-        
-        # Scrape products
-        products = scraper.scrape_multiple_pages(
-            num_pages,
-            progress_callback=update_progress
-        )
-        
-        if not products:
-            log_message("No products found!")
-            scraping_state['status'] = 'No products found'
-            return
-        
-        log_message(f"Successfully scraped {len(products)} products")
-        
-        # Process data
-        log_message("Processing and deduplicating data...")
-        processor = DataProcessor()
-        df = processor.process_products(products)
-        
-        # Get statistics
-        stats = processor.get_summary_stats(df)
-        scraping_state['stats'] = stats
-        
-        log_message(f"Total unique products: {stats['total_products']}")
-        if stats['total_products'] > 0:
-            log_message(f"Average price: £{stats.get('avg_price', 0):.2f}")
-            log_message(f"Price range: £{stats.get('min_price', 0):.2f} - £{stats.get('max_price', 0):.2f}")
-            log_message(f"Average rating: {stats.get('avg_rating', 0):.1f}/5")
-        
-        # Save to file
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        if output_format == "csv":
-            filename = f"pricespy_results_{timestamp}.csv"
-            success = processor.save_to_csv(df, filename)
-        else:
-            filename = f"pricespy_results_{timestamp}.xlsx"
-            success = processor.save_to_excel(df, filename)
-        
-        if success:
-            scraping_state['result_file'] = filename
-            log_message(f"✓ Results saved to: {filename}")
-            scraping_state['progress'] = 100
-            scraping_state['status'] = 'Completed successfully!'
+        yield
+    finally:
+        tracker_lock.release()
+
+
+def scrape_task(job):
+    """Scrape, process and save the results of one job (runs on a scheduler worker)"""
+    num_pages = job.params.get('num_pages')
+    output_format = job.params.get('output_format', 'csv')
+    compression = job.params.get('compression')
+    incremental = job.params.get('incremental', False)
+    
+    # The job ID keeps concurrent jobs from writing the same file
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    extension = DataProcessor.OUTPUT_FORMATS[output_format]
+    filename = f"pricespy_results_{timestamp}_{job.job_id}{extension}"
+    
+    writer = None
+    written = 0
+    
+    def write_new_rows():
+        """Hand the products collected since the last call to the writer"""
+        nonlocal written
+        if writer is not None and len(products) > written:
+            writer.write(DataProcessor.clean_frame(products.to_frame(start=written)))
+            written = len(products)
+    
+    def update_progress(current, total, message):
+        """Update progress callback; also where a cancelled crawl stops"""
+        job.update(current_page=current, total_pages=total, progress=int((current / total) * 100), status=message)
+        job.log(message)
+        write_new_rows()
+        job.check_cancelled()
+    
+    job.log("Initializing scraper...")
+    scraper = ProductScraper(
+        max_retries=3,
+        rate_limiter=rate_limiter,
+        circuit_breaker=circuit_breaker,
+        checkpoint=checkpoints,
+        tracker=tracker if incremental else None
+    )
+    
+    with tracker_turn(job) if incremental else nullcontext():
+        job.check_cancelled()
+        # CSV and JSON Lines are written as pages complete; other formats are saved at the end
+        writer = DataProcessor.open_writer(output_format, filename)
+        job.log(f"Starting to scrape {num_pages or 'all'} page(s) (job {job.job_id})...")
+        
+        # Scrape products into compact columns; closing the generator stops the crawl
+        # (finished pages stay checkpointed)
+        products = ProductColumns()
+        pages = scraper.iter_products(num_pages, progress_callback=update_progress, job_id=job.job_id)
+        try:
+            for product in pages:
+                products.append(product)
+                job.check_cancelled()
+            write_new_rows()
+        except BaseException as e:
+            if isinstance(e, JobCancelled):
+                job.log("Crawl stopped; its finished pages are kept, resume it to continue")
+            if writer is not None:
+                writer.abort()
+                if writer.rows_written:
+                    job.log(f"Partial results ({writer.rows_written} rows) kept in {writer.temp_filename}")
+                else:
+                    writer.discard()
+            raise
+        finally:
+            pages.close()
+            job.log(f"Network: {scraper.transport.stats.summary()}")
+    
+    if not products:
+        if writer is not None:
+            writer.discard()
+        if incremental:
+            job.log("No products changed since the last crawl")
+            job.update(progress=100, status='No changes since the last crawl')
         else:
-            log_message("✗ Failed to save results")
-            scraping_state['status'] = 'Failed to save results'
-            
-    except Exception as e:
-        log_message(f"✗ Error: {str(e)}")
-        scraping_state['status'] = f'Error: {str(e)}'
+            job.log("No products found!")
+            job.update(status='No products found')
+        return
     
-    finally:
-        scraping_state['is_running'] = False
+    if incremental:
+        job.log(f"{products.received} products new, changed or removed since the last crawl")
+    else:
+        job.log(f"Successfully scraped {products.received} products")
+    
+    # Process data
+    job.log("Processing and deduplicating data...")
+    processor = DataProcessor()
+    df = processor.process_products(products)
+    
+    # Get statistics
+    stats = processor.get_summary_stats(df)
+    job.update(stats=stats)
+    
+    job.log(f"Total unique products: {stats['total_products']}")
+    if stats['total_products'] > 0:
+        job.log(f"Average price: £{stats.get('avg_price', 0):.2f}")
+        job.log(f"Price range: £{stats.get('min_price', 0):.2f} - £{stats.get('max_price', 0):.2f}")
+        job.log(f"Average rating: {stats.get('avg_rating', 0):.1f}/5")
+    
+    if writer is not None:
+        # Every row is already in the .part file; finish it and move it into place
+        try:
+            writer.close()
+            success = True
+        except Exception as e:
+            print(f"Error saving to {output_format}: {e}")
+            writer.abort()
+            success = False
+    else:
+        job.check_cancelled()
+        success = processor.save(df, filename, output_format, compression)
+    
+    if success:
+        job.log(f"✓ Results saved to: {filename}")
+        # A resumed crawl keeps its job ID; its complete file replaces the partial ones
+        discard_partial_results(job.job_id)
+        job.update(result_file=filename, progress=100, status='Completed successfully!')
+    else:
+        job.log("✗ Failed to save results")
+        job.update(state=Job.FAILED, status='Failed to save results')
+
+
+scheduler = JobScheduler(scrape_task, max_workers=MAX_CONCURRENT_JOBS)
+
+
+def sse_event(event, data, event_id=None):
+    """Format one Server-Sent Events message with a JSON payload"""
+    message = f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    if event_id is not None:
+        message = f"id: {event_id}\n" + message
+    return message
+
+
+def job_details(job):
+    """Get the state of a job plus its place in the queue"""
+    return {**job.to_dict(), 'queue_position': scheduler.queue_position(job)}
+
+
+def find_job(job_id=None):
+    """Get a job by ID, or the most recent one (None if there is none)"""
+    if job_id:
+        return scheduler.get(job_id)
+    jobs = scheduler.jobs()
+    return jobs[0] if jobs else None
+
+
+def job_not_found():
+    return jsonify({'error': 'Job not found'}), 404
 
 
 @app.route('/')
@@ -118,30 +221,158 @@ def index():
     return render_template('index.html')
 
 
+@app.route('/api/jobs', methods=['POST'])
 @app.route('/api/start', methods=['POST'])
 def start_scraping():
-    """Start scraping endpoint"""
-    if scraping_state['is_running']:
-        return jsonify({'error': 'Scraping already in progress'}), 400
-    
+    """Queue a scraping job (``priority``: higher runs first, default 0)"""
     data = request.json
-    num_pages = int(data.get('num_pages', 1))
     output_format = data.get('output_format', 'csv')
+    compression = data.get('compression') or 'snappy'
+    incremental = bool(data.get('incremental'))
+    unavailable = DataProcessor.format_unavailable(output_format)
+    if unavailable:
+        return jsonify({'error': unavailable}), 400
+    if output_format == 'parquet' and compression not in DataProcessor.PARQUET_COMPRESSIONS:
+        return jsonify({'error': f"Compression must be one of {', '.join(DataProcessor.PARQUET_COMPRESSIONS)}"}), 400
+    try:
+        priority = int(data.get('priority', 0))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Priority must be a whole number'}), 400
     
-    if num_pages < 1 or num_pages > 50:
-        return jsonify({'error': 'Number of pages must be between 1 and 50'}), 400
+    if data.get('resume_job_id') or data.get('resume'):
+        # Resume a given job, or the most recent interrupted one
+        if data.get('resume_job_id'):
+            crawl = checkpoints.get_job(data['resume_job_id'])
+        else:
+            crawl = checkpoints.latest_unfinished_job()
+        if not crawl:
+            return jsonify({'error': 'No interrupted crawl to resume'}), 400
+        job_id = crawl['job_id']
+        num_pages = crawl['num_pages']
+    else:
+        # 'all' scrapes every page; the scraper reads the real page count from the site
+        if data.get('num_pages') == 'all':
+            num_pages = None
+        else:
+            try:
+                num_pages = int(data.get('num_pages', 1))
+            except (TypeError, ValueError):
+                return jsonify({'error': "Number of pages must be a whole number or 'all'"}), 400
+            if num_pages < 1:
+                return jsonify({'error': 'Number of pages must be at least 1'}), 400
+        job_id = CrawlCheckpoint.new_job_id()
     
-    # Start scraping in background thread
-    thread = threading.Thread(target=scrape_task, args=(num_pages, output_format), daemon=True)
-    thread.start()
+    params = {'num_pages': num_pages, 'output_format': output_format, 'incremental': incremental}
+    if output_format == 'parquet':
+        params['compression'] = compression
+    try:
+        job = scheduler.submit(job_id, params, priority)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    return jsonify({'status': 'started'})
+    return jsonify({'status': 'started', **job_details(job)})
+
 
+@app.route('/api/jobs')
+def list_jobs():
+    """List every known job, newest first (``state`` filters, e.g. ?state=running)"""
+    state = request.args.get('state')
+    jobs = [job_details(job) for job in scheduler.jobs() if not state or job.state == state]
+    return jsonify({'jobs': jobs, 'max_concurrent_jobs': scheduler.max_workers})
 
+
+@app.route('/api/jobs/<job_id>')
 @app.route('/api/status')
-def get_status():
-    """Get current scraping status"""
-    return jsonify(scraping_state)
+def get_status(job_id=None):
+    """Get the state of a job (log lines are served by the logs and stream routes)"""
+    job = find_job(job_id or request.args.get('job_id'))
+    if job is None:
+        if job_id:
+            return job_not_found()
+        return jsonify({'is_running': False, 'status': 'Ready', 'progress': 0, 'stats': {}, 'result_file': None})
+    return jsonify(job_details(job))
+
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancel a queued or running job"""
+    job = scheduler.cancel(job_id)
+    if job is None:
+        return job_not_found()
+    return jsonify(job_details(job))
+
+
+@app.route('/api/jobs/<job_id>/logs')
+@app.route('/api/logs')
+def get_logs(job_id=None):
+    """Get the log lines after the ``since`` cursor (at most ``limit``, default 500)"""
+    job = find_job(job_id or request.args.get('job_id'))
+    if job is None:
+        return job_not_found()
+    since = request.args.get('since', 0, type=int)
+    limit = min(request.args.get('limit', 500, type=int), 500)
+    lines, cursor, missed = job.logs.since(since, limit)
+    return jsonify({'job_id': job.job_id, 'logs': [line for _, line in lines], 'cursor': cursor, 'missed': missed})
+
+
+@app.route('/api/jobs/<job_id>/stream')
+@app.route('/api/stream')
+def stream_progress(job_id=None):
+    """
+    Server-Sent Events stream of a job's log lines and state
+    
+    Sends a ``log`` event (with the line ID as event ID) for every new line,
+    a ``missed`` event when lines were dropped before being sent, and a
+    ``status`` event after every change. The stream ends once the job has
+    finished. A reconnecting browser resumes from its Last-Event-ID.
+    """
+    job = find_job(job_id or request.args.get('job_id'))
+    if job is None:
+        return job_not_found()
+    since = request.headers.get('Last-Event-ID', type=int)
+    if since is None:
+        since = request.args.get('since', 0, type=int)
+    
+    def events():
+        cursor = since
+        version = None
+        yield "retry: 2000\n\n"
+        while True:
+            current = job.logs.version if version is None else job.logs.wait(version, STREAM_HEARTBEAT)
+            if current == version:
+                # Nothing happened; the comment keeps proxies from closing the connection
+                yield ": keep-alive\n\n"
+                continue
+            version = current
+            
+            lines, cursor, missed = job.logs.since(cursor)
+            if missed:
+                yield sse_event('missed', {'count': missed})
+            for line_id, line in lines:
+                yield sse_event('log', line, line_id)
+            details = job_details(job)
+            yield sse_event('status', details)
+            if not details['is_running']:
+                return
+    
+    return Response(events(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/api/jobs/<job_id>/download')
+def download_job_result(job_id):
+    """Download the result file of a job"""
+    job = scheduler.get(job_id)
+    if job is None or not job.result_file or not os.path.exists(job.result_file):
+        return jsonify({'error': 'File not found'}), 404
+    return send_file(os.path.abspath(job.result_file), as_attachment=True)
+
+
+@app.route('/metrics')
+def get_metrics():
+    """Per-stage counters and histograms in Prometheus text format"""
+    return Response(metrics.registry.render(), content_type=metrics.registry.CONTENT_TYPE)
 
 
 @app.route('/api/download/<filename>')
@@ -238,9 +469,36 @@ if __name__ == '__main__':
             border-color: #667eea;
         }
         
+        .form-group input[type="number"]:disabled {
+            background: #f0f0f0;
+            color: #999;
+        }
+        
+        .form-group .checkbox-label {
+            display: flex;
+            align-items: center;
+            margin-top: 10px;
+            font-weight: normal;
+            cursor: pointer;
+        }
+        
+        .checkbox-label input[type="checkbox"] {
+            margin-right: 8px;
+            cursor: pointer;
+        }
+        
         .radio-group {
             display: flex;
-            gap: 20px;
+            flex-wrap: wrap;
+            gap: 10px 20px;
+        }
+        
+        .form-group select {
+            margin-top: 10px;
+            padding: 8px;
+            border: 2px solid #e0e0e0;
+            border-radius: 8px;
+            font-size: 0.95em;
         }
         
         .radio-group label {
@@ -278,6 +536,19 @@ if __name__ == '__main__':
             cursor: not-allowed;
         }
         
+        .btn-secondary {
+            width: 100%;
+            margin-top: 10px;
+            padding: 10px;
+            background: white;
+            color: #764ba2;
+            border: 2px solid #764ba2;
+            border-radius: 8px;
+            font-size: 1em;
+            font-weight: 600;
+            cursor: pointer;
+        }
+        
         .progress-box {
             background: #f8f9fa;
             border-radius: 10px;
@@ -404,8 +675,20 @@ if __name__ == '__main__':
                 <h2 style="margin-bottom: 20px; color: #2c3e50;">Scraping Settings</h2>
                 
                 <div class="form-group">
-                    <label for="num_pages">Number of pages to scrape (1-50):</label>
-                    <input type="number" id="num_pages" min="1" max="50" value="1">
+                    <label for="num_pages">Number of pages to scrape:</label>
+                    <input type="number" id="num_pages" min="1" value="1">
+                    <label class="checkbox-label">
+                        <input type="checkbox" id="all_pages" onchange="toggleAllPages()">
+                        All pages
+                    </label>
+                    <label class="checkbox-label">
+                        <input type="checkbox" id="resume">
+                        Resume last interrupted crawl
+                    </label>
+                    <label class="checkbox-label">
+                        <input type="checkbox" id="incremental">
+                        Only new, changed or removed products
+                    </label>
                 </div>
                 
                 <div class="form-group">
@@ -419,12 +702,32 @@ if __name__ == '__main__':
                             <input type="radio" name="format" value="excel">
                             Excel
                         </label>
+                        <label>
+                            <input type="radio" name="format" value="parquet">
+                            Parquet
+                        </label>
+                        <label>
+                            <input type="radio" name="format" value="feather">
+                            Feather
+                        </label>
+                        <label>
+                            <input type="radio" name="format" value="jsonl">
+                            JSON Lines
+                        </label>
                     </div>
+                    <select id="compression" title="Parquet compression" style="display: none;">
+                        <option value="snappy" selected>snappy (faster)</option>
+                        <option value="zstd">zstd (smaller)</option>
+                    </select>
                 </div>
                 
                 <button class="btn-primary" id="startBtn" onclick="startScraping()">
                     🚀 Start Scraping
                 </button>
+                
+                <button class="btn-secondary" id="cancelBtn" onclick="cancelScraping()" style="display: none;">
+                    ✖ Cancel
+                </button>
             </div>
             
             <div class="progress-box">
@@ -450,27 +753,49 @@ if __name__ == '__main__':
     </div>
     
     <script>
-        let statusInterval = null;
+        // Progress arrives over Server-Sent Events; polling is the fallback
+        const MAX_LOG_LINES = 1000;
+        let eventSource = null;
+        let pollInterval = null;
+        let logCursor = 0;
+        let currentJobId = null;
+        
+        function toggleAllPages() {
+            document.getElementById('num_pages').disabled = document.getElementById('all_pages').checked;
+        }
+        
+        // The compression choice only applies to Parquet
+        function toggleCompression() {
+            const format = document.querySelector('input[name="format"]:checked').value;
+            document.getElementById('compression').style.display = format === 'parquet' ? 'block' : 'none';
+        }
+        document.querySelectorAll('input[name="format"]').forEach(radio => radio.addEventListener('change', toggleCompression));
         
         function startScraping() {
-            const numPages = parseInt(document.getElementById('num_pages').value);
+            const allPages = document.getElementById('all_pages').checked;
+            const resume = document.getElementById('resume').checked;
+            const incremental = document.getElementById('incremental').checked;
+            const numPages = allPages ? 'all' : parseInt(document.getElementById('num_pages').value);
             const format = document.querySelector('input[name="format"]:checked').value;
+            const compression = document.getElementById('compression').value;
             const startBtn = document.getElementById('startBtn');
             
-            if (numPages < 1 || numPages > 50) {
-                alert('Number of pages must be between 1 and 50');
+            if (!resume && !allPages && !(numPages >= 1)) {
+                alert('Number of pages must be at least 1');
                 return;
             }
             
             startBtn.disabled = true;
             startBtn.textContent = 'Scraping...';
+            document.getElementById('logBox').textContent = '';
             document.getElementById('downloadBox').style.display = 'none';
             document.getElementById('statsBox').style.display = 'none';
             
             fetch('/api/start', {
                 method: 'POST',
                 headers: {'Content-Type': 'application/json'},
-                body: JSON.stringify({num_pages: numPages, output_format: format})
+                body: JSON.stringify({num_pages: numPages, output_format: format, compression: compression,
+                                      resume: resume, incremental: incremental})
             })
             .then(response => response.json())
             .then(data => {
@@ -479,70 +804,127 @@ if __name__ == '__main__':
                     startBtn.disabled = false;
                     startBtn.textContent = '🚀 Start Scraping';
                 } else {
-                    // Start polling for status
-                    statusInterval = setInterval(updateStatus, 500);
+                    currentJobId = data.job_id;
+                    logCursor = 0;
+                    document.getElementById('cancelBtn').style.display = 'block';
+                    watchProgress();
                 }
             });
         }
         
-        function updateStatus() {
-            fetch('/api/status')
+        function watchProgress() {
+            if (!window.EventSource) {
+                pollInterval = setInterval(pollProgress, 500);
+                return;
+            }
+            eventSource = new EventSource(`/api/jobs/${currentJobId}/stream?since=${logCursor}`);
+            eventSource.addEventListener('log', event => {
+                logCursor = parseInt(event.lastEventId);
+                appendLogs([JSON.parse(event.data)]);
+            });
+            eventSource.addEventListener('missed', event => {
+                appendLogs([`... ${JSON.parse(event.data).count} earlier lines dropped ...`]);
+            });
+            eventSource.addEventListener('status', event => updateStatus(JSON.parse(event.data)));
+        }
+        
+        function pollProgress() {
+            fetch(`/api/jobs/${currentJobId}/logs?since=${logCursor}`)
             .then(response => response.json())
             .then(data => {
-                // Update progress bar
-                const progressBar = document.getElementById('progressBar');
-                progressBar.style.width = data.progress + '%';
-                progressBar.textContent = data.progress + '%';
-                
-                // Update status text
-                document.getElementById('statusText').textContent = data.status;
-                
-                // Update logs
-                const logBox = document.getElementById('logBox');
-                logBox.innerHTML = data.logs.join('<br>');
-                logBox.scrollTop = logBox.scrollHeight;
-                
-                // Show stats if available
-                if (data.stats && data.stats.total_products > 0) {
-                    const statsHtml = `
-                        <div class="stats-box">
-                            <div class="stat-item">
-                                <div class="stat-value">${data.stats.total_products}</div>
-                                <div class="stat-label">Products</div>
-                            </div>
-                            <div class="stat-item">
-                                <div class="stat-value">£${data.stats.avg_price ? data.stats.avg_price.toFixed(2) : '0.00'}</div>
-                                <div class="stat-label">Avg Price</div>
-                            </div>
-                            <div class="stat-item">
-                                <div class="stat-value">${data.stats.avg_rating ? data.stats.avg_rating.toFixed(1) : '0.0'}/5</div>
-                                <div class="stat-label">Avg Rating</div>
-                            </div>
-                        </div>
-                    `;
-                    document.getElementById('statsBox').innerHTML = statsHtml;
-                    document.getElementById('statsBox').style.display = 'block';
-                }
-                
-                // Show download link if file is ready
-                if (data.result_file) {
-                    const downloadLink = document.getElementById('downloadLink');
-                    downloadLink.href = '/api/download/' + data.result_file;
-                    document.getElementById('downloadBox').style.display = 'block';
-                }
-                
-                // Re-enable button if not running
-                if (!data.is_running) {
-                    clearInterval(statusInterval);
-                    document.getElementById('startBtn').disabled = false;
-                    document.getElementById('startBtn').textContent = '🚀 Start Scraping';
+                if (data.missed) {
+                    appendLogs([`... ${data.missed} earlier lines dropped ...`]);
                 }
+                logCursor = data.cursor;
+                appendLogs(data.logs);
             });
+            fetch(`/api/jobs/${currentJobId}`)
+            .then(response => response.json())
+            .then(updateStatus);
+        }
+        
+        function appendLogs(lines) {
+            const logBox = document.getElementById('logBox');
+            for (const line of lines) {
+                const entry = document.createElement('div');
+                entry.textContent = line;
+                logBox.appendChild(entry);
+            }
+            // Keep the page as bounded as the server's log buffer
+            while (logBox.childElementCount > MAX_LOG_LINES) {
+                logBox.removeChild(logBox.firstElementChild);
+            }
+            logBox.scrollTop = logBox.scrollHeight;
+        }
+        
+        function cancelScraping() {
+            if (currentJobId) {
+                fetch(`/api/jobs/${currentJobId}/cancel`, {method: 'POST'});
+            }
+        }
+        
+        function stopWatching() {
+            if (eventSource) {
+                eventSource.close();
+                eventSource = null;
+            }
+            if (pollInterval) {
+                clearInterval(pollInterval);
+                pollInterval = null;
+            }
+        }
+        
+        function updateStatus(data) {
+            // Update progress bar
+            const progressBar = document.getElementById('progressBar');
+            progressBar.style.width = data.progress + '%';
+            progressBar.textContent = data.progress + '%';
+            
+            // Update status text
+            document.getElementById('statusText').textContent =
+                data.queue_position ? `Queued (position ${data.queue_position})...` : data.status;
+            
+            // Show stats if available
+            if (data.stats && data.stats.total_products > 0) {
+                const statsHtml = `
+                    <div class="stats-box">
+                        <div class="stat-item">
+                            <div class="stat-value">${data.stats.total_products}</div>
+                            <div class="stat-label">Products</div>
+                        </div>
+                        <div class="stat-item">
+                            <div class="stat-value">£${data.stats.avg_price ? data.stats.avg_price.toFixed(2) : '0.00'}</div>
+                            <div class="stat-label">Avg Price</div>
+                        </div>
+                        <div class="stat-item">
+                            <div class="stat-value">${data.stats.avg_rating ? data.stats.avg_rating.toFixed(1) : '0.0'}/5</div>
+                            <div class="stat-label">Avg Rating</div>
+                        </div>
+                    </div>
+                `;
+                document.getElementById('statsBox').innerHTML = statsHtml;
+                document.getElementById('statsBox').style.display = 'block';
+            }
+            
+            // Show download link if file is ready
+            if (data.result_file) {
+                const downloadLink = document.getElementById('downloadLink');
+                downloadLink.href = `/api/jobs/${data.job_id}/download`;
+                document.getElementById('downloadBox').style.display = 'block';
+            }
+            
+            // Re-enable button if not running
+            if (!data.is_running) {
+                stopWatching();
+                document.getElementById('cancelBtn').style.display = 'none';
+                document.getElementById('startBtn').disabled = false;
+                document.getElementById('startBtn').textContent = '🚀 Start Scraping';
+            }
         }
     </script>
 </body>
 </html>'''
-    
+
     with open('templates/index.html', 'w') as f:
         f.write(html_content)
     